@@ -0,0 +1,261 @@
+"""
+Film içerik vektörleri üzerinde yaklaşık en yakın komşu (ANN) indeksi.
+
+Yalnızca NumPy/SciPy ile IVF (inverted file) indeksi:
+  1. Seyrek film vektörleri (movie_features.combine_features: özet TF-IDF,
+     tür, anahtar kelime) rastgele Gauss izdüşümü ile düşük boyutlu yoğun
+     vektörlere indirgenir ve L2 normalize edilir (kosinüs büyük ölçüde korunur).
+  2. Küresel k-means ile n_lists merkez bulunur, her film en yakın merkezin
+     listesine yazılır.
+  3. Sorguda yalnızca en yakın n_probe listedeki filmler puanlanır; en iyi
+     k * rerank aday, varsa tam seyrek vektörlerle yeniden sıralanır.
+
+İndeks bir dizine .npy dosyaları olarak yazılır ve bellek eşlemeli açılır:
+
+    index = load_ann_index('./ann_index', feature_store='./feature_store')
+    index.similar_to_movie(862, k=10)
+    index.similar_to_vector(profile_vector, k=25)
+
+Kullanım:
+    python ann_index.py --feature-store ./feature_store --output ./ann_index
+    python ann_index.py --feature-store ./feature_store --check-database
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from db import create_db_engine
+from feature_store import database_fingerprint, load_feature_store
+from movie_features import combine_features
+
+INDEX_FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+INDEX_ARRAYS = ('ids', 'projection', 'vectors', 'centroids', 'list_offsets', 'list_rows')
+
+DEFAULT_DIM = 256
+DEFAULT_N_PROBE = 16
+DEFAULT_RERANK = 20
+KMEANS_SAMPLE = 50000
+
+
+def store_matrix(store):
+    """Özellik deposundaki blokları tek bir ağırlıklı CSR matriste birleştirir"""
+    return combine_features({'text': store.text, 'genre': store.genre, 'keyword': store.keyword})
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _block_argmax(vectors, centroids, block_size=8192):
+    """Her vektör için en yüksek iç çarpımlı merkezin indeksi (bellek bloklar halinde)"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block_size):
+        labels[start:start + block_size] = vectors[start:start + block_size].dot(centroids.T).argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_lists, n_iter=15, seed=0):
+    """Normalize vektörler için küresel k-means, merkezleri döndürür"""
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _block_argmax(vectors, centroids)
+        assignment = sp.csr_matrix(
+            (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+            shape=(n_lists, len(vectors))
+        )
+        sums = np.asarray(assignment.dot(vectors))
+        # Boş kalan listeler rastgele bir vektörle yeniden başlatılır
+        empty = np.flatnonzero(np.bincount(labels, minlength=n_lists) == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class AnnIndex:
+    """IVF yaklaşık en yakın komşu indeksi"""
+
+    def __init__(self, arrays, meta, matrix=None):
+        self.meta = meta
+        self.ids = arrays['ids']
+        self.projection = arrays['projection']
+        self.vectors = arrays['vectors']
+        self.centroids = arrays['centroids']
+        self.list_offsets = arrays['list_offsets']
+        self.list_rows = arrays['list_rows']
+        # Tam seyrek vektörler (yeniden sıralama için, isteğe bağlı)
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.ids)
+
+    def project(self, vector):
+        """Seyrek veya yoğun tam boyutlu vektörü indeks uzayına indirger"""
+        if sp.issparse(vector):
+            projected = np.asarray(vector.dot(self.projection)).ravel()
+        else:
+            projected = np.asarray(vector, dtype=np.float32).ravel().dot(self.projection)
+        norm = np.linalg.norm(projected)
+        return (projected / norm if norm > 0 else projected).astype(np.float32)
+
+    def _candidates(self, query, n_probe):
+        """Sorguya en yakın n_probe listedeki satırlar"""
+        n_probe = min(n_probe, len(self.centroids))
+        lists = np.argpartition(-self.centroids.dot(query), n_probe - 1)[:n_probe]
+        return np.concatenate([self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists])
+
+    def _search(self, query, k, n_probe, rerank, exclude_rows=(), full_query=None):
+        """İzdüşüm uzayındaki sorgu için en yakın k satırı ve skorları döndürür"""
+        rows = self._candidates(query, n_probe)
+        if len(exclude_rows):
+            rows = rows[~np.isin(rows, exclude_rows)]
+        if len(rows) == 0:
+            return rows, np.array([], dtype=np.float32)
+
+        scores = self.vectors[rows].dot(query)
+        if full_query is not None and self.matrix is not None and rerank:
+            # En iyi adaylar tam seyrek vektörlerle yeniden puanlanır
+            keep = min(len(rows), k * rerank)
+            rows = rows[np.argpartition(-scores, keep - 1)[:keep]]
+            scores = np.asarray(self.matrix[rows].dot(full_query.T).todense()).ravel()
+
+        k = min(k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return rows[best], scores[best]
+
+    def search(self, vector, k=10, n_probe=DEFAULT_N_PROBE, rerank=DEFAULT_RERANK, exclude_rows=()):
+        """Tam boyutlu sorgu vektörüne en yakın k film için (satırlar, skorlar) döndürür"""
+        full_query = sp.csr_matrix(vector if sp.issparse(vector) else np.asarray(vector, dtype=np.float32).ravel())
+        return self._search(self.project(vector), k, n_probe, rerank, exclude_rows, full_query)
+
+    def similar_to_vector(self, vector, k=10, n_probe=DEFAULT_N_PROBE, rerank=DEFAULT_RERANK):
+        """Profil vektörüne en benzer k film için [(film ID, skor)] döndürür"""
+        rows, scores = self.search(vector, k, n_probe, rerank)
+        return list(zip(self.ids[rows].tolist(), scores.tolist()))
+
+    def similar_to_movie(self, movie_id, k=10, n_probe=DEFAULT_N_PROBE, rerank=DEFAULT_RERANK):
+        """Verilen filme en benzer k film için [(film ID, skor)] döndürür (filmin kendisi hariç)"""
+        row = int(np.searchsorted(self.ids, movie_id))
+        if row >= len(self.ids) or self.ids[row] != movie_id:
+            raise KeyError(f"Film indekste yok: {movie_id}")
+        full_query = self.matrix[row] if self.matrix is not None else None
+        rows, scores = self._search(np.asarray(self.vectors[row]), k, n_probe, rerank,
+                                    np.array([row]), full_query)
+        return list(zip(self.ids[rows].tolist(), scores.tolist()))
+
+
+def build_ann_index(matrix, ids, dim=DEFAULT_DIM, n_lists=None, n_iter=15, seed=0):
+    """Seyrek film matrisinden IVF indeksini oluşturur, (diziler, meta) döndürür"""
+    rng = np.random.default_rng(seed)
+    n_movies = matrix.shape[0]
+    n_lists = n_lists or max(1, int(4 * np.sqrt(n_movies)))
+
+    projection = (rng.standard_normal((matrix.shape[1], dim)) / np.sqrt(dim)).astype(np.float32)
+    vectors = _normalize(np.asarray(matrix.dot(projection)))
+
+    # Merkezler örneklem üzerinde eğitilir, tüm filmler sonra atanır
+    sample = vectors
+    if n_movies > KMEANS_SAMPLE:
+        sample = vectors[rng.choice(n_movies, KMEANS_SAMPLE, replace=False)]
+    centroids = spherical_kmeans(sample, n_lists, n_iter, seed)
+    labels = _block_argmax(vectors, centroids)
+
+    list_rows = np.argsort(labels, kind='stable').astype(np.int32)
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))]).astype(np.int64)
+
+    arrays = {
+        'ids': np.asarray(ids, dtype=np.int64),
+        'projection': projection,
+        'vectors': vectors,
+        'centroids': centroids,
+        'list_offsets': list_offsets,
+        'list_rows': list_rows,
+    }
+    meta = {
+        'format_version': INDEX_FORMAT_VERSION,
+        'n_movies': int(n_movies),
+        'n_features': int(matrix.shape[1]),
+        'dim': int(dim),
+        'n_lists': int(len(centroids)),
+    }
+    return arrays, meta
+
+
+def save_ann_index(path, arrays, meta):
+    """İndeksi geçici dizine yazıp atomik olarak yerine taşır"""
+    tmp_path = path.rstrip('/') + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    for name in INDEX_ARRAYS:
+        np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(arrays[name]), allow_pickle=False)
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+
+
+def load_ann_index(path, feature_store=None):
+    """İndeksi bellek eşlemeli açar; özellik deposu verilirse yeniden sıralama açılır"""
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen ANN indeks biçimi: {meta.get('format_version')}")
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in INDEX_ARRAYS}
+
+    matrix = None
+    if feature_store is not None:
+        store = load_feature_store(feature_store) if isinstance(feature_store, str) else feature_store
+        if len(store) != meta['n_movies'] or not np.array_equal(store.ids, arrays['ids']):
+            raise ValueError("ANN indeksi bu özellik deposundan üretilmemiş")
+        matrix = store_matrix(store)
+    return AnnIndex(arrays, meta, matrix)
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Film vektörleri için IVF yaklaşık en yakın komşu indeksi oluşturur")
+    parser.add_argument('--feature-store', required=True,
+                        help="import_data.py --feature-store ile üretilen özellik deposu dizini")
+    parser.add_argument('--output', default='ann_index',
+                        help="İndeksin yazılacağı dizin")
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM,
+                        help="Rastgele izdüşüm boyutu")
+    parser.add_argument('--n-lists', type=int, default=None,
+                        help="IVF liste sayısı (varsayılan 4 * sqrt(film sayısı))")
+    parser.add_argument('--n-iter', type=int, default=15,
+                        help="k-means yineleme sayısı")
+    parser.add_argument('--check-database', action='store_true',
+                        help="Depoyu veritabanındaki movies_metadata kataloğuyla karşılaştır")
+    parser.add_argument('--verify-store', action='store_true',
+                        help="Özellik deposu dosyalarının SHA-256 özetlerini açılışta doğrula")
+    parser.add_argument('--allow-stale', action='store_true',
+                        help="Depo veritabanındaki film kataloğuyla uyuşmuyorsa durma, yalnızca uyar")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    fingerprint = database_fingerprint(create_db_engine()) if args.check_database else None
+    store = load_feature_store(args.feature_store, args.verify_store, fingerprint, args.allow_stale)
+    arrays, meta = build_ann_index(store_matrix(store), store.ids, args.dim, args.n_lists, args.n_iter)
+    save_ann_index(args.output, arrays, meta)
+    print(f"ANN indeksi yazıldı: {args.output} ({meta['n_movies']} film, {meta['n_lists']} liste, "
+          f"{meta['dim']} boyut, {time.perf_counter() - start:.1f} sn)")
+
+
+if __name__ == "__main__":
+    main()
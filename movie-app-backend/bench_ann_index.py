@@ -0,0 +1,114 @@
+"""
+ann_index.py için recall@K / gecikme ölçümü.
+
+Rastgele filmler ("X'e benzer filmler") ve rastgele izleme listelerinin
+ortalama vektörleri (profil sorguları) için tam arama ile IVF indeksini
+karşılaştırır. Her n_probe değeri için recall@K ve sorgu gecikmesi yazdırılır;
+böylece doğruluk/hız dengesi seçilebilir.
+
+    python bench_ann_index.py --movies 45000
+    python bench_ann_index.py --movies 450000 --n-probe 4 8 16 32
+    python bench_ann_index.py --feature-store ./feature_store
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from ann_index import DEFAULT_DIM, DEFAULT_RERANK, AnnIndex, build_ann_index, store_matrix
+from bench_recommendation_service import synthetic_store
+from feature_store import load_feature_store
+
+
+def exact_top_k(matrix, query, k, exclude_row=None):
+    """Tüm katalog üzerinde tam arama"""
+    scores = np.asarray(matrix.dot(query.T).todense()).ravel()
+    if exclude_row is not None:
+        scores[exclude_row] = -np.inf
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def make_queries(matrix, n_queries, profile_size, rng):
+    """(ad, sorgu vektörü, hariç tutulacak satır) listesi üretir"""
+    queries = []
+    for row in rng.choice(matrix.shape[0], n_queries, replace=False):
+        queries.append(('film', matrix[row], row))
+    for _ in range(n_queries):
+        rows = rng.choice(matrix.shape[0], profile_size, replace=False)
+        queries.append(('profil', sp.csr_matrix(matrix[rows].mean(axis=0)), None))
+    return queries
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(index, matrix, queries, k, n_probes, rerank):
+    """Tam arama ve her n_probe için recall@K ile gecikmeyi yazdırır"""
+    truth = {}
+    exact_times = []
+    for i, (_, query, exclude_row) in enumerate(queries):
+        truth[i], elapsed = timed(exact_top_k, matrix, query, k, exclude_row)
+        exact_times.append(elapsed)
+    print(f"{'tam arama':<22} recall@{k} 1.000   ort. {np.mean(exact_times):7.2f} ms   "
+          f"p95 {np.percentile(exact_times, 95):7.2f} ms")
+
+    for n_probe in n_probes:
+        for kind in ('film', 'profil'):
+            recalls, times = [], []
+            for i, (query_kind, query, exclude_row) in enumerate(queries):
+                if query_kind != kind:
+                    continue
+                exclude = np.array([exclude_row]) if exclude_row is not None else ()
+                (rows, _), elapsed = timed(index.search, query, k, n_probe, rerank, exclude)
+                recalls.append(len(np.intersect1d(rows, truth[i])) / k)
+                times.append(elapsed)
+            print(f"n_probe={n_probe:<4} {kind:<8}  recall@{k} {np.mean(recalls):.3f}   "
+                  f"ort. {np.mean(times):7.2f} ms   p95 {np.percentile(times, 95):7.2f} ms")
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="ANN indeksi recall@K / gecikme ölçümü")
+    parser.add_argument('--feature-store', default=None,
+                        help="Ölçülecek özellik deposu (verilmezse sentetik depo üretilir)")
+    parser.add_argument('--movies', type=int, default=45000,
+                        help="Sentetik depodaki film sayısı")
+    parser.add_argument('--queries', type=int, default=100,
+                        help="Her sorgu türü için sorgu sayısı")
+    parser.add_argument('--profile-size', type=int, default=20,
+                        help="Profil sorgularındaki izlenen film sayısı")
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[4, 8, 16, 32, 64])
+    parser.add_argument('--rerank', type=int, default=DEFAULT_RERANK,
+                        help="Tam vektörlerle yeniden sıralanacak aday çarpanı (0: kapalı)")
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM)
+    parser.add_argument('--n-lists', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(3)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.feature_store or synthetic_store(tmp_dir, args.movies)
+        store = load_feature_store(path)
+        matrix = store_matrix(store)
+
+        (arrays, meta), elapsed = timed(build_ann_index, matrix, store.ids, args.dim, args.n_lists)
+        index = AnnIndex(arrays, meta, matrix)
+        print(f"İndeks oluşturuldu: {meta['n_movies']} film, {meta['n_lists']} liste, {meta['dim']} boyut "
+              f"({elapsed / 1000:.1f} sn)")
+
+        queries = make_queries(matrix, args.queries, args.profile_size, rng)
+        run_benchmark(index, matrix, queries, args.k, args.n_probe, args.rerank)
+
+
+if __name__ == "__main__":
+    main()
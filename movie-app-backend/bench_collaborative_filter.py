@@ -0,0 +1,157 @@
+"""
+collaborative_filter.py için kurulum süresi ve bellek ölçümü.
+
+Her kullanıcı sayısı için sentetik UserMovies etkileşimleri üretilir
+(kullanıcı başına Poisson dağılımlı film sayısı, film popülerliği kuvvet yasası)
+ve ayrı bir süreçte şunlar ölçülür:
+  full         - X'in kurulması, C = XᵀX, tüm komşu listeleri ve diske yazma
+  incremental  - kullanıcıların --changed oranı kadarı izleme listesini
+                 değiştirdikten sonra artımlı güncelleme
+Aşama süreleri, en yüksek RSS artışı, birlikte görülme çifti sayısı ve model
+boyutu yazdırılır; --output ile JSON olarak kaydedilir.
+
+    python bench_collaborative_filter.py
+    python bench_collaborative_filter.py --users 10000 100000 1000000 --items 45000 --output cf_bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from collaborative_filter import (DEFAULT_MIN_SUPPORT, DEFAULT_TOP_K, build_cf_model, build_user_matrix,
+                                  load_cf_model, save_cf_model, update_cf_model)
+from import_metrics import RssSampler, current_rss
+
+USER_CHUNK = 50000
+
+
+def synthetic_chunks(n_users, n_items, avg_items, seed=42, changed_users=None):
+    """Kullanıcı blokları halinde (kullanıcı ID'leri, film ID'leri) parçaları üretir
+
+    changed_users verilirse bu kullanıcıların filmleri farklı bir tohumla yeniden seçilir.
+    """
+    popularity = 1.0 / np.arange(1, n_items + 1) ** 0.9
+    popularity /= popularity.sum()
+    for start in range(0, n_users, USER_CHUNK):
+        rng = np.random.default_rng([seed, start])
+        users = np.arange(start, min(start + USER_CHUNK, n_users), dtype=np.int32)
+        counts = rng.poisson(avg_items, len(users))
+        user_column = np.repeat(users + 1, counts).astype(np.int32)
+        item_column = (rng.choice(n_items, len(user_column), p=popularity) + 1).astype(np.int32)
+        if changed_users is not None:
+            changed = np.isin(user_column - 1, changed_users)
+            change_rng = np.random.default_rng([seed + 1, start])
+            item_column[changed] = change_rng.choice(n_items, int(changed.sum()), p=popularity) + 1
+        yield user_column, item_column
+
+
+def _timed(step, timings, sampler, function, *args):
+    sampler.reset()
+    start = time.perf_counter()
+    result = function(*args)
+    timings[step] = round(time.perf_counter() - start, 3)
+    timings[f'{step}_peak_mb'] = round(sampler.peak / 1024 ** 2, 1)
+    return result
+
+
+def _directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 ** 2
+
+
+def measure(n_users, n_items, avg_items, changed_ratio, k, min_support):
+    """Ayrı süreçte çalışır: tam kurulum ve artımlı güncellemeyi ölçer"""
+    sampler = RssSampler(interval=0.01)
+    sampler.start()
+    start_rss = current_rss()
+    result = {'users': n_users, 'items': n_items, 'avg_items': avg_items}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cf_model')
+        full = {}
+        start = time.perf_counter()
+        user_matrix = _timed('matrix', full, sampler, build_user_matrix,
+                             synthetic_chunks(n_users, n_items, avg_items))
+        arrays, meta = _timed('model', full, sampler, build_cf_model, user_matrix, k, min_support)
+        _timed('save', full, sampler, save_cf_model, path, arrays, meta)
+        full['seconds'] = round(time.perf_counter() - start, 3)
+        full['peak_rss_delta_mb'] = round((max(full['matrix_peak_mb'], full['model_peak_mb'], full['save_peak_mb'])
+                                           - start_rss / 1024 ** 2), 1)
+        result.update(interactions=meta['n_interactions'], cooc_nnz=meta['cooc_nnz'],
+                      model_mb=round(_directory_mb(path), 1), full=full)
+        del user_matrix, arrays
+
+        rng = np.random.default_rng(7)
+        changed_users = np.sort(rng.choice(n_users, max(1, int(n_users * changed_ratio)), replace=False))
+        incremental = {}
+        sampler.reset()
+        base_rss = current_rss()
+        start = time.perf_counter()
+        user_matrix = _timed('matrix', incremental, sampler, build_user_matrix,
+                             synthetic_chunks(n_users, n_items, avg_items, changed_users=changed_users))
+        arrays, meta = _timed('model', incremental, sampler, update_cf_model, load_cf_model(path), user_matrix, k,
+                              min_support)
+        _timed('save', incremental, sampler, save_cf_model, path, arrays, meta)
+        incremental['seconds'] = round(time.perf_counter() - start, 3)
+        incremental['peak_rss_delta_mb'] = round(
+            max(incremental['matrix_peak_mb'], incremental['model_peak_mb'], incremental['save_peak_mb'])
+            - base_rss / 1024 ** 2, 1)
+        incremental.update(meta['last_update'])
+        result['incremental'] = incremental
+
+    sampler.stop()
+    return result
+
+
+def print_report(results):
+    print(f"{'kullanıcı':>10} {'etkileşim':>11} {'C çifti':>11} {'model MB':>9} | {'tam sn':>7} {'X sn':>6} "
+          f"{'C+komşu sn':>10} {'tepe MB':>8} | {'artımlı sn':>10} {'değişen':>8} {'komşu':>7} {'tepe MB':>8}")
+    for result in results:
+        full, incremental = result['full'], result['incremental']
+        print(f"{result['users']:>10,} {result['interactions']:>11,} {result['cooc_nnz']:>11,} "
+              f"{result['model_mb']:>9.1f} | {full['seconds']:>7.2f} {full['matrix']:>6.2f} {full['model']:>10.2f} "
+              f"{full['peak_rss_delta_mb']:>8.1f} | {incremental['seconds']:>10.2f} "
+              f"{incremental['changed_users']:>8,} {incremental['recomputed_items']:>7,} "
+              f"{incremental['peak_rss_delta_mb']:>8.1f}")
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="İşbirlikçi filtreleme modeli kurulum süresi ve bellek ölçümü")
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help="Ölçülecek sentetik kullanıcı sayıları")
+    parser.add_argument('--items', type=int, default=45000,
+                        help="Katalogdaki film sayısı")
+    parser.add_argument('--avg-items', type=float, default=12,
+                        help="Kullanıcı başına ortalama film sayısı")
+    parser.add_argument('--changed', type=float, default=0.01,
+                        help="Artımlı ölçümde izleme listesi değişen kullanıcı oranı")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--min-support', type=int, default=DEFAULT_MIN_SUPPORT)
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results = []
+    # Her ölçek temiz bir süreçte ölçülür, böylece tepe RSS birbirini etkilemez
+    context = multiprocessing.get_context('spawn')
+    for n_users in args.users:
+        print(f"{n_users} kullanıcı ölçülüyor...")
+        with context.Pool(1) as pool:
+            results.append(pool.apply(measure, (n_users, args.items, args.avg_items, args.changed,
+                                                args.top_k, args.min_support)))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+        print(f"Sonuçlar yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
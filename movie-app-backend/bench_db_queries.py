@@ -0,0 +1,395 @@
+"""
+Backend'in sık çalışan sorgularıyla veritabanı yük ve gecikme ölçümü.
+
+Node controller'larının gönderdiği sorgu biçimleri gerçekçi parametrelerle
+yeniden oynatılır:
+  candidates    - recommendationController.js: izlenen filmler NOT IN listesiyle
+                  3000 satırlık öneri aday sorgusu (tür adları alt sorgusu dahil)
+  list_page     - movieController.js getAllMovies: links ile LEFT JOIN, sıralama
+                  sütunu ve sayfaya göre LIMIT/OFFSET
+  list_count    - getAllMovies: SELECT COUNT(*) FROM movies_metadata
+  search_page   - simpleSearch: sayfalı arama (MySQL'de FULLTEXT MATCH ... AGAINST,
+                  diğerlerinde title LIKE)
+  search_count  - simpleSearch: aynı arama koşuluyla COUNT(*)
+İzleme listeleri UserMovies tablosu varsa oradan, yoksa popülerliğe göre
+ağırlıklı sentetik listelerden alınır. Arama terimleri film başlıklarından seçilir.
+
+Her eşzamanlılık düzeyinde o kadar iş parçacığı, aynı boyutta bir bağlantı
+havuzundan bağlantı alıp --duration saniye boyunca --mix oranlarında sorgu
+gönderir (ısınma süresi ölçüme katılmaz). Sorgu türü başına p50/p95/p99,
+ortalama ve en yüksek gecikme ile QPS yazdırılır ve JSON olarak kaydedilir.
+İndeks veya şema değişikliğinden önce ve sonra çalıştırılıp --compare ile
+karşılaştırılır.
+
+Veritabanı --database-url veya DATABASE_URL ile seçilir; bench_import.py'nin
+ürettiği SQLite dosyası gibi yerel bir veritabanı da kullanılabilir.
+
+    python bench_db_queries.py --database-url sqlite:///bench_data/1x/bench.db --concurrency 1 4 --output before.json
+    python bench_db_queries.py --concurrency 1 4 --compare before.json --output after.json
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import inspect, text
+
+from db import create_db_engine, get_database_url
+
+QUERY_TYPES = ('candidates', 'list_page', 'list_count', 'search_page', 'search_count')
+DEFAULT_MIX = {'candidates': 1, 'list_page': 4, 'list_count': 4, 'search_page': 2, 'search_count': 2}
+
+PAGE_SIZE = 20
+CANDIDATE_LIMIT = 3000
+# getAllMovies'in izin verdiği sıralama sütunları; varsayılan popularity en sık kullanılır
+SORT_COLUMNS = ('popularity', 'vote_average', 'release_date', 'title')
+SORT_WEIGHTS = (0.7, 0.15, 0.1, 0.05)
+# Sentetik izleme listesi boyutu (log-normal, medyan ~40 film)
+WATCHED_MEDIAN = 40
+WATCHED_SIGMA = 1.0
+SYNTHETIC_LISTS = 1000
+SEARCH_TERM_COUNT = 2000
+
+
+def genre_names_subquery(dialect):
+    """recommendationController.js'deki GENRE_NAMES_SUBQUERY (SQLite'ta group_concat karşılığı)"""
+    if dialect == 'mysql':
+        aggregate = "GROUP_CONCAT(g.name ORDER BY g.name SEPARATOR '|')"
+    else:
+        aggregate = "group_concat(g.name, '|')"
+    return (f"SELECT {aggregate} FROM movie_genres mg INNER JOIN genres g ON g.id = mg.genre_id "
+            f"WHERE mg.movie_id = mm.id")
+
+
+def candidate_query(watched_ids, dialect):
+    """İzlenen film ID'leri sorgu metnine gömülü (controller'daki gibi) aday sorgusu"""
+    return text(f"""
+        SELECT mm.id, mm.title, mm.poster_path, mm.release_date, mm.vote_average,
+               ({genre_names_subquery(dialect)}) AS genre_names, mm.overview, mm.popularity
+        FROM movies_metadata mm
+        WHERE mm.id NOT IN ({','.join(map(str, watched_ids)) or 0})
+          AND mm.id IS NOT NULL
+          AND mm.title IS NOT NULL
+          AND mm.overview IS NOT NULL AND mm.overview != ''
+          AND EXISTS (SELECT 1 FROM movie_genres mg WHERE mg.movie_id = mm.id)
+          AND mm.vote_average >= 5.0
+        ORDER BY mm.popularity DESC, mm.vote_average DESC
+        LIMIT {CANDIDATE_LIMIT}""")
+
+
+# movieController.js LINKS_JOIN: tmdbId üzerinden, tmdbId başına en küçük movieId'li satır
+LINKS_JOIN = ("LEFT JOIN links l ON l.tmdbId = mm.id "
+              "AND l.movieId = (SELECT MIN(l2.movieId) FROM links l2 WHERE l2.tmdbId = mm.id)")
+
+
+def list_page_query(sort_by, sort_order):
+    return text(f"""
+        SELECT mm.id, mm.title, mm.poster_path, mm.release_date, mm.vote_average,
+               mm.overview, mm.genres, mm.belongs_to_collection, mm.popularity,
+               mm.vote_count, mm.runtime, l.tmdbId
+        FROM movies_metadata mm
+        {LINKS_JOIN}
+        ORDER BY mm.{sort_by} {sort_order}
+        LIMIT :limit OFFSET :offset""")
+
+
+LIST_COUNT_QUERY = text("SELECT COUNT(*) as count FROM movies_metadata")
+
+def search_condition(term, dialect):
+    """movieController.js searchCondition: MySQL'de FULLTEXT, diğerlerinde LIKE (SQL, parametre)"""
+    if dialect == 'mysql':
+        return ("MATCH(mm.title, mm.original_title) AGAINST (:search IN BOOLEAN MODE)",
+                f'+{term}*')
+    return "mm.title LIKE :search", f'%{term}%'
+
+
+def search_page_query(condition):
+    return text(f"""
+        SELECT mm.id, mm.title, mm.poster_path, mm.release_date, mm.vote_average,
+               mm.overview, mm.genres, mm.belongs_to_collection, mm.popularity,
+               mm.vote_count, mm.runtime, l.tmdbId
+        FROM movies_metadata mm
+        {LINKS_JOIN}
+        WHERE {condition}
+        ORDER BY mm.popularity DESC
+        LIMIT :limit OFFSET :offset""")
+
+
+def search_count_query(condition):
+    return text(f"SELECT COUNT(*) as count FROM movies_metadata mm WHERE {condition}")
+
+
+class Workload:
+    """Sorgu parametrelerini veritabanındaki gerçek ID'lerden ve başlıklardan üretir"""
+
+    def __init__(self, engine, watched_median=WATCHED_MEDIAN, seed=42):
+        self.dialect = engine.dialect.name
+        with engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT id, title FROM movies_metadata WHERE id IS NOT NULL ORDER BY popularity DESC")).fetchall()
+            self.movie_ids = np.array([row[0] for row in rows], dtype=np.int64)
+            if not len(self.movie_ids):
+                raise ValueError("movies_metadata boş, önce import_data.py ile veri yükleyin")
+            self.user_lists = self._user_lists(engine, conn)
+        # Listeler ölçümden önce üretilir, böylece iş parçacıkları örnekleme yapmaz
+        self.watched_lists = self.user_lists or self._synthetic_lists(self.movie_ids, watched_median, seed)
+        self.search_terms = self._search_terms([row[1] for row in rows], seed)
+        self.total_pages = max(1, len(self.movie_ids) // PAGE_SIZE)
+
+    @staticmethod
+    def _user_lists(engine, conn):
+        """UserMovies varsa kullanıcı başına izlenen film ID'leri listesi"""
+        if not inspect(engine).has_table('UserMovies'):
+            return []
+        lists = {}
+        for user_id, movie_id in conn.execute(text(
+                "SELECT UserId, MoviesMetaDataId FROM UserMovies WHERE status = 'watched'")):
+            lists.setdefault(user_id, []).append(movie_id)
+        return list(lists.values())
+
+    @staticmethod
+    def _synthetic_lists(movie_ids, median, seed):
+        """Log-normal boyutlu, popüler filmlerin daha sık seçildiği izleme listeleri"""
+        rng = np.random.default_rng(seed)
+        popularity = 1.0 / np.arange(1, len(movie_ids) + 1) ** 0.8
+        popularity /= popularity.sum()
+        sizes = np.clip(rng.lognormal(np.log(median), WATCHED_SIGMA, SYNTHETIC_LISTS), 1, len(movie_ids))
+        return [movie_ids[rng.choice(len(movie_ids), int(size), replace=False, p=popularity)].tolist()
+                for size in sizes]
+
+    @staticmethod
+    def _search_terms(titles, seed):
+        """Başlıklardan seçilen kelime ve kelime başları (controller'daki gibi aranır)"""
+        rng = np.random.default_rng(seed)
+        words = [word for title in titles if isinstance(title, str) for word in title.lower().split()
+                 if len(word) >= 3 and word.isalpha()]
+        if not words:
+            return ['the']
+        picks = rng.choice(len(words), min(SEARCH_TERM_COUNT, len(words)), replace=False)
+        return [words[i][:max(3, int(rng.integers(3, len(words[i]) + 1)))] for i in picks]
+
+    def page_offset(self, rng):
+        # Kullanıcıların çoğu ilk sayfalarda kalır
+        return int(min(rng.geometric(0.3) - 1, self.total_pages - 1)) * PAGE_SIZE
+
+    def statement(self, query_type, rng):
+        """Sorgu türü için (SQL, parametreler) döndürür"""
+        if query_type == 'candidates':
+            return candidate_query(self.watched_lists[rng.integers(len(self.watched_lists))], self.dialect), {}
+        if query_type == 'list_page':
+            sort_by = SORT_COLUMNS[rng.choice(len(SORT_COLUMNS), p=SORT_WEIGHTS)]
+            sort_order = 'ASC' if sort_by == 'title' else 'DESC'
+            return list_page_query(sort_by, sort_order), {'limit': PAGE_SIZE, 'offset': self.page_offset(rng)}
+        if query_type == 'list_count':
+            return LIST_COUNT_QUERY, {}
+        condition, search = search_condition(self.search_terms[rng.integers(len(self.search_terms))],
+                                             self.dialect)
+        if query_type == 'search_page':
+            return search_page_query(condition), {'search': search, 'limit': PAGE_SIZE, 'offset': 0}
+        return search_count_query(condition), {'search': search}
+
+
+def parse_mix(specs):
+    """'candidates=1' gibi değerlerden sorgu türü -> ağırlık eşlemesi"""
+    mix = dict(DEFAULT_MIX) if not specs else {}
+    for spec in specs or []:
+        query_type, _, weight = spec.partition('=')
+        if query_type not in QUERY_TYPES:
+            raise ValueError(f"Bilinmeyen sorgu türü: {query_type}")
+        mix[query_type] = float(weight or 1)
+    return {query_type: weight for query_type, weight in mix.items() if weight > 0}
+
+
+def run_worker(engine, workload, mix, start_at, measure_at, end_at, seed):
+    """Bir iş parçacığı: bitiş zamanına kadar karışımdan sorgu seçip çalıştırır
+
+    Isınma süresindeki sorgular sayılmaz. (tür, gecikme ms, satır sayısı, hata) listesi döndürür.
+    """
+    rng = np.random.default_rng(seed)
+    query_types = list(mix)
+    weights = np.array([mix[query_type] for query_type in query_types], dtype=np.float64)
+    weights /= weights.sum()
+    samples = []
+    with engine.connect() as conn:
+        # Tüm iş parçacıkları bağlantılarını aldıktan sonra birlikte başlar
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+        while True:
+            query_type = query_types[rng.choice(len(query_types), p=weights)]
+            statement, params = workload.statement(query_type, rng)
+            started = time.perf_counter()
+            if started >= end_at:
+                break
+            error = None
+            rows = 0
+            try:
+                rows = len(conn.execute(statement, params).fetchall())
+            except Exception as e:
+                error = str(e).splitlines()[0]
+                conn.rollback()
+            finished = time.perf_counter()
+            if started >= measure_at:
+                samples.append((query_type, (finished - started) * 1000, rows, error))
+    return samples
+
+
+def summarize(samples, seconds):
+    """Sorgu türü başına gecikme yüzdelikleri ve QPS"""
+    by_type = {}
+    for query_type, latency, rows, error in samples:
+        entry = by_type.setdefault(query_type, {'latencies': [], 'rows': 0, 'errors': 0, 'last_error': None})
+        if error is None:
+            entry['latencies'].append(latency)
+            entry['rows'] += rows
+        else:
+            entry['errors'] += 1
+            entry['last_error'] = error
+
+    summary = {}
+    for query_type in QUERY_TYPES:
+        if query_type not in by_type:
+            continue
+        entry = by_type[query_type]
+        latencies = np.array(entry['latencies'])
+        record = {'count': len(latencies), 'errors': entry['errors'], 'qps': round(len(latencies) / seconds, 2)}
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            record.update(p50_ms=round(p50, 3), p95_ms=round(p95, 3), p99_ms=round(p99, 3),
+                          mean_ms=round(float(latencies.mean()), 3), max_ms=round(float(latencies.max()), 3),
+                          rows_mean=round(entry['rows'] / len(latencies), 1))
+        if entry['last_error']:
+            record['last_error'] = entry['last_error']
+        summary[query_type] = record
+    return summary
+
+
+def run_level(database_url, workload, mix, concurrency, duration, warmup, seed):
+    """Bir eşzamanlılık düzeyini ölçer; bağlantı havuzu iş parçacığı sayısı kadardır"""
+    engine = create_db_engine(database_url, pool_size=concurrency, max_overflow=0)
+    start_at = time.perf_counter() + 0.5
+    measure_at = start_at + warmup
+    end_at = measure_at + duration
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(run_worker, engine, workload, mix, start_at, measure_at, end_at,
+                                       [seed, concurrency, worker]) for worker in range(concurrency)]
+            samples = [sample for future in futures for sample in future.result()]
+    finally:
+        engine.dispose()
+    # Bitiş zamanını aşan son sorgular da sayıldığından gerçek ölçüm süresi kullanılır
+    seconds = max(duration, time.perf_counter() - measure_at)
+    queries = summarize(samples, seconds)
+    return {
+        'concurrency': concurrency,
+        'seconds': round(seconds, 3),
+        'total_qps': round(sum(record['count'] for record in queries.values()) / seconds, 2),
+        'queries': queries,
+    }
+
+
+def print_level(level):
+    print(f"\n=== eşzamanlılık {level['concurrency']}: {level['total_qps']:.1f} sorgu/sn "
+          f"({level['seconds']:.1f} sn) ===")
+    print(f"{'sorgu':<14} {'adet':>7} {'hata':>5} {'QPS':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'en çok ms':>10} {'satır':>7}")
+    for query_type, record in level['queries'].items():
+        if not record['count']:
+            print(f"{query_type:<14} {0:>7} {record['errors']:>5}  {record.get('last_error', '')}")
+            continue
+        print(f"{query_type:<14} {record['count']:>7,} {record['errors']:>5} {record['qps']:>8.1f} "
+              f"{record['p50_ms']:>9.2f} {record['p95_ms']:>9.2f} {record['p99_ms']:>9.2f} "
+              f"{record['max_ms']:>10.2f} {record['rows_mean']:>7.0f}")
+
+
+def compare_results(previous, levels, threshold):
+    """Aynı eşzamanlılık/sorgu türü gecikmelerini önceki çalıştırmayla karşılaştırır"""
+    previous_levels = {level['concurrency']: level for level in previous.get('levels', [])}
+    print(f"\n=== Karşılaştırma: {previous.get('label') or previous.get('created_at')} (eşik x{threshold:.2f}) ===")
+    regressions = 0
+    for level in levels:
+        old = previous_levels.get(level['concurrency'])
+        if old is None:
+            print(f"eşzamanlılık {level['concurrency']}: önceki sonuç yok")
+            continue
+        for query_type, record in level['queries'].items():
+            old_record = old['queries'].get(query_type)
+            if not old_record or not old_record.get('p95_ms') or not record.get('p95_ms'):
+                continue
+            ratio = record['p95_ms'] / old_record['p95_ms']
+            mark = '  <-- yavaşladı' if ratio > threshold else ''
+            regressions += bool(mark)
+            print(f"c={level['concurrency']:<3} {query_type:<14} "
+                  f"p50 {old_record['p50_ms']:>8.2f} -> {record['p50_ms']:>8.2f}  "
+                  f"p95 {old_record['p95_ms']:>8.2f} -> {record['p95_ms']:>8.2f}  "
+                  f"p99 {old_record['p99_ms']:>8.2f} -> {record['p99_ms']:>8.2f} ms  "
+                  f"QPS {old_record['qps']:>7.1f} -> {record['qps']:>7.1f}  x{ratio:.2f}{mark}")
+    print(f"{regressions} sorgu türünün p95'i eşikten fazla yavaşladı")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Backend sorgularıyla veritabanı yük ve gecikme ölçümü")
+    parser.add_argument('--database-url', default=None,
+                        help="Ölçülecek veritabanı (varsayılan: DATABASE_URL veya .env'deki MySQL)")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help="Ölçülecek eşzamanlı iş parçacığı (ve havuz bağlantısı) sayıları")
+    parser.add_argument('--duration', type=float, default=30,
+                        help="Her eşzamanlılık düzeyinde ölçüm süresi (sn)")
+    parser.add_argument('--warmup', type=float, default=3,
+                        help="Ölçüme katılmayan ısınma süresi (sn)")
+    parser.add_argument('--mix', nargs='+', default=None, metavar='TÜR=AĞIRLIK',
+                        help="Sorgu karışımı, ör. candidates=1 list_page=4 (varsayılan: "
+                             + ' '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()) + ")")
+    parser.add_argument('--watched-median', type=int, default=WATCHED_MEDIAN,
+                        help="UserMovies yoksa sentetik izleme listelerinin medyan boyutu (NOT IN listesi)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--label', default=None,
+                        help="Sonuç dosyasına yazılan etiket, ör. 'indeks öncesi'")
+    parser.add_argument('--output', default=None,
+                        help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--compare', default=None,
+                        help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="p95'i bu oranın üzerinde artan sorgu türleri işaretlenir")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or get_database_url()
+    mix = parse_mix(args.mix)
+    engine = create_db_engine(database_url)
+    workload = Workload(engine, args.watched_median, args.seed)
+    source = 'UserMovies' if workload.user_lists else f'sentetik (medyan {args.watched_median})'
+    print(f"{engine.dialect.name}: {len(workload.movie_ids)} film, izleme listeleri: {source}, "
+          f"karışım: {mix}")
+    engine.dispose()
+
+    levels = []
+    for concurrency in args.concurrency:
+        level = run_level(database_url, workload, mix, concurrency, args.duration, args.warmup, args.seed)
+        print_level(level)
+        levels.append(level)
+
+    if args.output:
+        report = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'label': args.label,
+            'database': engine.dialect.name,
+            'movies': len(workload.movie_ids),
+            'mix': mix,
+            'duration': args.duration,
+            'levels': levels,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSonuçlar yazıldı: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(json.load(f), levels, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+import_data.py için sentetik ölçekli aktarım ölçümü.
+
+Gerçek veri setiyle aynı biçimde sentetik movies_metadata, keywords, credits
+ve links arşivleri üretir: Python literal JSON sütunları, tekrarlanan ID'ler,
+movies_metadata'da olmayan ID'ler ve sütunları kaymış bozuk satırlar.
+Ölçek 1x, gerçek veri setinin satır sayılarıdır. Her ölçekte tablolar
+import_data.py'nin yükleme fonksiyonlarıyla yüklenir, ardından indeks aşaması
+çalışır. Aşama başına (read_csv, clean, dedupe, write, side_tables, index)
+süre, satır/sn ve en yüksek RSS import_metrics ile ölçülür, yazdırılır ve JSON
+olarak kaydedilir. --compare ile önceki bir çalıştırmanın sonuçlarıyla
+karşılaştırılır.
+
+Veritabanı --database-url veya DATABASE_URL ile seçilir. Verilmezse her ölçek
+için geçici bir SQLite dosyası kullanılır.
+
+    python bench_import.py --scales 1 10 50
+    python bench_import.py --scales 0.1 --writer to_sql
+    python bench_import.py --scales 1 --database-url mysql+pymysql://u:p@localhost/bench
+    python bench_import.py --scales 1 --compare bench_import_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import import_data
+from bulk_writer import DEFAULT_BATCH_SIZE, get_writer
+from db import create_db_engine
+from import_metrics import StageMetrics
+from table_indexes import build_indexes
+
+# Gerçek veri setindeki satır sayıları (1x)
+REAL_ROW_COUNTS = {
+    'movies_metadata': 45466,
+    'links': 45843,
+    'keywords': 46419,
+    'credits': 45476,
+}
+
+SOURCE_FILES = {
+    'movies_metadata': 'movies_metadata.csv.zip',
+    'links': 'links.csv',
+    'keywords': 'keywords.csv.zip',
+    'credits': 'credits.csv.zip',
+}
+
+TABLE_ORDER = ['movies_metadata', 'links', 'keywords', 'credits']
+
+# Gerçek veri setine yakın oranlar
+DUPLICATE_RATES = {'movies_metadata': 0.001, 'links': 0.0, 'keywords': 0.02, 'credits': 0.001}
+ORPHAN_RATE = 0.01
+MALFORMED_RATE = 0.0005
+
+GENRES = [(28, 'Action'), (12, 'Adventure'), (16, 'Animation'), (35, 'Comedy'), (80, 'Crime'),
+          (99, 'Documentary'), (18, 'Drama'), (10751, 'Family'), (14, 'Fantasy'), (36, 'History'),
+          (27, 'Horror'), (10402, 'Music'), (9648, 'Mystery'), (10749, 'Romance'),
+          (878, 'Science Fiction'), (53, 'Thriller'), (10752, 'War'), (37, 'Western')]
+WORDS = ('love war family friend city night death life world man woman young secret story '
+         'journey police killer dream house school team money power king girl boy home').split()
+CREW_JOBS = [('Directing', 'Director'), ('Writing', 'Screenplay'), ('Writing', 'Writer'),
+             ('Production', 'Producer'), ('Sound', 'Original Music Composer'),
+             ('Camera', 'Director of Photography'), ('Editing', 'Editor')]
+
+GENERATE_CHUNK = 20000
+MANIFEST = 'generated.json'
+# Üretilen verinin biçimi değiştiğinde artırılır; eski veri yeniden üretilir
+DATA_FORMAT = 2
+# links.movieId için TMDB ID'lerinin karıştırıldığı asal modül (2^24 - 3)
+MOVIELENS_ID_MODULUS = 16777213
+
+
+def literal(entries):
+    """Kaynak CSV'lerdeki gibi Python literal liste metni"""
+    return '[' + ', '.join(entries) + ']'
+
+
+def chunk_ids(start, count, total_so_far, duplicate_rate, orphan_rate, rng):
+    """Bir parçanın ID'leri: yeni ID'ler, önceki ID'lerin tekrarları ve yetim ID'ler"""
+    ids = np.arange(start, start + count) * 3 + 2
+    n_duplicates = rng.binomial(count, duplicate_rate) if duplicate_rate else 0
+    if n_duplicates:
+        ids = np.concatenate([ids, rng.integers(0, start + count, n_duplicates) * 3 + 2])
+    n_orphans = rng.binomial(count, orphan_rate) if orphan_rate else 0
+    if n_orphans:
+        # Film ID'leri 3'e bölümünden 2 kalır, diğerleri movies_metadata'da yoktur
+        ids = np.concatenate([ids, rng.integers(0, total_so_far, n_orphans) * 3])
+    rng.shuffle(ids)
+    return ids
+
+
+def movie_frame(ids, rng):
+    """movies_metadata satırları (bazıları sütunları kaymış bozuk satır)"""
+    n = len(ids)
+    rows = []
+    genre_counts = rng.integers(0, 4, n)
+    release_days = rng.integers(0, 365 * 70, n)
+    popularity = rng.gamma(1.5, 3.0, n)
+    vote_average = np.round(rng.normal(6.0, 1.2, n).clip(0, 10), 1)
+    vote_count = rng.zipf(1.6, n).clip(0, 15000)
+    runtime = rng.integers(60, 180, n)
+    for i, movie_id in enumerate(ids):
+        if rng.random() < MALFORMED_RATE:
+            # Gerçek veri setindeki gibi overview içindeki satır sonu sütunları kaydırmış satır
+            rows.append({'adult': ' - Written by Unknown', 'belongs_to_collection': '0.065736',
+                         'budget': '/ff9qCepilowshEtG2GYWwzt2bs4.jpg',
+                         'genres': "[{'name': 'Carousel Productions', 'id': 11176}]",
+                         'homepage': "[{'iso_3166_1': 'CA', 'name': 'Canada'}]",
+                         'id': '1997-08-20', 'imdb_id': '0', 'original_language': '104.0',
+                         'original_title': "[{'iso_639_1': 'en', 'name': 'English'}]",
+                         'overview': 'Released', 'popularity': 'Midnight Man', 'poster_path': 'False',
+                         'production_companies': '6.0', 'production_countries': '1.0'})
+            continue
+        genres = [GENRES[g] for g in rng.choice(len(GENRES), genre_counts[i], replace=False)]
+        words = rng.choice(WORDS, 30)
+        rows.append({
+            'adult': 'False',
+            'belongs_to_collection': (f"{{'id': {movie_id + 1}, 'name': 'Collection {movie_id}', "
+                                      f"'poster_path': '/c{movie_id}.jpg', 'backdrop_path': None}}"
+                                      if movie_id % 10 == 2 else None),
+            'budget': str(int(rng.integers(0, 5)) * 10_000_000),
+            'genres': literal(f"{{'id': {gid}, 'name': '{name}'}}" for gid, name in genres),
+            'homepage': f'http://example.com/{movie_id}' if movie_id % 5 == 0 else None,
+            'id': str(movie_id),
+            'imdb_id': f'tt{movie_id:07d}',
+            'original_language': 'en',
+            'original_title': f"The {words[0].title()} of {words[1].title()} {movie_id}",
+            'overview': ' '.join(words).capitalize() + '.',
+            'popularity': f'{popularity[i]:.6f}',
+            'poster_path': f'/p{movie_id}.jpg',
+            'production_companies': f"[{{'name': 'Studio {movie_id % 500}', 'id': {movie_id % 500}}}]",
+            'production_countries': "[{'iso_3166_1': 'US', 'name': 'United States of America'}]",
+            'release_date': str(np.datetime64('1950-01-01') + release_days[i]),
+            'revenue': float(rng.integers(0, 5) * 25_000_000),
+            'runtime': float(runtime[i]),
+            'spoken_languages': "[{'iso_639_1': 'en', 'name': 'English'}]",
+            'status': 'Released',
+            'tagline': f"{words[2].title()} never ends." if movie_id % 3 == 0 else None,
+            'title': f"The {words[0].title()} of {words[1].title()} {movie_id}",
+            'video': 'False',
+            'vote_average': vote_average[i],
+            'vote_count': float(vote_count[i]),
+        })
+    columns = ['adult', 'belongs_to_collection', 'budget', 'genres', 'homepage', 'id', 'imdb_id',
+               'original_language', 'original_title', 'overview', 'popularity', 'poster_path',
+               'production_companies', 'production_countries', 'release_date', 'revenue', 'runtime',
+               'spoken_languages', 'status', 'tagline', 'title', 'video', 'vote_average', 'vote_count']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def keyword_frame(ids, rng):
+    counts = rng.poisson(6, len(ids))
+    keywords = []
+    for count in counts:
+        keyword_ids = np.minimum(rng.zipf(1.4, count), 20000)
+        keywords.append(literal(f"{{'id': {k}, 'name': 'keyword {k}'}}" for k in keyword_ids))
+    return pd.DataFrame({'id': ids, 'keywords': keywords})
+
+
+def credit_frame(ids, rng):
+    cast, crew = [], []
+    for movie_id, n_cast, n_crew in zip(ids, rng.poisson(12, len(ids)), rng.poisson(10, len(ids))):
+        people = rng.integers(1, 500000, n_cast + n_crew)
+        cast.append(literal(
+            f"{{'cast_id': {order + 1}, 'character': 'Character {order}', 'credit_id': '{movie_id:x}c{order}', "
+            f"'gender': {order % 3}, 'id': {people[order]}, 'name': 'Actor {people[order]}', "
+            f"'order': {order}, 'profile_path': None}}"
+            for order in range(n_cast)))
+        entries = []
+        for j in range(n_crew):
+            department, job = CREW_JOBS[j % len(CREW_JOBS)]
+            person = people[n_cast + j]
+            entries.append(f"{{'credit_id': '{movie_id:x}w{j}', 'department': '{department}', 'gender': 0, "
+                           f"'id': {person}, 'job': '{job}', 'name': 'Person {person}', 'profile_path': None}}")
+        crew.append(literal(entries))
+    return pd.DataFrame({'cast': cast, 'crew': crew, 'id': ids})
+
+
+def movielens_ids(tmdb_ids):
+    """TMDB ID'lerinden farklı, bire bir MovieLens ID'leri (asal modülde doğrusal permütasyon)
+
+    movieId == tmdbId olsaydı links'i yanlış sütundan birleştiren bir sorgu da
+    doğru sonuç verirdi.
+    """
+    tmdb_ids = np.asarray(tmdb_ids, dtype=np.int64)
+    if len(tmdb_ids) and tmdb_ids.max() >= MOVIELENS_ID_MODULUS - 1:
+        raise ValueError("Ölçek çok büyük: TMDB ID'leri MOVIELENS_ID_MODULUS sınırını aşıyor")
+    return (tmdb_ids + 1) * 48271 % MOVIELENS_ID_MODULUS
+
+
+def link_frame(ids, rng):
+    # links.csv'de movieId MovieLens ID'sidir, tmdbId bazen boştur ve float yazılır
+    tmdb_ids = pd.Series(ids, dtype='float64')
+    tmdb_ids[rng.random(len(ids)) < 0.005] = np.nan
+    return pd.DataFrame({'movieId': movielens_ids(ids), 'imdbId': [f'{i:07d}' for i in ids],
+                         'tmdbId': tmdb_ids})
+
+
+FRAME_BUILDERS = {
+    'movies_metadata': movie_frame,
+    'links': link_frame,
+    'keywords': keyword_frame,
+    'credits': credit_frame,
+}
+
+
+def generate_table(path, table_name, n_rows, rng):
+    """Tabloyu parça parça üretip CSV (gerekirse zip içinde) olarak yazar, satır sayısını döndürür"""
+    if path.endswith('.zip'):
+        archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        stream = io.TextIOWrapper(archive.open(os.path.basename(path)[:-len('.zip')], 'w'),
+                                  encoding='utf-8', newline='')
+    else:
+        archive = None
+        stream = open(path, 'w', encoding='utf-8', newline='')
+
+    written = 0
+    orphan_rate = 0.0 if table_name == 'movies_metadata' else ORPHAN_RATE
+    with stream:
+        for start in range(0, n_rows, GENERATE_CHUNK):
+            count = min(GENERATE_CHUNK, n_rows - start)
+            ids = chunk_ids(start, count, max(start, count), DUPLICATE_RATES[table_name], orphan_rate, rng)
+            frame = FRAME_BUILDERS[table_name](ids, rng)
+            frame.to_csv(stream, header=(start == 0), index=False)
+            written += len(frame)
+    if archive is not None:
+        archive.close()
+    return written
+
+
+def generate_dataset(data_dir, scale, seed=42):
+    """Ölçek için sentetik arşivleri üretir (daha önce üretildiyse yeniden kullanır)"""
+    manifest_path = os.path.join(data_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if (manifest.get('scale') == scale and manifest.get('seed') == seed
+                and manifest.get('format') == DATA_FORMAT):
+            return manifest['rows']
+
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    rows = {}
+    for table_name in TABLE_ORDER:
+        start = time.perf_counter()
+        n_rows = max(1, int(REAL_ROW_COUNTS[table_name] * scale))
+        rows[table_name] = generate_table(os.path.join(data_dir, SOURCE_FILES[table_name]), table_name, n_rows, rng)
+        print(f"  {SOURCE_FILES[table_name]}: {rows[table_name]:,} satır, {time.perf_counter() - start:.1f} sn")
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'scale': scale, 'seed': seed, 'format': DATA_FORMAT, 'rows': rows}, f)
+    return rows
+
+
+def run_import(scale_dir, chunk_size, writer, engine):
+    """Tabloları import_data.py'nin yükleme fonksiyonlarıyla sırayla yükler"""
+    import_data.data_dir = scale_dir
+    movies_df = import_data.import_movies_metadata(SOURCE_FILES['movies_metadata'], chunk_size, writer)
+    if movies_df is None:
+        raise RuntimeError("movies_metadata yüklenemedi")
+    for table_name, (label, import_func, csv_file) in import_data.DEPENDENT_TABLES.items():
+        if not import_func(csv_file, movies_df, chunk_size, writer):
+            raise RuntimeError(f"{label} yüklenemedi")
+    with import_data.metrics.stage('index'):
+        build_indexes(engine)
+
+
+def reset_database(url):
+    """Ölçümden önce veritabanını boşaltır ve motoru import_data'ya bağlar"""
+    engine = create_db_engine(url)
+    import_data.engine = engine
+    if url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):]
+        if path and os.path.exists(path):
+            os.remove(path)
+    else:
+        import_data.drop_all_tables()
+    import_data.create_tables()
+    return engine
+
+
+def run_scale(scale, data_dir, database_url, chunk_size, writer_name, batch_size, seed, verbose):
+    """Bir ölçek için veriyi üretir, tüm aşamaları ölçer ve sonuç sözlüğü döndürür"""
+    scale_dir = os.path.join(data_dir, f'{scale:g}x')
+    print(f"\n=== {scale:g}x: veri üretiliyor ({scale_dir}) ===")
+    rows = generate_dataset(scale_dir, scale, seed)
+
+    url = database_url or f"sqlite:///{os.path.abspath(os.path.join(scale_dir, 'bench.db'))}"
+    engine = reset_database(url)
+    writer = get_writer(writer_name, batch_size)
+    metrics = StageMetrics(enabled=True)
+    import_data.metrics = metrics
+
+    print(f"=== {scale:g}x: {engine.dialect.name} veritabanına yükleniyor ===")
+    start = time.perf_counter()
+    output = sys.stdout if verbose else io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            run_import(scale_dir, chunk_size, writer, engine)
+    except Exception:
+        # Gizlenen import_data çıktısı hatanın nedenini gösterir
+        if not verbose:
+            print(output.getvalue())
+        raise
+    finally:
+        metrics.close()
+        import_data.metrics = StageMetrics()
+    total = time.perf_counter() - start
+    engine.dispose()
+
+    stages = {}
+    for row in metrics.rows():
+        stages.setdefault(row.pop('table'), {})[row.pop('stage')] = row
+    return {
+        'scale': scale,
+        'database': engine.dialect.name,
+        'source_rows': rows,
+        'total_seconds': round(total, 3),
+        'stages': stages,
+    }
+
+
+def print_result(result):
+    print(f"{'tablo':<16} {'aşama':<12} {'süre (sn)':>10} {'satır/sn':>12} {'giriş':>10} "
+          f"{'çıkış':>10} {'RSS (MB)':>9}")
+    for table_name, stages in result['stages'].items():
+        for stage_name, record in stages.items():
+            rate = f"{record['rows_per_sec']:,}" if record['rows_per_sec'] else '-'
+            print(f"{table_name:<16} {stage_name:<12} {record['seconds']:>10.3f} {rate:>12} "
+                  f"{record['rows_in']:>10,} {record['rows_out']:>10,} {record['peak_rss_mb']:>9.1f}")
+    print(f"Toplam: {result['total_seconds']:.2f} sn")
+
+
+def compare_results(previous, results, threshold):
+    """Aynı ölçek/tablo/aşama sürelerini önceki çalıştırmayla karşılaştırır"""
+    previous_by_scale = {result['scale']: result for result in previous.get('results', [])}
+    print(f"\n=== Karşılaştırma (eşik x{threshold:.2f}) ===")
+    regressions = 0
+    for result in results:
+        old = previous_by_scale.get(result['scale'])
+        if old is None:
+            print(f"{result['scale']:g}x: önceki sonuç yok")
+            continue
+        for table_name, stages in result['stages'].items():
+            for stage_name, record in stages.items():
+                old_record = old['stages'].get(table_name, {}).get(stage_name)
+                if not old_record or not old_record['seconds']:
+                    continue
+                ratio = record['seconds'] / old_record['seconds']
+                mark = '  <-- yavaşladı' if ratio > threshold else ''
+                regressions += bool(mark)
+                print(f"{result['scale']:g}x {table_name:<16} {stage_name:<12} "
+                      f"{old_record['seconds']:>9.3f} -> {record['seconds']:>9.3f} sn  x{ratio:.2f}{mark}")
+    print(f"{regressions} aşama eşikten fazla yavaşladı")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Sentetik veriyle import_data.py aşama ölçümü")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 50],
+                        help="Gerçek veri setine göre ölçekler")
+    parser.add_argument('--data-dir', default='./bench_data',
+                        help="Sentetik arşivlerin (ve varsayılan SQLite dosyalarının) dizini")
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                        help="Ölçüm veritabanı (varsayılan: ölçek başına yerel SQLite). Tablolar silinir!")
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--writer', default='multirow',
+                        help="Yazıcı: to_sql, multirow veya infile (yalnızca MySQL)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_import_results.json',
+                        help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--compare', default=None,
+                        help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Bu oranın üzerindeki yavaşlamalar işaretlenir")
+    parser.add_argument('--verbose', action='store_true',
+                        help="import_data.py çıktılarını gösterir")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results = []
+    for scale in args.scales:
+        result = run_scale(scale, args.data_dir, args.database_url, args.chunk_size, args.writer,
+                           args.batch_size, args.seed, args.verbose)
+        print_result(result)
+        results.append(result)
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'chunk_size': args.chunk_size,
+        'writer': args.writer,
+        'batch_size': args.batch_size,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSonuçlar yazıldı: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(json.load(f), results, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+ratings_store.py için sentetik MovieLens puan dosyasıyla kurulum ölçümü.
+
+Veri dizinindeki links.csv'den MovieLens biçiminde (userId,movieId,rating,
+timestamp) bir puan dosyası üretilir: kullanıcı başına Poisson dağılımlı puan
+sayısı, film popülerliği kuvvet yasası, yarım yıldız adımlı puanlar ve
+links.csv'de olmayan MovieLens ID'leri (--unknown oranında). Satırlar gerçek
+dosyadaki gibi kullanıcıya, kullanıcı içinde movieId'ye göre sıralıdır.
+
+Her kullanıcı sayısı için depo ayrı bir süreçte kurulur; süre, satır/sn, en
+yüksek RSS artışı ve depo boyutu yazdırılır. --check ile depo, dosyanın
+tamamı pandas ile okunup eşlenerek kurulan referansla karşılaştırılır
+(yalnızca küçük ölçeklerde kullanın).
+
+    python bench_ratings_store.py --data-dir ./bench_data/1x --users 1000 100000
+    python bench_ratings_store.py --data-dir ../data --users 270000 --avg-ratings 96 --output ratings_bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import import_data
+from import_data import read_csv_chunks
+from import_metrics import RssSampler, current_rss
+from ratings_store import (RATINGS_COLUMNS, RATINGS_DTYPES, READ_CHUNK_ROWS, build_ratings_store,
+                           load_ratings_store, movielens_crosswalk)
+
+USER_CHUNK = 20000
+RATING_VALUES = np.arange(1, 11) / 2
+RATING_WEIGHTS = np.array([1, 3, 2, 7, 4, 20, 22, 27, 8, 15], dtype=np.float64)
+
+
+def generate_ratings(path, movielens_ids, n_users, avg_ratings, unknown_ratio, seed=42):
+    """MovieLens biçiminde puan dosyasını kullanıcı blokları halinde yazar, satır sayısını döndürür"""
+    movielens_ids = np.asarray(movielens_ids, dtype=np.int64)
+    popularity = 1.0 / np.arange(1, len(movielens_ids) + 1) ** 0.9
+    popularity /= popularity.sum()
+    unknown_base = int(movielens_ids.max()) + 1
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('userId,movieId,rating,timestamp\n')
+        for start in range(0, n_users, USER_CHUNK):
+            rng = np.random.default_rng([seed, start])
+            users = np.arange(start + 1, min(start + USER_CHUNK, n_users) + 1)
+            counts = np.maximum(rng.poisson(avg_ratings, len(users)), 1)
+            frame = pd.DataFrame({
+                'userId': np.repeat(users, counts),
+                'movieId': movielens_ids[rng.choice(len(movielens_ids), counts.sum(), p=popularity)],
+            })
+            unknown = rng.random(len(frame)) < unknown_ratio
+            frame.loc[unknown, 'movieId'] = unknown_base + rng.integers(0, 1000, int(unknown.sum()))
+            frame = frame.drop_duplicates().sort_values(['userId', 'movieId'])
+            frame['rating'] = rng.choice(RATING_VALUES, len(frame), p=RATING_WEIGHTS / RATING_WEIGHTS.sum())
+            frame['timestamp'] = rng.integers(789652009, 1501829500, len(frame))
+            frame.to_csv(f, header=False, index=False)
+            written += len(frame)
+    return written
+
+
+def read_crosswalk(data_dir):
+    links = next(read_csv_chunks(os.path.join(data_dir, 'links.csv'), usecols=['movieId', 'tmdbId']))
+    return movielens_crosswalk(links)
+
+
+def reference_check(ratings_path, crosswalk, store):
+    """Deponun, tüm dosya bellekte eşlenip sıralanarak kurulan referansla aynı olduğunu doğrular"""
+    movielens_ids, tmdb_ids = crosswalk
+    ratings = pd.read_csv(ratings_path, usecols=RATINGS_COLUMNS)
+    ratings = ratings.merge(pd.DataFrame({'movieId': movielens_ids, 'tmdbId': tmdb_ids}), on='movieId')
+    ratings = ratings.sort_values(['userId', 'tmdbId'])
+    matrix = store.matrix()
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    checks = {
+        'nnz': len(ratings) == matrix.nnz,
+        'users': np.array_equal(store.user_ids[rows], ratings['userId'].to_numpy()),
+        'items': np.array_equal(store.item_ids[matrix.indices], ratings['tmdbId'].to_numpy()),
+        'ratings': np.array_equal(matrix.data / store.meta['rating_scale'], ratings['rating'].to_numpy()),
+    }
+    for name, ok in checks.items():
+        if not ok:
+            raise AssertionError(f"Depo referansla uyuşmuyor: {name}")
+    return True
+
+
+def _directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 ** 2
+
+
+def measure(data_dir, n_users, avg_ratings, unknown_ratio, chunk_size, check):
+    """Ayrı süreçte çalışır: puan dosyasını üretir, depoyu kurar ve ölçer"""
+    crosswalk = read_crosswalk(data_dir)
+    with tempfile.TemporaryDirectory() as tmp:
+        ratings_path = os.path.join(tmp, 'ratings.csv')
+        start = time.perf_counter()
+        rows = generate_ratings(ratings_path, crosswalk[0], n_users, avg_ratings, unknown_ratio)
+        generate_seconds = time.perf_counter() - start
+
+        sampler = RssSampler(interval=0.01)
+        sampler.start()
+        start_rss = current_rss()
+        start = time.perf_counter()
+        path = os.path.join(tmp, 'ratings_store')
+        chunks = read_csv_chunks(ratings_path, chunk_size, usecols=RATINGS_COLUMNS, dtype=RATINGS_DTYPES)
+        meta = build_ratings_store(chunks, crosswalk, path)
+        elapsed = time.perf_counter() - start
+        peak = max(sampler.peak, current_rss())
+        sampler.stop()
+
+        result = {
+            'users': n_users,
+            'rows': rows,
+            'csv_mb': round(os.path.getsize(ratings_path) / 1024 ** 2, 1),
+            'store_mb': round(_directory_mb(path), 1),
+            'nnz': meta['nnz'],
+            'skipped_rows': meta['skipped_rows'],
+            'generate_seconds': round(generate_seconds, 3),
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': int(rows / elapsed) if elapsed > 0 else 0,
+            'peak_rss_delta_mb': round((peak - start_rss) / 1024 ** 2, 1),
+        }
+        if check:
+            result['check'] = reference_check(ratings_path, crosswalk, load_ratings_store(path))
+    return result
+
+
+def print_report(results):
+    print(f"{'kullanıcı':>10} {'satır':>12} {'CSV MB':>8} {'depo MB':>8} {'atlanan':>9} "
+          f"{'süre sn':>8} {'satır/sn':>11} {'tepe MB':>8} {'doğrulama':>10}")
+    for result in results:
+        check = {True: 'tamam', None: '-'}.get(result.get('check'))
+        print(f"{result['users']:>10,} {result['rows']:>12,} {result['csv_mb']:>8.1f} {result['store_mb']:>8.1f} "
+              f"{result['skipped_rows']:>9,} {result['seconds']:>8.2f} {result['rows_per_sec']:>11,} "
+              f"{result['peak_rss_delta_mb']:>8.1f} {check:>10}")
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="MovieLens puan deposu kurulum ölçümü")
+    parser.add_argument('--data-dir', default=import_data.DEFAULT_DATA_DIR,
+                        help="links.csv'nin bulunduğu dizin")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 100000],
+                        help="Üretilecek sentetik kullanıcı sayıları")
+    parser.add_argument('--avg-ratings', type=float, default=96,
+                        help="Kullanıcı başına ortalama puan sayısı (MovieLens tam veri setinde ~96)")
+    parser.add_argument('--unknown', type=float, default=0.01,
+                        help="links.csv'de olmayan MovieLens ID'li puan oranı")
+    parser.add_argument('--chunk-size', type=int, default=READ_CHUNK_ROWS,
+                        help="Puan dosyasından tek seferde okunan satır sayısı")
+    parser.add_argument('--check', action='store_true',
+                        help="Depoyu pandas referansıyla karşılaştır (tüm dosyayı belleğe okur)")
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results = []
+    # Her ölçek temiz bir süreçte ölçülür, böylece tepe RSS birbirini etkilemez
+    context = multiprocessing.get_context('spawn')
+    for n_users in args.users:
+        print(f"{n_users} kullanıcı ölçülüyor...")
+        with context.Pool(1) as pool:
+            results.append(pool.apply(measure, (args.data_dir, n_users, args.avg_ratings, args.unknown,
+                                                args.chunk_size, args.check)))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'data_dir': args.data_dir,
+                       'results': results}, f, indent=2)
+        print(f"Sonuçlar yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
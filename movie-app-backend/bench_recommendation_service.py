@@ -0,0 +1,129 @@
+"""
+recommendation_service.py için gecikme ölçümü.
+
+Var olan bir özellik deposu (--feature-store) ya da gerçek katalog
+boyutlarında sentetik olarak üretilen bir depo üzerinde rastgele izleme
+listeleriyle tüm katalog puanlamasını ölçer ve p50/p95/p99 sürelerini
+hedefle (varsayılan 50 ms) karşılaştırır. Ölçüm tek çekirdekte yapılmalıdır:
+
+    OMP_NUM_THREADS=1 python bench_recommendation_service.py --movies 45000
+    OMP_NUM_THREADS=1 python bench_recommendation_service.py --feature-store ./feature_store
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from feature_store import NUMERIC_COLUMNS, export_feature_store, load_feature_store
+from movie_features import normalize_rows
+from recommendation_service import Recommender
+
+
+def random_block(rng, n_rows, n_features, per_row):
+    """Satır başına ortalama per_row sıfır olmayan değerli, normalize rastgele blok"""
+    counts = rng.poisson(per_row, n_rows)
+    rows = np.repeat(np.arange(n_rows), counts)
+    # Zipf dağılımı gerçek kelime sıklıklarına benzer
+    columns = np.minimum(rng.zipf(1.3, len(rows)) - 1, n_features - 1)
+    values = rng.random(len(rows)).astype(np.float32) + 0.1
+    matrix = sp.csr_matrix((values, (rows, columns)), shape=(n_rows, n_features))
+    matrix.sum_duplicates()
+    return normalize_rows(matrix)
+
+
+def synthetic_store(path, n_movies, seed=42):
+    """Gerçek katalog boyutlarına yakın sentetik özellik deposu üretir"""
+    rng = np.random.default_rng(seed)
+    features = {
+        'ids': np.sort(rng.choice(n_movies * 10, n_movies, replace=False)).astype(np.int64),
+        'text': random_block(rng, n_movies, 30000, 40),
+        'genre': random_block(rng, n_movies, 20, 2.5),
+        'keyword': random_block(rng, n_movies, 20000, 7),
+        'vocabulary': np.array([f'w{i}' for i in range(30000)]),
+        'genre_ids': np.arange(20, dtype=np.int64),
+        'keyword_ids': np.arange(20000, dtype=np.int64),
+    }
+    numeric = np.column_stack([
+        np.clip(rng.normal(6, 1.2, n_movies), 0, 10),
+        rng.integers(0, 10000, n_movies),
+        rng.exponential(3, n_movies),
+        rng.normal(100, 20, n_movies),
+        rng.integers(1920, 2018, n_movies),
+    ]).astype(np.float32)
+    assert numeric.shape[1] == len(NUMERIC_COLUMNS)
+    return export_feature_store(path, features, numeric)
+
+
+def percentile_report(label, timings_ms):
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99])
+    print(f"{label:<28} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms   p99 {p99:7.2f} ms")
+    return p95
+
+
+def run_benchmark(store, requests, watched_sizes, limit, seed=7):
+    """Her izleme listesi boyutu için gecikmeleri ölçer, en kötü p95'i döndürür"""
+    rng = np.random.default_rng(seed)
+    recommender = Recommender(store)
+    ids = np.asarray(store.ids)
+
+    # İlk çağrı sayfaları belleğe alır, ölçüme dahil edilmez
+    recommender.recommend(ids[:5].tolist(), limit)
+
+    worst_p95 = 0.0
+    for size in watched_sizes:
+        timings = []
+        for _ in range(requests):
+            watched = rng.choice(ids, min(size, len(ids)), replace=False).tolist()
+            start = time.perf_counter()
+            recommender.recommend(watched, limit)
+            timings.append((time.perf_counter() - start) * 1000)
+        worst_p95 = max(worst_p95, percentile_report(f"{size} izlenen film", timings))
+    return worst_p95
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Öneri servisi puanlama gecikmesi ölçümü")
+    parser.add_argument('--feature-store', default=None,
+                        help="Ölçülecek özellik deposu (verilmezse sentetik depo üretilir)")
+    parser.add_argument('--movies', type=int, default=45000,
+                        help="Sentetik depodaki film sayısı")
+    parser.add_argument('--requests', type=int, default=200,
+                        help="Her izleme listesi boyutu için istek sayısı")
+    parser.add_argument('--watched', type=int, nargs='+', default=[5, 50, 500],
+                        help="Denenecek izleme listesi boyutları")
+    parser.add_argument('--limit', type=int, default=25)
+    parser.add_argument('--target-ms', type=float, default=50.0,
+                        help="p95 gecikme hedefi (ms)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if 'OMP_NUM_THREADS' not in os.environ:
+        print("Uyarı: tek çekirdek ölçümü için OMP_NUM_THREADS=1 ile çalıştırın")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.feature_store
+        if path is None:
+            start = time.perf_counter()
+            path = synthetic_store(tmp_dir, args.movies)
+            print(f"Sentetik depo üretildi: {args.movies} film ({time.perf_counter() - start:.1f} sn)")
+        store = load_feature_store(path)
+        print(f"{len(store)} film, text {store.text.shape[1]} / genre {store.genre.shape[1]} / "
+              f"keyword {store.keyword.shape[1]} özellik")
+
+        worst_p95 = run_benchmark(store, args.requests, args.watched, args.limit)
+
+    passed = worst_p95 <= args.target_ms
+    print(f"En kötü p95: {worst_p95:.2f} ms (hedef {args.target_ms:.0f} ms) -> "
+          f"{'BAŞARILI' if passed else 'BAŞARISIZ'}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Film-film benzerlik tablosu (movie_similarity) oluşturur.
+
+Tüm movies_metadata kataloğu için içerik vektörleri (movie_features.py)
+hesaplanır, satır blokları halinde seyrek matris çarpımı ile her filmin en
+benzer K komşusu bulunur ve movie_similarity(movie_id, neighbor_id, score)
+tablosuna toplu olarak yazılır. Bellek kullanımı blok boyutu ile sınırlıdır.
+
+Çevrimiçi öneri için izlenen filmlerin komşu listelerini toplamak yeterlidir:
+
+    SELECT neighbor_id, SUM(score) AS score
+    FROM movie_similarity
+    WHERE movie_id IN (...izlenen filmler...)
+      AND neighbor_id NOT IN (...izlenen filmler...)
+    GROUP BY neighbor_id
+    ORDER BY score DESC
+    LIMIT 25
+
+Kullanım:
+    python build_similarity.py --top-k 50 --max-block-mb 256
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, Integer, Float, text
+
+from bulk_writer import bulk_load_session, get_writer, WRITERS
+from db import create_db_engine
+from movie_features import build_feature_matrices, combine_features, load_catalog
+
+SIMILARITY_TABLE = 'movie_similarity'
+BUILD_TABLE = 'movie_similarity_build'
+
+
+def similarity_table(name, metadata=None):
+    """movie_similarity tablo tanımı"""
+    return Table(
+        name,
+        metadata or MetaData(),
+        Column('movie_id', Integer, primary_key=True, autoincrement=False),
+        Column('neighbor_id', Integer, primary_key=True, autoincrement=False),
+        Column('score', Float, nullable=False)
+    )
+
+
+def auto_block_size(n_movies, max_block_mb):
+    """Yoğun benzerlik bloğu (blok x katalog, float32) bellek sınırına sığacak satır sayısı"""
+    return max(1, int(max_block_mb * 1024 * 1024 // (max(n_movies, 1) * 4)))
+
+
+def top_k_neighbors(matrix, k, block_size):
+    """Her satır bloğu için (başlangıç, komşu indeksleri, skorlar) üretir
+
+    matrix satırları film vektörleridir; skor iç çarpımdır. Film kendisiyle
+    eşleştirilmez, sonuçlar skora göre azalan sıradadır.
+    """
+    n_movies = matrix.shape[0]
+    k = min(k, n_movies - 1)
+    if k <= 0:
+        return
+    transposed = matrix.T.tocsr()
+
+    for start in range(0, n_movies, block_size):
+        end = min(start + block_size, n_movies)
+        scores = matrix[start:end].dot(transposed).toarray()
+
+        # Filmin kendisini hariç tut
+        rows = np.arange(end - start)
+        scores[rows, rows + start] = -np.inf
+
+        neighbors = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, neighbors, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        yield (start,
+               np.take_along_axis(neighbors, order, axis=1),
+               np.take_along_axis(top_scores, order, axis=1))
+
+
+def build_similarity(engine, top_k=50, max_block_mb=256, min_score=0.0, writer_name='multirow', batch_size=5000):
+    """Benzerlik tablosunu hesaplayıp yazar, toplam süreyi döndürür"""
+    start_time = time.perf_counter()
+
+    print("Katalog okunuyor...")
+    movies, genre_pairs, keyword_pairs = load_catalog(engine)
+    print(f"{len(movies)} film, {len(genre_pairs)} tür ve {len(keyword_pairs)} anahtar kelime bağlantısı okundu")
+
+    features = build_feature_matrices(movies, genre_pairs, keyword_pairs)
+    matrix = combine_features(features)
+    ids = features['ids']
+    print(f"Vektörler hazır: {matrix.shape[0]} x {matrix.shape[1]}, {matrix.nnz} sıfır olmayan değer "
+          f"({time.perf_counter() - start_time:.1f} sn)")
+
+    block_size = auto_block_size(len(ids), max_block_mb)
+    print(f"Blok boyutu: {block_size} satır")
+
+    # Yeni tablo ayrı adla doldurulur, bitince eskisinin yerine geçer
+    metadata = MetaData()
+    build_table = similarity_table(BUILD_TABLE, metadata)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BUILD_TABLE}"))
+    metadata.create_all(engine)
+
+    writer = get_writer(writer_name, batch_size)
+    pair_count = 0
+    for block_start, neighbors, scores in top_k_neighbors(matrix, top_k, block_size):
+        block = pd.DataFrame({
+            'movie_id': np.repeat(ids[block_start:block_start + len(neighbors)], neighbors.shape[1]),
+            'neighbor_id': ids[neighbors.ravel()],
+            'score': scores.ravel().astype(np.float32),
+        })
+        block = block[block['score'] > min_score]
+        with bulk_load_session(engine) as conn:
+            writer.write(block, build_table.name, conn)
+        pair_count += len(block)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {SIMILARITY_TABLE}"))
+        conn.execute(text(f"ALTER TABLE {BUILD_TABLE} RENAME TO {SIMILARITY_TABLE}"))
+
+    elapsed = time.perf_counter() - start_time
+    writer.report()
+    print(f"{SIMILARITY_TABLE} tablosu oluşturuldu: {pair_count} komşu çifti, toplam süre {elapsed:.1f} sn")
+    return elapsed
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Film-film en yakın K komşu benzerlik tablosunu oluşturur")
+    parser.add_argument('--top-k', type=int, default=50,
+                        help="Her film için saklanacak komşu sayısı")
+    parser.add_argument('--max-block-mb', type=int, default=256,
+                        help="Bir blokta hesaplanan yoğun benzerlik matrisinin en fazla boyutu (MB)")
+    parser.add_argument('--min-score', type=float, default=0.0,
+                        help="Bu skorun altındaki komşular yazılmaz")
+    parser.add_argument('--writer', choices=sorted(WRITERS), default='multirow',
+                        help="Toplu yazıcı")
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help="Yazıcının tek seferde gönderdiği satır sayısı")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    engine = create_db_engine()
+    build_similarity(engine, args.top_k, args.max_block_mb, args.min_score, args.writer, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
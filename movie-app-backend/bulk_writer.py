@@ -0,0 +1,253 @@
+"""
+Veri aktarımı için takılabilir toplu yazıcı katmanı.
+
+Yazıcılar:
+  to_sql   - pandas DataFrame.to_sql (varsayılan, eski davranış)
+  multirow - INSERT ... VALUES (...),(...) şeklinde çok satırlı toplu ekleme
+  infile   - geçici TSV dosyası + LOAD DATA LOCAL INFILE (yalnızca MySQL)
+
+Her yazıcı tablo bazında satır/saniye istatistiği tutar, böylece her tablo
+için en hızlı yazıcı seçilebilir.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 1000
+# Çok satırlı eklemede Python değerlerine bir seferde çevrilen en fazla satır sayısı
+CONVERT_BLOCK_ROWS = 10000
+
+
+@contextmanager
+def bulk_load_session(engine):
+    """Toplu yükleme için autocommit, unique ve foreign key kontrollerini kapatan oturum"""
+    is_mysql = engine.dialect.name == 'mysql'
+    with engine.connect() as conn:
+        if is_mysql:
+            conn.exec_driver_sql("SET autocommit = 0")
+            conn.exec_driver_sql("SET unique_checks = 0")
+            conn.exec_driver_sql("SET foreign_key_checks = 0")
+        # Ham imleçle yapılan yazmalar da bu işlemle birlikte onaylanır
+        if not conn.in_transaction():
+            conn.begin()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            if is_mysql:
+                conn.exec_driver_sql("SET foreign_key_checks = 1")
+                conn.exec_driver_sql("SET unique_checks = 1")
+                conn.exec_driver_sql("SET autocommit = 1")
+
+
+def _to_db_values(df):
+    """DataFrame'i veritabanı sürücüsünün anlayacağı Python değerlerine çevirir (NaN -> None)"""
+    values = df.astype(object)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            values[col] = pd.Series(df[col].dt.to_pydatetime(), index=df.index, dtype=object)
+    values = values.where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+class BaseWriter:
+    """Tüm yazıcılar için ortak istatistik takibi"""
+    name = 'base'
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        # Tablo bazında [satır sayısı, toplam süre]
+        self.stats = {}
+        # Son write çağrısında yazılan satırların indeksi
+        self.last_written_index = None
+
+    def write(self, df, table_name, conn):
+        """DataFrame'i verilen bağlantı üzerinden tabloya ekler ve satır/saniye değerini döndürür"""
+        start = time.perf_counter()
+        if len(df):
+            self._write(df, table_name, conn)
+        self.last_written_index = df.index
+        elapsed = time.perf_counter() - start
+
+        table_stats = self.stats.setdefault(table_name, [0, 0.0])
+        table_stats[0] += len(df)
+        table_stats[1] += elapsed
+
+        rate = len(df) / elapsed if elapsed > 0 else 0.0
+        print(f"[{self.name}] {table_name}: {len(df)} satır {elapsed:.2f} sn içinde yazıldı ({rate:,.0f} satır/sn)")
+        return rate
+
+    def _write(self, df, table_name, conn):
+        raise NotImplementedError
+
+    def session(self, engine):
+        """Bu yazıcının parçaları yazarken kullanacağı veritabanı oturumu"""
+        return bulk_load_session(engine)
+
+    def finish(self, table_name, conn):
+        """Tablonun tüm parçaları yazıldıktan sonra çağrılır (alt sınıflar için); silinen satır sayısını döndürür"""
+        return 0
+
+    def merge(self, other):
+        """Başka bir süreçte çalışmış aynı türdeki yazıcının istatistiklerini ekler"""
+        self.stats.update(other.stats)
+
+    def report(self):
+        """Tablo bazında toplam yazma hızını yazdırır"""
+        for table_name, (rows, elapsed) in self.stats.items():
+            rate = rows / elapsed if elapsed > 0 else 0.0
+            print(f"[{self.name}] {table_name}: toplam {rows} satır, {elapsed:.2f} sn, {rate:,.0f} satır/sn")
+
+
+class PandasWriter(BaseWriter):
+    """pandas to_sql ile yazar"""
+    name = 'to_sql'
+
+    def _write(self, df, table_name, conn):
+        # to_sql tüm DataFrame'i önce object dizilerine çevirir; bloklar halinde çağrılır
+        block_rows = max(self.batch_size, CONVERT_BLOCK_ROWS)
+        for start in range(0, len(df), block_rows):
+            df.iloc[start:start + block_rows].to_sql(table_name, conn, if_exists='append', index=False,
+                                                     chunksize=self.batch_size)
+
+
+class MultiRowInsertWriter(BaseWriter):
+    """INSERT ... VALUES (...),(...) ile batch_size satırlık toplu ekleme yapar"""
+    name = 'multirow'
+
+    def _write(self, df, table_name, conn):
+        dialect = conn.dialect
+        quote = dialect.identifier_preparer.quote
+        placeholder = '?' if dialect.paramstyle == 'qmark' else '%s'
+
+        columns = ', '.join(quote(col) for col in df.columns)
+        row_sql = '(' + ', '.join([placeholder] * len(df.columns)) + ')'
+        insert_sql = f"INSERT INTO {quote(table_name)} ({columns}) VALUES "
+        suffix = self._statement_suffix(df, table_name, conn)
+
+        # Değerler bloklar halinde çevrilir, tüm tablonun nesne kopyası bellekte tutulmaz
+        block_rows = max(self.batch_size, CONVERT_BLOCK_ROWS // self.batch_size * self.batch_size)
+        cursor = conn.connection.cursor()
+        try:
+            for block_start in range(0, len(df), block_rows):
+                rows = _to_db_values(df.iloc[block_start:block_start + block_rows])
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start:start + self.batch_size]
+                    params = [value for row in batch for value in row]
+                    cursor.execute(insert_sql + ', '.join([row_sql] * len(batch)) + suffix, params)
+        finally:
+            cursor.close()
+
+    def _statement_suffix(self, df, table_name, conn):
+        """INSERT ifadesinin sonuna eklenecek SQL (alt sınıflar için)"""
+        return ''
+
+
+class UpsertWriter(MultiRowInsertWriter):
+    """Anahtarı zaten var olan satırları güncelleyen çok satırlı toplu ekleme
+
+    MySQL'de INSERT ... ON DUPLICATE KEY UPDATE, SQLite'ta ON CONFLICT DO UPDATE
+    kullanılır. key_columns tablo adı -> anahtar sütunları eşlemesidir.
+    """
+    name = 'upsert'
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, key_columns=None):
+        super().__init__(batch_size)
+        self.key_columns = key_columns or {}
+
+    def _statement_suffix(self, df, table_name, conn):
+        quote = conn.dialect.identifier_preparer.quote
+        keys = self.key_columns.get(table_name, ['id'])
+        update_columns = [quote(col) for col in df.columns if col not in keys]
+
+        if conn.dialect.name == 'mysql':
+            if not update_columns:
+                update_columns = [quote(keys[0])]
+            assignments = ', '.join(f"{col} = VALUES({col})" for col in update_columns)
+            return f" ON DUPLICATE KEY UPDATE {assignments}"
+
+        conflict = ', '.join(quote(col) for col in keys)
+        if not update_columns:
+            return f" ON CONFLICT ({conflict}) DO NOTHING"
+        assignments = ', '.join(f"{col} = excluded.{col}" for col in update_columns)
+        return f" ON CONFLICT ({conflict}) DO UPDATE SET {assignments}"
+
+
+def _tsv_column(series):
+    """Sütunu LOAD DATA'nın varsayılan kaçış kurallarına uygun metne çevirir"""
+    nulls = series.isna()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if pd.api.types.is_bool_dtype(series):
+        text_values = series.astype('Int8').astype(str)
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        text_values = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_numeric_dtype(series):
+        text_values = series.astype(str)
+    else:
+        def to_text(value):
+            if isinstance(value, bool):
+                return '1' if value else '0'
+            return str(value)
+
+        text_values = (series.map(to_text, na_action='ignore').astype(str)
+                       .str.replace('\\', '\\\\', regex=False)
+                       .str.replace('\t', '\\t', regex=False)
+                       .str.replace('\n', '\\n', regex=False)
+                       .str.replace('\r', '\\r', regex=False))
+    return text_values.where(~nulls, '\\N')
+
+
+class LoadDataInfileWriter(BaseWriter):
+    """Geçici TSV dosyası yazıp LOAD DATA LOCAL INFILE ile yükler
+
+    MySQL sunucusunda local_infile açık olmalı ve bağlantı local_infile=True
+    ile oluşturulmalıdır.
+    """
+    name = 'infile'
+
+    def _write(self, df, table_name, conn):
+        if conn.dialect.name != 'mysql':
+            raise ValueError("LOAD DATA LOCAL INFILE yalnızca MySQL ile kullanılabilir")
+
+        quote = conn.dialect.identifier_preparer.quote
+        columns = [_tsv_column(df[col]) for col in df.columns]
+        lines = columns[0].str.cat(columns[1:], sep='\t') if len(columns) > 1 else columns[0]
+
+        fd, tsv_path = tempfile.mkstemp(suffix='.tsv', prefix=f'{table_name}_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for start in range(0, len(lines), self.batch_size):
+                    f.write('\n'.join(lines.iloc[start:start + self.batch_size]))
+                    f.write('\n')
+
+            column_list = ', '.join(quote(col) for col in df.columns)
+            conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{tsv_path}' INTO TABLE {quote(table_name)} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                f"({column_list})"
+            )
+        finally:
+            os.remove(tsv_path)
+
+
+WRITERS = {
+    PandasWriter.name: PandasWriter,
+    MultiRowInsertWriter.name: MultiRowInsertWriter,
+    LoadDataInfileWriter.name: LoadDataInfileWriter,
+}
+
+
+def get_writer(name, batch_size=DEFAULT_BATCH_SIZE):
+    """İsmi verilen yazıcıyı oluşturur"""
+    if name not in WRITERS:
+        raise ValueError(f"Bilinmeyen yazıcı: {name} (seçenekler: {', '.join(WRITERS)})")
+    return WRITERS[name](batch_size)
@@ -0,0 +1,377 @@
+"""
+UserMovies tablosundan örtük geri bildirimle (izlendi / izleme listesi)
+film-film işbirlikçi filtreleme modeli.
+
+  1. UserMovies tek geçişte parça parça okunur ve kullanıcı x film seyrek
+     matrisi X kurulur (CSR, int32 indeksler). Etkileşimler ikilidir.
+  2. Birlikte görülme matrisi C = XᵀX hesaplanır (int32 sayımlar; köşegen,
+     filmi işaretleyen kullanıcı sayısıdır).
+  3. Kosinüs benzerliği C_ij / sqrt(C_ii * C_jj) ile her filmin en benzer K
+     komşusu bulunur. En az min_support ortak kullanıcısı olmayan çiftler atlanır.
+
+Model bir dizine .npy dosyaları olarak yazılır ve bellek eşlemeli açılır:
+
+    model = load_cf_model('./cf_model')
+    model.similar_to_movie(862, k=10)
+    model.recommend([862, 8844], k=25)
+
+Artımlı güncellemede yeni X, modeldeki X ile karşılaştırılır. Yalnızca satırı
+değişen kullanıcıların eski katkısı C'den çıkarılır, yenisi eklenir. Komşu
+listeleri de yalnızca skoru değişebilecek filmler için yeniden hesaplanır.
+Yani XᵀX baştan hesaplanmaz.
+
+Kullanım:
+    python collaborative_filter.py --output ./cf_model          # model varsa artımlı
+    python collaborative_filter.py --output ./cf_model --full --top-k 50
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sqlalchemy import bindparam, text
+
+from db import create_db_engine
+
+MODEL_FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+MODEL_ARRAYS = ('user_ids', 'item_ids', 'user_indptr', 'user_items',
+                'cooc_indptr', 'cooc_indices', 'cooc_data', 'neighbors', 'neighbor_scores')
+
+DEFAULT_STATUSES = ('watched', 'watchlist')
+DEFAULT_TOP_K = 50
+DEFAULT_MIN_SUPPORT = 2
+READ_CHUNK_ROWS = 200000
+NEIGHBOR_BLOCK_ROWS = 4096
+
+
+def stream_interactions(engine, statuses=DEFAULT_STATUSES, chunk_size=READ_CHUNK_ROWS):
+    """UserMovies'ten (kullanıcı ID'leri, film ID'leri) int32 dizi çiftlerini parça parça üretir"""
+    query = text("SELECT UserId, MoviesMetaDataId FROM UserMovies WHERE status IN :statuses").bindparams(
+        bindparam('statuses', expanding=True))
+    with engine.connect().execution_options(stream_results=True) as conn:
+        for chunk in pd.read_sql(query, conn, params={'statuses': list(statuses)}, chunksize=chunk_size):
+            yield (chunk['UserId'].to_numpy(dtype=np.int32),
+                   chunk['MoviesMetaDataId'].to_numpy(dtype=np.int32))
+
+
+def build_user_matrix(chunks):
+    """(kullanıcı ID'leri, film ID'leri) parçalarından (kullanıcı ID'leri, film ID'leri, CSR X) kurar
+
+    Parçalar yalnızca int32 dizileri olarak biriktirilir. Tekrarlanan çiftler
+    tek etkileşim sayılır, her satırdaki film indeksleri sıralıdır.
+    """
+    user_parts, item_parts = [], []
+    for user_chunk, item_chunk in chunks:
+        user_parts.append(np.asarray(user_chunk, dtype=np.int32))
+        item_parts.append(np.asarray(item_chunk, dtype=np.int32))
+    users = np.concatenate(user_parts) if user_parts else np.array([], dtype=np.int32)
+    items = np.concatenate(item_parts) if item_parts else np.array([], dtype=np.int32)
+    del user_parts, item_parts
+
+    user_ids, user_rows = np.unique(users, return_inverse=True)
+    del users
+    item_ids, item_columns = np.unique(items, return_inverse=True)
+    del items
+
+    # Tek int64 anahtarla sıralama hem satır/sütun sırasını hem tekrar temizliğini verir
+    keys = np.unique(user_rows.astype(np.int64) * max(len(item_ids), 1) + item_columns)
+    del user_rows, item_columns
+    rows = keys // max(len(item_ids), 1)
+    indices = (keys - rows * max(len(item_ids), 1)).astype(np.int32)
+    indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(user_ids)), out=indptr[1:])
+    return user_ids.astype(np.int32), item_ids.astype(np.int32), _binary_csr(indptr, indices, len(item_ids))
+
+
+def _binary_csr(indptr, indices, n_columns):
+    """İndeks dizilerini kopyalamadan ikili (int32 birler) CSR matrise sarar"""
+    data = np.ones(len(indices), dtype=np.int32)
+    return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_columns), copy=False)
+
+
+def _positions(all_ids, ids):
+    """ids'in sıralı all_ids içindeki konumları; kümeler aynıysa None (yeniden eşleme gerekmez)"""
+    if len(all_ids) == len(ids):
+        return None
+    return np.searchsorted(all_ids, ids).astype(np.int32)
+
+
+def _aligned(indptr, indices, data, row_positions, column_positions, shape):
+    """CSR dizilerini birleşik satır/sütun uzayına taşır (konum None ise olduğu gibi kullanılır)
+
+    Konumlar monoton arttığından satır sırası ve satır içi sıralama korunur;
+    yeni satırlar boş kalır.
+    """
+    if column_positions is not None:
+        indices = column_positions[indices]
+    if row_positions is not None:
+        counts = np.zeros(shape[0], dtype=np.int64)
+        counts[row_positions] = np.diff(indptr)
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+    return sp.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+def cooccurrence(matrix):
+    """Film-film birlikte görülme sayımları C = XᵀX (int32 CSR)"""
+    transposed = matrix.T.tocsr()
+    result = transposed.dot(matrix).tocsr()
+    result.sort_indices()
+    return result
+
+
+def top_k_neighbors(cooc, rows, k, min_support, block_rows=NEIGHBOR_BLOCK_ROWS):
+    """Verilen C satırları için kosinüse göre en iyi k komşuyu (-1 dolgulu) ve skorları döndürür"""
+    counts = cooc.diagonal().astype(np.float64)
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+
+    for start in range(0, len(rows), block_rows):
+        block_items = rows[start:start + block_rows]
+        block = cooc[block_items]
+        local = np.repeat(np.arange(len(block_items)), np.diff(block.indptr))
+        columns = block.indices
+        values = block.data.astype(np.float64) / np.sqrt(counts[block_items[local]] * counts[columns])
+
+        keep = (columns != block_items[local]) & (block.data >= min_support)
+        local, columns, values = local[keep], columns[keep], values[keep]
+        # Satır içinde skora göre azalan sıralama, her satırın ilk k'sı alınır. Skorlar (0, 1]
+        # aralığında olduğundan satır*2 - skor tek anahtarı lexsort'tan birkaç kat hızlıdır.
+        order = np.argsort(local * 2.0 - values, kind='stable')
+        local, columns, values = local[order], columns[order], values[order]
+        row_start = np.searchsorted(local, np.arange(len(block_items)))
+        rank = np.arange(len(local)) - row_start[local]
+        top = rank < k
+        neighbors[start + local[top], rank[top]] = columns[top]
+        scores[start + local[top], rank[top]] = values[top]
+    return neighbors, scores
+
+
+class CFModel:
+    """Bellek eşlemeli film-film işbirlikçi filtreleme modeli"""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.arrays = arrays
+        self.item_ids = arrays['item_ids']
+        self.neighbors = arrays['neighbors']
+        self.neighbor_scores = arrays['neighbor_scores']
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def rows_for(self, movie_ids):
+        """Film ID'lerinin satır numaralarını döndürür (bulunamayanlar -1)"""
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        rows = np.searchsorted(self.item_ids, movie_ids)
+        rows = np.minimum(rows, len(self.item_ids) - 1)
+        found = self.item_ids[rows] == movie_ids
+        return np.where(found, rows, -1)
+
+    def similar_to_movie(self, movie_id, k=10):
+        """Verilen filme en benzer k film için [(film ID, skor)] döndürür"""
+        row = int(self.rows_for([movie_id])[0])
+        if row < 0:
+            raise KeyError(f"Film modelde yok: {movie_id}")
+        neighbors = self.neighbors[row][:k]
+        valid = neighbors >= 0
+        return list(zip(self.item_ids[neighbors[valid]].tolist(),
+                        self.neighbor_scores[row][:k][valid].tolist()))
+
+    def recommend(self, movie_ids, k=25):
+        """İzlenen filmlerin komşu skorlarını toplayarak en iyi k öneriyi [(film ID, skor)] döndürür"""
+        rows = self.rows_for(movie_ids)
+        rows = rows[rows >= 0]
+        if not len(rows):
+            return []
+        neighbors = np.asarray(self.neighbors[rows]).ravel()
+        scores = np.asarray(self.neighbor_scores[rows]).ravel()
+        valid = (neighbors >= 0) & ~np.isin(neighbors, rows)
+        totals = np.bincount(neighbors[valid], weights=scores[valid], minlength=len(self.item_ids))
+        k = min(k, int(np.count_nonzero(totals)))
+        if k <= 0:
+            return []
+        best = np.argpartition(-totals, k - 1)[:k]
+        best = best[np.argsort(-totals[best])]
+        return list(zip(self.item_ids[best].tolist(), totals[best].astype(np.float32).tolist()))
+
+
+def _model_arrays(user_ids, item_ids, matrix, cooc, neighbors, scores):
+    return {
+        'user_ids': user_ids,
+        'item_ids': item_ids,
+        'user_indptr': matrix.indptr.astype(np.int64),
+        'user_items': matrix.indices.astype(np.int32),
+        'cooc_indptr': cooc.indptr.astype(np.int64),
+        'cooc_indices': cooc.indices.astype(np.int32),
+        'cooc_data': cooc.data.astype(np.int32),
+        'neighbors': neighbors,
+        'neighbor_scores': scores,
+    }
+
+
+def _model_meta(matrix, cooc, k, min_support, statuses, stats):
+    return {
+        'format_version': MODEL_FORMAT_VERSION,
+        'n_users': int(matrix.shape[0]),
+        'n_items': int(matrix.shape[1]),
+        'n_interactions': int(matrix.nnz),
+        'cooc_nnz': int(cooc.nnz),
+        'top_k': int(k),
+        'min_support': int(min_support),
+        'statuses': list(statuses),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'last_update': stats,
+    }
+
+
+def build_cf_model(user_matrix, k=DEFAULT_TOP_K, min_support=DEFAULT_MIN_SUPPORT, statuses=DEFAULT_STATUSES):
+    """Modeli baştan kurar, (diziler, meta) döndürür"""
+    user_ids, item_ids, matrix = user_matrix
+    cooc = cooccurrence(matrix)
+    neighbors, scores = top_k_neighbors(cooc, np.arange(len(item_ids)), k, min_support)
+    stats = {'mode': 'full', 'changed_users': int(len(user_ids)), 'recomputed_items': int(len(item_ids))}
+    return (_model_arrays(user_ids, item_ids, matrix, cooc, neighbors, scores),
+            _model_meta(matrix, cooc, k, min_support, statuses, stats))
+
+
+def update_cf_model(model, user_matrix, k=DEFAULT_TOP_K, min_support=DEFAULT_MIN_SUPPORT,
+                    statuses=DEFAULT_STATUSES):
+    """Var olan modeli yalnızca değişen kullanıcılarla günceller, (diziler, meta) döndürür"""
+    arrays, meta = model.arrays, model.meta
+    user_ids, new_item_ids, matrix = user_matrix
+
+    # Film uzayı eski ve yeni filmlerin birleşimidir; eski indeksler yeni konumlara taşınır
+    item_ids = np.union1d(arrays['item_ids'], new_item_ids).astype(np.int32)
+    old_positions = _positions(item_ids, arrays['item_ids'])
+    new_positions = _positions(item_ids, new_item_ids)
+    n_items = len(item_ids)
+
+    cooc = _aligned(arrays['cooc_indptr'], arrays['cooc_indices'], np.asarray(arrays['cooc_data']),
+                    old_positions, old_positions, (n_items, n_items))
+
+    # Eski ve yeni X aynı kullanıcı/film uzayına hizalanır, farkı olan satırlar değişmiştir
+    all_users = np.union1d(arrays['user_ids'], user_ids)
+    old_matrix = _aligned(arrays['user_indptr'], arrays['user_items'],
+                          np.ones(len(arrays['user_items']), dtype=np.int32),
+                          _positions(all_users, arrays['user_ids']), old_positions, (len(all_users), n_items))
+    new_matrix = _aligned(matrix.indptr, matrix.indices, matrix.data,
+                          _positions(all_users, user_ids), new_positions, (len(all_users), n_items))
+    changed = np.flatnonzero(np.diff((new_matrix - old_matrix).indptr))
+
+    old_rows, new_rows = old_matrix[changed], new_matrix[changed]
+    delta = (cooccurrence(new_rows) - cooccurrence(old_rows)).tocsr()
+    delta.eliminate_zeros()
+    cooc = (cooc + delta).tocsr()
+    cooc.eliminate_zeros()
+    cooc.sort_indices()
+
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    if meta['top_k'] == k and meta['min_support'] == min_support:
+        target = old_positions if old_positions is not None else slice(None)
+        old_neighbors = np.asarray(arrays['neighbors'])
+        if old_positions is not None:
+            old_neighbors = np.where(old_neighbors >= 0, old_positions[old_neighbors], -1)
+        neighbors[target] = old_neighbors
+        scores[target] = arrays['neighbor_scores']
+        # C satırı değişen filmler ve kullanıcı sayısı değişen filmlerle birlikte görülenler
+        touched = np.flatnonzero(np.diff(delta.indptr))
+        count_changed = np.flatnonzero(delta.diagonal())
+        affected = np.union1d(touched, cooc[count_changed].indices)
+    else:
+        affected = np.arange(n_items)
+    neighbors[affected], scores[affected] = top_k_neighbors(cooc, affected, k, min_support)
+
+    matrix = _aligned(matrix.indptr, matrix.indices, matrix.data, None, new_positions, (len(user_ids), n_items))
+    stats = {'mode': 'incremental', 'changed_users': int(len(changed)), 'recomputed_items': int(len(affected))}
+    return (_model_arrays(user_ids, item_ids, matrix, cooc, neighbors, scores),
+            _model_meta(matrix, cooc, k, min_support, statuses, stats))
+
+
+def save_cf_model(path, arrays, meta):
+    """Modeli geçici dizine yazıp atomik olarak yerine taşır"""
+    tmp_path = path.rstrip('/') + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    for name in MODEL_ARRAYS:
+        np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(arrays[name]), allow_pickle=False)
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+
+
+def load_cf_model(path):
+    """Modeli bellek eşlemeli açar"""
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != MODEL_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen model biçimi: {meta.get('format_version')}")
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in MODEL_ARRAYS}
+    return CFModel(arrays, meta)
+
+
+def train(chunks, output, k=DEFAULT_TOP_K, min_support=DEFAULT_MIN_SUPPORT, statuses=DEFAULT_STATUSES, full=False):
+    """Etkileşim parçalarından modeli kurar ya da günceller ve kaydeder, meta döndürür"""
+    start = time.perf_counter()
+    user_matrix = build_user_matrix(chunks)
+    user_ids, item_ids, matrix = user_matrix
+    print(f"{len(user_ids)} kullanıcı, {len(item_ids)} film, {matrix.nnz} etkileşim okundu "
+          f"({time.perf_counter() - start:.1f} sn)")
+
+    model = None
+    if not full and os.path.exists(os.path.join(output, META_FILE)):
+        model = load_cf_model(output)
+        if sorted(model.meta['statuses']) != sorted(statuses):
+            print("Model farklı durumlarla kurulmuş, baştan hesaplanıyor.")
+            model = None
+
+    if model is None:
+        arrays, meta = build_cf_model(user_matrix, k, min_support, statuses)
+    else:
+        arrays, meta = update_cf_model(model, user_matrix, k, min_support, statuses)
+    del model
+    save_cf_model(output, arrays, meta)
+
+    stats = meta['last_update']
+    print(f"Model yazıldı: {output} ({stats['mode']}, {stats['changed_users']} kullanıcı işlendi, "
+          f"{stats['recomputed_items']} filmin komşuları hesaplandı, {meta['cooc_nnz']} birlikte görülme çifti, "
+          f"toplam {time.perf_counter() - start:.1f} sn)")
+    return meta
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="UserMovies'ten film-film işbirlikçi filtreleme modeli kurar")
+    parser.add_argument('--output', default='cf_model',
+                        help="Modelin yazılacağı dizin (varsa artımlı güncellenir)")
+    parser.add_argument('--full', action='store_true',
+                        help="Var olan modeli yok sayıp baştan kur")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help="Her film için saklanacak komşu sayısı")
+    parser.add_argument('--min-support', type=int, default=DEFAULT_MIN_SUPPORT,
+                        help="Komşu sayılmak için gereken en az ortak kullanıcı sayısı")
+    parser.add_argument('--statuses', nargs='+', choices=DEFAULT_STATUSES, default=list(DEFAULT_STATUSES),
+                        help="Etkileşim sayılan UserMovies durumları")
+    parser.add_argument('--chunk-size', type=int, default=READ_CHUNK_ROWS,
+                        help="UserMovies'ten tek seferde okunan satır sayısı")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    engine = create_db_engine()
+    train(stream_interactions(engine, args.statuses, args.chunk_size), args.output, args.top_k,
+          args.min_support, args.statuses, args.full)
+
+
+if __name__ == "__main__":
+    main()
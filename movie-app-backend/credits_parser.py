@@ -0,0 +1,261 @@
+"""
+credits tablosunun cast ve crew sütunları için ayrıştırma motoru.
+
+Kaynak sütunlar Python literal listeleridir. İki mod vardır:
+  full    - önceki davranış: literal metin olduğu gibi json.dumps ile saklanır
+  compact - her film için yalnızca uygulamanın kullandığı kısım gerçek bir JSON
+            dizisi olarak saklanır: order'a göre ilk N oyuncu, yalnızca
+            Director/Screenplay/Writer/Producer ekip üyeleri ve yalnızca gereken alanlar
+Alanlar side_tables.py'deki gibi satır satır ast.literal_eval yerine tüm sütun
+üzerinde düzenli ifadelerle (Series.str.extractall) çıkarılır. Parçalar işçi
+süreçlerde paralel işlenir, sonuçlar okuma sırasıyla geri verilir.
+"""
+import ast
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from import_metrics import StageMetrics
+from side_tables import CAST_TOP_N, CREW_JOBS
+
+CREDITS_MODES = ('compact', 'full')
+CREDITS_COLUMNS = ('cast', 'crew')
+
+# İşçi süreçte 'parse' aşamasını ölçen nesne (süreç başına bir RSS örnekleyici)
+_worker_metrics = None
+
+# Python literal metni; side_tables._STR ile aynı dil, döngüsü açılmış biçimi
+# karakter başına alternasyon yapmadığı için uzun listelerde belirgin hızlıdır
+_STR = r"""(?:'[^'\\]*(?:\\.[^'\\]*)*'|"[^"\\]*(?:\\.[^"\\]*)*")"""
+
+# Kaynak verideki sözlük anahtarları alfabetik sıradadır
+CAST_ENTRY_PATTERN = (r"\{'cast_id': (?P<cast_id>\d+), 'character': (?P<character>" + _STR + r"), "
+                      r"'credit_id': " + _STR + r", 'gender': (?P<gender>\d+|None), 'id': (?P<id>\d+), "
+                      r"'name': (?P<name>" + _STR + r"), 'order': (?P<order>\d+), "
+                      r"'profile_path': (?P<profile_path>" + _STR + r"|None)\}")
+# Görev listesi desene gömülür, diğer ekip üyeleri hiç yakalanmaz
+CREW_ENTRY_PATTERN = (r"\{'credit_id': " + _STR + r", 'department': (?P<department>" + _STR + r"), "
+                      r"'gender': (?P<gender>\d+|None), 'id': (?P<id>\d+), 'job': (?P<job>{jobs}), "
+                      r"'name': (?P<name>" + _STR + r"), 'profile_path': (?P<profile_path>" + _STR + r"|None)\}")
+
+# Desenlerin yakalayabildiği alanlar
+CAST_AVAILABLE_FIELDS = ('id', 'cast_id', 'name', 'character', 'order', 'gender', 'profile_path')
+CREW_AVAILABLE_FIELDS = ('id', 'name', 'job', 'department', 'gender', 'profile_path')
+# Desende yalnızca rakamla eşleşen, dönüştürülmeden yazılan alanlar
+INTEGER_FIELDS = {'id', 'cast_id', 'order'}
+
+# Film sayfasının kullandığı ekip görevleri ("Yönetmen & Yapımcılar" bölümü
+# Director ve Producer'ı gösterir); movie_crew tablosu CREW_JOBS ile kalır
+COMPACT_CREW_JOBS = CREW_JOBS + ('Producer',)
+
+# Film sayfasının kullandığı alanlar
+CAST_FIELDS = ('id', 'cast_id', 'name', 'character', 'order', 'profile_path')
+CREW_FIELDS = ('id', 'name', 'job', 'department', 'profile_path')
+
+
+class CreditsProjection:
+    """compact modda saklanacak oyuncu/ekip kısmı"""
+
+    def __init__(self, cast_top_n=CAST_TOP_N, crew_jobs=COMPACT_CREW_JOBS, cast_fields=CAST_FIELDS, crew_fields=CREW_FIELDS):
+        for fields, available in ((cast_fields, CAST_AVAILABLE_FIELDS), (crew_fields, CREW_AVAILABLE_FIELDS)):
+            unknown = set(fields) - set(available)
+            if unknown:
+                raise ValueError(f"Bilinmeyen alanlar: {', '.join(sorted(unknown))}")
+        self.cast_top_n = cast_top_n
+        self.crew_jobs = tuple(crew_jobs)
+        self.cast_fields = tuple(cast_fields)
+        self.crew_fields = tuple(crew_fields)
+
+    def tag(self):
+        """Anlık görüntü anahtarına eklenen, projeksiyonu tanımlayan metin"""
+        return (f"top{self.cast_top_n}|{','.join(self.crew_jobs)}|{','.join(self.cast_fields)}|"
+                f"{','.join(self.crew_fields)}")
+
+
+def _json_value(value):
+    """Yakalanan tek bir literal değeri (metin, sayı ya da None) JSON metnine çevirir
+
+    Kaçış karakteri içermeyen metinlerde yalnızca tırnaklar değiştirilir;
+    kaçışlı (az sayıdaki) metinler ast.literal_eval ile tam olarak çevrilir.
+    """
+    if value == 'None':
+        return 'null'
+    if value[0] not in '\'"':
+        return value
+    if '\\' in value:
+        return json.dumps(ast.literal_eval(value), ensure_ascii=False)
+    return '"' + value[1:-1].replace('"', '\\"') + '"'
+
+
+def _json_lists(literals, entries, fields):
+    """Seçilen girdileri satır başına JSON dizisi metnine çevirir (girdisi olmayan satırlar '[]')"""
+    result = np.where(literals.notna().to_numpy(), '[]', None).astype(object)
+    if not entries.empty:
+        template = '{' + ', '.join(f'"{field}": %s' for field in fields) + '}'
+        columns = [entries[field].tolist() if field in INTEGER_FIELDS else map(_json_value, entries[field].tolist())
+                   for field in fields]
+        objects = [template % values for values in zip(*columns)]
+        # Girdiler satıra göre ardışıktır; her satırın dilimi tek seferde birleştirilir
+        rows = entries['row'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        ends = np.r_[starts[1:], len(rows)]
+        result[rows[starts]] = ['[' + ', '.join(objects[start:end]) + ']' for start, end in zip(starts, ends)]
+    return pd.Series(result, index=literals.index)
+
+
+def _entries(literals, pattern):
+    """Literal sütunundaki eşleşen sözlükleri satır konumu ('row') ve kaynak sırasıyla döndürür
+
+    Her metin derlenmiş desenin findall'u ile taranır; sıralama ve filtreleme
+    sütunlar üzerinde toplu yapılır (extractall'un satır başına DataFrame maliyeti olmadan).
+    """
+    regex = re.compile(pattern)
+    matches = [regex.findall(value) if isinstance(value, str) and len(value) > 2 else [] for value in literals]
+    counts = np.fromiter(map(len, matches), dtype=np.int64, count=len(matches))
+    entries = pd.DataFrame(list(chain.from_iterable(matches)), columns=list(regex.groupindex))
+    entries.insert(0, 'row', np.repeat(np.arange(len(literals)), counts))
+    return entries
+
+
+def crew_pattern(jobs):
+    """Yalnızca verilen görevlerdeki ekip üyelerini yakalayan desen"""
+    return CREW_ENTRY_PATTERN.replace('{jobs}', '|'.join(re.escape(repr(job)) for job in jobs))
+
+
+def project_cast(literals, projection):
+    """order'a göre ilk N oyuncuyu seçilen alanlarla JSON dizisi olarak döndürür"""
+    entries = _entries(literals, CAST_ENTRY_PATTERN)
+    if not entries.empty:
+        entries['_order'] = entries['order'].astype(np.int64)
+        entries = entries.sort_values(['row', '_order'], kind='stable')
+        entries = entries[entries.groupby('row', sort=False).cumcount().to_numpy() < projection.cast_top_n]
+    return _json_lists(literals, entries, projection.cast_fields)
+
+
+def project_crew(literals, projection):
+    """Seçilen görevlerdeki ekip üyelerini seçilen alanlarla JSON dizisi olarak döndürür"""
+    entries = _entries(literals, crew_pattern(projection.crew_jobs))
+    return _json_lists(literals, entries, projection.crew_fields)
+
+
+def transform_columns(frame, mode, projection):
+    """cast/crew sütunlarını dönüştürür (işçi süreçte çalışır)
+
+    (dönüştürülmüş sütunlar, giriş karakterleri, çıkış karakterleri, süre) döndürür.
+    """
+    start = time.perf_counter()
+    result = pd.DataFrame(index=frame.index)
+    bytes_in = bytes_out = 0
+    for col in frame.columns:
+        literals = frame[col]
+        if mode == 'full':
+            values = literals.apply(lambda x: json.dumps(x) if pd.notna(x) else None)
+        elif col == 'cast':
+            values = project_cast(literals, projection)
+        else:
+            values = project_crew(literals, projection)
+        result[col] = values
+        bytes_in += int(literals.str.len().sum())
+        bytes_out += int(values.str.len().sum())
+    return result, bytes_in, bytes_out, time.perf_counter() - start
+
+
+def parse_chunk(frame, mode, projection, table_name, measure):
+    """İşçi süreçte transform_columns'u çalıştırır, (sonuç, ölçüm) döndürür
+
+    measure açıksa ayrıştırma 'parse' aşaması olarak işçinin kendi RSS'iyle
+    ölçülür; ana süreç dönen kayıtları birleştirir.
+    """
+    global _worker_metrics
+    if not measure:
+        return transform_columns(frame, mode, projection), None
+    if _worker_metrics is None:
+        _worker_metrics = StageMetrics(enabled=True)
+    _worker_metrics.records = {}
+    with _worker_metrics.stage('parse', table_name, len(frame)) as counts:
+        result = transform_columns(frame, mode, projection)
+        counts['rows_out'] = len(frame)
+    return result, _worker_metrics
+
+
+class CreditsParser:
+    """credits parçalarının cast/crew sütunlarını seçilen modda, işçi süreçlerde dönüştürür"""
+
+    def __init__(self, mode='compact', projection=None, workers=1):
+        if mode not in CREDITS_MODES:
+            raise ValueError(f"Bilinmeyen credits modu: {mode}")
+        self.mode = mode
+        self.projection = projection or CreditsProjection()
+        self.workers = max(1, workers or 1)
+        self.rows = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def cache_variant(self):
+        """Anlık görüntü anahtarını moda ve projeksiyona göre ayırır"""
+        return self.mode if self.mode == 'full' else f"{self.mode}|{self.projection.tag()}"
+
+    def _finish(self, result, chunk, raw_chunk, metrics):
+        (columns, bytes_in, bytes_out, seconds), worker_metrics = result
+        for col in columns.columns:
+            chunk[col] = columns[col]
+        self.rows += len(chunk)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.seconds += seconds
+        if worker_metrics is not None:
+            metrics.merge(worker_metrics)
+        return chunk, raw_chunk
+
+    def map(self, pairs, table_name='credits', metrics=None):
+        """(temiz parça, ham parça) çiftlerinde cast/crew sütunlarını dönüştürür, sırayı korur
+
+        Birden fazla işçide en fazla workers * 2 parça aynı anda işlenir; böylece
+        okuma ve yazma beklerken ayrıştırma diğer çekirdeklerde sürer.
+        """
+        start = time.perf_counter()
+        # Ölçüm kapalıyken stage() hiçbir şey yapmayan bağlam yöneticisi döndürür
+        metrics = metrics or StageMetrics()
+        measure = metrics.enabled
+        if self.workers == 1:
+            for chunk, raw_chunk in pairs:
+                columns = [col for col in CREDITS_COLUMNS if col in chunk.columns]
+                with metrics.stage('parse', table_name, len(chunk)) as counts:
+                    result = transform_columns(chunk[columns], self.mode, self.projection)
+                    counts['rows_out'] = len(chunk)
+                yield self._finish((result, None), chunk, raw_chunk, metrics)
+            self.wall_seconds += time.perf_counter() - start
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for chunk, raw_chunk in pairs:
+                columns = [col for col in CREDITS_COLUMNS if col in chunk.columns]
+                pending.append((executor.submit(parse_chunk, chunk[columns], self.mode, self.projection,
+                                                 table_name, measure), chunk, raw_chunk))
+                if len(pending) >= self.workers * 2:
+                    future, chunk, raw_chunk = pending.popleft()
+                    yield self._finish(future.result(), chunk, raw_chunk, metrics)
+            while pending:
+                future, chunk, raw_chunk = pending.popleft()
+                yield self._finish(future.result(), chunk, raw_chunk, metrics)
+        self.wall_seconds += time.perf_counter() - start
+
+    def report(self):
+        """Ayrıştırma hızını ve çıktı boyutundaki küçülmeyi yazdırır"""
+        if not self.rows:
+            return
+        mb = 1024 ** 2
+        rate = self.rows / self.seconds if self.seconds > 0 else float('inf')
+        ratio = self.bytes_in / max(self.bytes_out, 1)
+        print(f"credits cast/crew ({self.mode}, {self.workers} işçi): {self.rows} satır, "
+              f"{self.seconds:.2f} sn işçi süresi ({rate:,.0f} satır/sn/işçi), "
+              f"{self.bytes_in / mb:.1f} MB -> {self.bytes_out / mb:.1f} MB ({ratio:.1f}x küçüldü)")
@@ -0,0 +1,29 @@
+"""
+Python betikleri için ortak veritabanı bağlantısı.
+
+Bağlantı bilgileri backend ile aynı .env dosyasından (DB_HOST, DB_USER,
+DB_PASSWORD, DB_NAME) okunur. DATABASE_URL verilirse doğrudan o kullanılır,
+böylece betikler yerel bir SQLite veritabanına karşı da çalıştırılabilir.
+"""
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+
+def get_database_url():
+    """DATABASE_URL veya .env'deki MySQL bilgilerinden bağlantı adresini oluşturur"""
+    load_dotenv()
+    url = os.getenv('DATABASE_URL')
+    if url:
+        return url
+    return (f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+            f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}")
+
+
+def create_db_engine(url=None, **kwargs):
+    """Veritabanı motorunu oluşturur (MySQL'de LOAD DATA LOCAL INFILE açık)"""
+    url = url or get_database_url()
+    if url.startswith('mysql'):
+        kwargs.setdefault('connect_args', {'local_infile': True})
+    return create_engine(url, **kwargs)
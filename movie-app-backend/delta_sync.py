@@ -0,0 +1,171 @@
+"""
+Artımlı (delta) veri aktarımı.
+
+Her tablo satırı için içerik özeti (hash) hesaplanır ve import_manifest
+tablosunda saklanır. Sonraki çalıştırmalarda yalnızca yeni veya değişmiş
+satırlar INSERT ... ON DUPLICATE KEY UPDATE ile yazılır, kaynaktan kalkan
+satırlar silinir. Tablolar hiçbir zaman düşürülmez, böylece Node backend
+aktarım sırasında da çalışmaya devam eder.
+
+İlk artımlı çalıştırmada manifest boş olduğundan tüm satırlar upsert edilir
+ve manifest oluşturulur; silinen satırlar ancak sonraki çalıştırmalarda
+tespit edilebilir.
+"""
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, String, BigInteger, inspect, select
+
+from bulk_writer import UpsertWriter, DEFAULT_BATCH_SIZE
+
+MANIFEST_TABLE = 'import_manifest'
+
+manifest_metadata = MetaData()
+manifest_table = Table(
+    MANIFEST_TABLE,
+    manifest_metadata,
+    Column('table_name', String(64), primary_key=True),
+    Column('row_key', BigInteger, primary_key=True, autoincrement=False),
+    Column('row_hash', BigInteger, nullable=False)
+)
+
+
+def row_hashes(df):
+    """Her satır için içerikten türetilen 64 bitlik özet döndürür"""
+    return pd.util.hash_pandas_object(df, index=False).values.view(np.int64)
+
+
+def load_manifest(conn, table_name):
+    """Tablonun son yüklemedeki satır özetlerini row_key indeksli Series olarak döndürür"""
+    manifest_table.create(conn, checkfirst=True)
+    rows = conn.execute(
+        select(manifest_table.c.row_key, manifest_table.c.row_hash)
+        .where(manifest_table.c.table_name == table_name)
+    ).all()
+    keys = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    hashes = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+    return pd.Series(hashes, index=pd.Index(keys, name='row_key'), name='row_hash')
+
+
+class DeltaWriter(UpsertWriter):
+    """Yalnızca değişen satırları yazan, kaynaktan kalkan satırları silen yazıcı
+
+    key_columns: tablo adı -> birincil anahtar sütunu
+    protected_keys: tablo adı -> (kaynak tablo, sütun); kaynak tablonun bu
+    sütununda geçen anahtarlar silinmez (ör. kullanıcıların izlediği filmler)
+    dependent_tables: tablo adı -> [(tablo, sütun), ...]; satır silinirken bu
+    tablolardaki ilgili satırlar da silinir (ör. movie_genres)
+    """
+    name = 'delta'
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, key_columns=None, protected_keys=None,
+                 dependent_tables=None):
+        self.table_keys = dict(key_columns or {})
+        upsert_keys = {table_name: [key] for table_name, key in self.table_keys.items()}
+        upsert_keys[MANIFEST_TABLE] = ['table_name', 'row_key']
+        super().__init__(batch_size, upsert_keys)
+        self.protected_keys = dict(protected_keys or {})
+        self.dependent_tables = dict(dependent_tables or {})
+        # Tablo bazında son manifest ve bu çalıştırmada görülen anahtarlar
+        self._manifests = {}
+        self._seen_keys = {}
+        # Tablo bazında [eklenen, güncellenen, değişmeyen, silinen]
+        self.changes = {}
+
+    def session(self, engine):
+        # Kontroller kapatılmadan, parça başına kısa bir işlem içinde yazılır
+        return engine.begin()
+
+    def write(self, df, table_name, conn):
+        key = self.table_keys[table_name]
+        if table_name not in self._manifests:
+            self._manifests[table_name] = load_manifest(conn, table_name)
+            self._seen_keys[table_name] = []
+        manifest = self._manifests[table_name]
+
+        keys = df[key].astype(np.int64).values
+        hashes = row_hashes(df)
+        self._seen_keys[table_name].append(keys)
+
+        # Manifestteki özetle karşılaştır
+        positions = manifest.index.get_indexer(keys)
+        is_new = positions == -1
+        previous = np.zeros(len(keys), dtype=np.int64)
+        previous[~is_new] = manifest.values[positions[~is_new]]
+        is_changed = ~is_new & (previous != hashes)
+        to_write = is_new | is_changed
+
+        counts = self.changes.setdefault(table_name, [0, 0, 0, 0])
+        counts[0] += int(is_new.sum())
+        counts[1] += int(is_changed.sum())
+        counts[2] += int((~to_write).sum())
+
+        rate = super().write(df[to_write], table_name, conn)
+
+        if to_write.any():
+            manifest_rows = pd.DataFrame({
+                'table_name': table_name,
+                'row_key': keys[to_write],
+                'row_hash': hashes[to_write],
+            })
+            self._write(manifest_rows, MANIFEST_TABLE, conn)
+        return rate
+
+    def finish(self, table_name, conn):
+        manifest = self._manifests.pop(table_name, None)
+        seen_chunks = self._seen_keys.pop(table_name, [])
+        if manifest is None or manifest.empty:
+            return 0
+
+        seen = np.concatenate(seen_chunks) if seen_chunks else np.array([], dtype=np.int64)
+        deleted = manifest.index.difference(pd.Index(seen))
+
+        # Kullanıcı verisinde kullanılan satırlar silinmez
+        protected_source = self.protected_keys.get(table_name)
+        if protected_source and len(deleted):
+            protected = self._protected_keys(conn, *protected_source)
+            kept = deleted.intersection(protected)
+            if len(kept):
+                print(f"{table_name}: {len(kept)} satır kaynaktan kalktı ancak kullanıcı verisinde kullanıldığı için silinmedi")
+                deleted = deleted.difference(kept)
+
+        if len(deleted):
+            quote = conn.dialect.identifier_preparer.quote
+            key = quote(self.table_keys[table_name])
+            for start in range(0, len(deleted), self.batch_size):
+                batch = [int(k) for k in deleted[start:start + self.batch_size]]
+                id_list = ', '.join(map(str, batch))
+                conn.exec_driver_sql(f"DELETE FROM {quote(table_name)} WHERE {key} IN ({id_list})")
+                for dependent_table, column in self.dependent_tables.get(table_name, []):
+                    conn.exec_driver_sql(
+                        f"DELETE FROM {quote(dependent_table)} WHERE {quote(column)} IN ({id_list})"
+                    )
+                conn.execute(
+                    manifest_table.delete()
+                    .where(manifest_table.c.table_name == table_name)
+                    .where(manifest_table.c.row_key.in_(batch))
+                )
+
+        self.changes.setdefault(table_name, [0, 0, 0, 0])[3] += len(deleted)
+        return len(deleted)
+
+    @staticmethod
+    def _protected_keys(conn, source_table, column):
+        """Kaynak tabloda geçen anahtarları döndürür (yalnızca okunur); tablo yoksa boş"""
+        table_names = {name.lower(): name for name in inspect(conn).get_table_names()}
+        if source_table.lower() not in table_names:
+            return pd.Index([], dtype=np.int64)
+        quote = conn.dialect.identifier_preparer.quote
+        rows = conn.exec_driver_sql(
+            f"SELECT DISTINCT {quote(column)} FROM {quote(table_names[source_table.lower()])}"
+        )
+        return pd.Index([int(row[0]) for row in rows if row[0] is not None], dtype=np.int64)
+
+    def merge(self, other):
+        super().merge(other)
+        self.changes.update(other.changes)
+
+    def report(self):
+        super().report()
+        for table_name, (inserted, updated, unchanged, deleted) in self.changes.items():
+            print(f"[{self.name}] {table_name}: {inserted} eklendi, {updated} güncellendi, "
+                  f"{unchanged} değişmedi, {deleted} silindi")
@@ -0,0 +1,291 @@
+"""
+Bellek eşlemeli (memory-mapped) film özellik deposu.
+
+import_data.py --feature-store DIZIN ile çalıştırıldığında, içe aktarma
+sırasında temizlenen movies_metadata ve keywords parçalarından katalog
+vektörleri üretilir ve sürümlü bir dizine ham .npy dosyaları olarak yazılır:
+
+    DIZIN/
+      CURRENT                 -> geçerli sürüm dizininin adı
+      v1-20250101120000/
+        manifest.json         -> biçim sürümü, boyutlar, dosya SHA-256 özetleri
+        ids.npy               -> satır -> film ID (artan sırada, int64)
+        text_data.npy, text_indices.npy, text_indptr.npy        (CSR TF-IDF)
+        genre_*.npy, keyword_*.npy                               (CSR)
+        numeric.npy           -> float32 (vote_average, vote_count, popularity,
+                                 runtime, release_year)
+        vocabulary.npy, genre_ids.npy, keyword_ids.npy
+
+Tüketiciler load_feature_store() ile tüm dizileri np.load(mmap_mode='r')
+üzerinden milisaniyeler içinde açar; sayfalar işletim sistemi tarafından
+süreçler arasında kopyalanmadan paylaşılır.
+
+manifest.json'daki catalog_fingerprint depodaki film ID'lerinin özetidir.
+Tüketiciler database_fingerprint() ile movies_metadata'dan aynı özeti
+hesaplayıp load_feature_store(..., expected_fingerprint=...) ile verir;
+veritabanı depo üretildikten sonra yeniden yüklenmişse depo reddedilir
+(allow_stale=True ile yalnızca uyarı verilir).
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from movie_features import build_feature_matrices
+from side_tables import build_side_frames
+
+FORMAT_VERSION = 1
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+SPARSE_BLOCKS = ('text', 'genre', 'keyword')
+NUMERIC_COLUMNS = ['vote_average', 'vote_count', 'popularity', 'runtime', 'release_year']
+
+
+def catalog_fingerprint(movie_ids):
+    """Film ID kümesinin sıradan bağımsız SHA-256 özeti"""
+    movie_ids = np.unique(np.asarray(movie_ids, dtype=np.int64))
+    return hashlib.sha256(movie_ids.astype('<i8').tobytes()).hexdigest()
+
+
+def database_fingerprint(engine):
+    """Veritabanındaki movies_metadata film ID'lerinin catalog_fingerprint özeti"""
+    movie_ids = pd.read_sql("SELECT id FROM movies_metadata WHERE id IS NOT NULL", engine)['id']
+    return catalog_fingerprint(movie_ids.to_numpy(dtype=np.int64))
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    """Dosyanın SHA-256 özetini döndürür"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Bellek eşlemeli özellik deposu"""
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.ids = arrays['ids']
+        self.numeric = arrays['numeric']
+        self.numeric_columns = manifest['numeric_columns']
+        self.vocabulary = arrays['vocabulary']
+        self.genre_ids = arrays['genre_ids']
+        self.keyword_ids = arrays['keyword_ids']
+        for name in SPARSE_BLOCKS:
+            shape = tuple(manifest['shapes'][name])
+            # Diziler kopyalanmadan CSR matrise sarılır
+            matrix = sp.csr_matrix(
+                (arrays[f'{name}_data'], arrays[f'{name}_indices'], arrays[f'{name}_indptr']),
+                shape=shape, copy=False
+            )
+            setattr(self, name, matrix)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows_for(self, movie_ids):
+        """Film ID'lerinin satır numaralarını döndürür (bulunamayanlar -1)"""
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, movie_ids)
+        rows = np.minimum(rows, len(self.ids) - 1)
+        found = self.ids[rows] == movie_ids
+        return np.where(found, rows, -1)
+
+    def is_stale(self, expected_fingerprint):
+        """Depo farklı bir film kataloğundan üretilmişse True döndürür"""
+        return self.manifest.get('catalog_fingerprint') != expected_fingerprint
+
+
+def _save_arrays(version_dir, arrays):
+    """Dizileri .npy olarak yazar, dosya bilgilerini döndürür"""
+    files = {}
+    for name, array in arrays.items():
+        path = os.path.join(version_dir, f'{name}.npy')
+        np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+        files[name] = {
+            'sha256': file_sha256(path),
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+        }
+    return files
+
+
+def export_feature_store(base_dir, features, numeric, source_fingerprint=None, keep_versions=3):
+    """Özellik matrislerini yeni bir sürüm dizinine yazar ve CURRENT'i günceller"""
+    os.makedirs(base_dir, exist_ok=True)
+    version = f"v{FORMAT_VERSION}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    build_dir = os.path.join(base_dir, f'.{version}.tmp')
+    if os.path.exists(build_dir):
+        shutil.rmtree(build_dir)
+    os.makedirs(build_dir)
+
+    arrays = {
+        'ids': features['ids'].astype(np.int64),
+        'numeric': numeric.astype(np.float32),
+        'vocabulary': features['vocabulary'].astype(str),
+        'genre_ids': features['genre_ids'].astype(np.int64),
+        'keyword_ids': features['keyword_ids'].astype(np.int64),
+    }
+    shapes = {}
+    for name in SPARSE_BLOCKS:
+        matrix = sp.csr_matrix(features[name], dtype=np.float32)
+        matrix.sort_indices()
+        arrays[f'{name}_data'] = matrix.data
+        arrays[f'{name}_indices'] = matrix.indices.astype(np.int32)
+        arrays[f'{name}_indptr'] = matrix.indptr.astype(np.int64)
+        shapes[name] = list(matrix.shape)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source_fingerprint': source_fingerprint,
+        'catalog_fingerprint': catalog_fingerprint(arrays['ids']),
+        'n_movies': int(len(arrays['ids'])),
+        'numeric_columns': NUMERIC_COLUMNS,
+        'shapes': shapes,
+        'files': _save_arrays(build_dir, arrays),
+    }
+    with open(os.path.join(build_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    version_dir = os.path.join(base_dir, version)
+    if os.path.exists(version_dir):
+        shutil.rmtree(version_dir)
+    os.rename(build_dir, version_dir)
+
+    # CURRENT dosyası atomik olarak değiştirilir
+    current_tmp = os.path.join(base_dir, CURRENT_FILE + '.tmp')
+    with open(current_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(base_dir, CURRENT_FILE))
+
+    # Eski sürümleri temizle
+    versions = sorted(name for name in os.listdir(base_dir) if name.startswith('v') and name != version)
+    for old_version in versions[:max(len(versions) - (keep_versions - 1), 0)]:
+        shutil.rmtree(os.path.join(base_dir, old_version), ignore_errors=True)
+
+    return version_dir
+
+
+def resolve_version_dir(path):
+    """Depo kök dizini verilirse CURRENT'in gösterdiği sürüm dizinini döndürür"""
+    current_path = os.path.join(path, CURRENT_FILE)
+    if os.path.exists(current_path):
+        with open(current_path, encoding='utf-8') as f:
+            return os.path.join(path, f.read().strip())
+    return path
+
+
+def verify_feature_store(path):
+    """Dosyaların SHA-256 özetlerini manifest ile karşılaştırır, uyuşmayanları döndürür"""
+    version_dir = resolve_version_dir(path)
+    with open(os.path.join(version_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+    mismatched = []
+    for name, info in manifest['files'].items():
+        file_path = os.path.join(version_dir, f'{name}.npy')
+        if not os.path.exists(file_path) or file_sha256(file_path) != info['sha256']:
+            mismatched.append(name)
+    return mismatched
+
+
+def load_feature_store(path, verify=False, expected_fingerprint=None, allow_stale=False):
+    """Özellik deposunu bellek eşlemeli olarak açar
+
+    verify=True ise dosya özetleri kontrol edilir. expected_fingerprint
+    (database_fingerprint) verilirse başka bir film kataloğundan üretilmiş
+    depolar için hata verilir; allow_stale=True ise yalnızca uyarı yazılır.
+    """
+    version_dir = resolve_version_dir(path)
+    with open(os.path.join(version_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen özellik deposu biçimi: {manifest.get('format_version')}")
+    if verify:
+        mismatched = verify_feature_store(version_dir)
+        if mismatched:
+            raise ValueError(f"Özellik deposu dosyaları bozuk: {', '.join(mismatched)}")
+
+    arrays = {}
+    for name, info in manifest['files'].items():
+        array = np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode='r')
+        if list(array.shape) != info['shape'] or str(array.dtype) != info['dtype']:
+            raise ValueError(f"Özellik deposu dosyası manifest ile uyuşmuyor: {name}")
+        arrays[name] = array
+    store = FeatureStore(version_dir, manifest, arrays)
+
+    if expected_fingerprint is not None and store.is_stale(expected_fingerprint):
+        message = (f"Özellik deposu veritabanındaki film kataloğuyla uyuşmuyor: {version_dir} "
+                   f"(import_data.py --feature-store ile yeniden üretin)")
+        if not allow_stale:
+            raise ValueError(message)
+        print(f"Uyarı: {message}")
+    return store
+
+
+class FeatureCollector:
+    """İçe aktarma sırasında temizlenen parçalardan özellik deposu için gerekli sütunları toplar"""
+
+    def __init__(self):
+        self.movies = []
+        self.genre_pairs = []
+        self.keyword_pairs = []
+
+    def add(self, table_name, clean_df, raw_df):
+        """Temizlenmiş parça ve aynı indeksli ham literal sütunlarını ekler"""
+        if table_name == 'movies_metadata':
+            movies = clean_df[['id', 'title', 'overview', 'vote_average', 'vote_count',
+                               'popularity', 'runtime']].copy()
+            movies['release_year'] = pd.to_datetime(clean_df['release_date'], errors='coerce').dt.year
+            self.movies.append(movies)
+            frames = dict(build_side_frames(table_name, clean_df['id'], raw_df.loc[clean_df.index], {}))
+            if 'movie_genres' in frames:
+                self.genre_pairs.append(frames['movie_genres'])
+        elif table_name == 'keywords':
+            frames = dict(build_side_frames(table_name, clean_df['id'], raw_df.loc[clean_df.index], {}))
+            if 'movie_keywords' in frames:
+                self.keyword_pairs.append(frames['movie_keywords'])
+
+    def merge(self, other):
+        """Başka bir süreçte toplanan parçaları ekler"""
+        self.movies.extend(other.movies)
+        self.genre_pairs.extend(other.genre_pairs)
+        self.keyword_pairs.extend(other.keyword_pairs)
+
+    def export(self, base_dir, source_fingerprint=None):
+        """Toplanan verilerden özellik deposunu üretir"""
+        start = time.perf_counter()
+        if not self.movies:
+            print("Özellik deposu için movies_metadata verisi yok, dışa aktarma atlandı.")
+            return None
+
+        movies = pd.concat(self.movies, ignore_index=True)
+        movies['id'] = movies['id'].astype(np.int64)
+        movies = movies.drop_duplicates('id').sort_values('id').reset_index(drop=True)
+
+        def pairs(frames, column):
+            if not frames:
+                return pd.DataFrame({'movie_id': pd.Series(dtype=np.int64), column: pd.Series(dtype=np.int64)})
+            return pd.concat(frames, ignore_index=True)
+
+        features = build_feature_matrices(movies, pairs(self.genre_pairs, 'genre_id'),
+                                          pairs(self.keyword_pairs, 'keyword_id'))
+        numeric = (movies[NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
+                   .to_numpy(dtype=np.float32, na_value=np.nan))
+
+        version_dir = export_feature_store(base_dir, features, numeric, source_fingerprint)
+        print(f"Özellik deposu yazıldı: {version_dir} ({len(movies)} film, "
+              f"{time.perf_counter() - start:.1f} sn)")
+        return version_dir
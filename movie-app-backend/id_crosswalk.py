@@ -0,0 +1,200 @@
+"""
+MovieLens movieId, TMDB ID (movies_metadata.id) ve IMDb ID arasında toplu
+ID çevirisi için sıralı dizi tabanlı eşleme.
+
+links tablosu üç ID'yi de tam sayı olarak tutar. Python işlerinde satır satır
+SQL sorgusu ya da sözlük yerine üç hizalı dizi kullanılır:
+  movielens_ids  - sıralı, benzersiz (links birincil anahtarı)
+  tmdb_ids       - aynı sırada, eksikse -1
+  imdb_ids       - aynı sırada, eksikse -1
+TMDB ve IMDb yönleri için ayrıca anahtara göre sıralı permütasyonlar
+(tmdb_order, imdb_order) saklanır. Milyonlarca ID tek np.searchsorted
+çağrısıyla, ID başına O(log n) çevrilir. En büyük ID DENSE_MAX_ID'yi
+aşmıyorsa ilk çeviride bellekte doğrudan adresli bir tablo (ID -> satır)
+kurulur ve çeviri ID başına O(1) olur (IMDb için ~40 MB, TMDB için ~2 MB).
+
+Aynı TMDB/IMDb ID'sine birden fazla MovieLens ID'si eşleniyorsa en küçük
+MovieLens ID'si kullanılır (ratings_store.py ile aynı kural).
+
+    crosswalk = load_crosswalk('./crosswalk')
+    crosswalk.translate([1, 2, 3], 'movielens', 'tmdb')      # -> [862, 8844, 15602]
+    crosswalk.translate(tmdb_ids, 'tmdb', 'imdb')            # bulunamayanlar -1
+
+Eşleme import_data.py --crosswalk ile aktarım sonunda ya da
+python id_crosswalk.py --output ./crosswalk ile links tablosundan yazılır.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from db import create_db_engine
+
+CROSSWALK_FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+ID_SPACES = ('movielens', 'tmdb', 'imdb')
+CROSSWALK_ARRAYS = ('movielens_ids', 'tmdb_ids', 'imdb_ids', 'tmdb_order', 'imdb_order')
+MISSING_ID = -1
+# Doğrudan adresli tablo kurulacak en büyük ID (int32 satır numarası başına 4 bayt)
+DENSE_MAX_ID = 1 << 24
+
+
+def _ids(values):
+    """Sayıya çevrilemeyen, tam sayı olmayan ya da eksik değerleri MISSING_ID yapıp int32 döndürür"""
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values) & (values == np.floor(values)) & (values > 0)
+    return np.where(valid, values, MISSING_ID).astype(np.int32)
+
+
+def _sorted_order(keys):
+    """Eksik olmayan anahtarların sıralı permütasyonu; eşit anahtarlarda önceki konum önce gelir"""
+    present = np.flatnonzero(keys != MISSING_ID)
+    return present[np.argsort(keys[present], kind='stable')].astype(np.int32)
+
+
+def build_crosswalk(movielens_ids, tmdb_ids, imdb_ids):
+    """Hizalı ID dizilerinden eşleme dizilerini ve meta bilgisini döndürür
+
+    imdbId '0114709' gibi sıfır dolgulu metin, tmdbId '862.0' gibi float olabilir;
+    hepsi tam sayıya çevrilir. Tekrarlanan MovieLens ID'lerinde ilk satır kalır.
+    """
+    movielens_ids, tmdb_ids, imdb_ids = _ids(movielens_ids), _ids(tmdb_ids), _ids(imdb_ids)
+    present = np.flatnonzero(movielens_ids != MISSING_ID)
+    _, first = np.unique(movielens_ids[present], return_index=True)
+    rows = present[first]
+    arrays = {
+        'movielens_ids': movielens_ids[rows],
+        'tmdb_ids': tmdb_ids[rows],
+        'imdb_ids': imdb_ids[rows],
+    }
+    arrays['tmdb_order'] = _sorted_order(arrays['tmdb_ids'])
+    arrays['imdb_order'] = _sorted_order(arrays['imdb_ids'])
+    meta = {
+        'format_version': CROSSWALK_FORMAT_VERSION,
+        'rows': len(rows),
+        'tmdb_ids': int(len(np.unique(arrays['tmdb_ids'][arrays['tmdb_order']]))),
+        'imdb_ids': int(len(np.unique(arrays['imdb_ids'][arrays['imdb_order']]))),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    return arrays, meta
+
+
+def read_links(engine):
+    """links tablosundan (movieId, tmdbId, imdbId) dizilerini okur"""
+    with engine.connect() as conn:
+        links = pd.read_sql(text("SELECT movieId, tmdbId, imdbId FROM links"), conn)
+    return links['movieId'], links['tmdbId'], links['imdbId']
+
+
+class IdCrosswalk:
+    """Bellek eşlemeli MovieLens / TMDB / IMDb ID eşlemesi"""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.arrays = arrays
+        self.columns = {space: arrays[f'{space}_ids'] for space in ID_SPACES}
+        # Kaynak ID alanı -> (sıralı anahtarlar, satır numaraları); MovieLens dizisi zaten sıralıdır
+        self._sorted = {'movielens': (arrays['movielens_ids'], None)}
+        for space in ('tmdb', 'imdb'):
+            order = np.asarray(arrays[f'{space}_order'])
+            self._sorted[space] = (self.columns[space][order], order)
+        self._dense = {}
+
+    def __len__(self):
+        return len(self.columns['movielens'])
+
+    def dense_table(self, source):
+        """source alanı için ID -> satır tablosu; ID'ler çok büyükse None (searchsorted kullanılır)"""
+        if source not in self._dense:
+            keys, order = self._sorted[source]
+            table = None
+            if len(keys) and int(keys[-1]) <= DENSE_MAX_ID:
+                # Tekrarlanan anahtarlarda sıralı dizideki ilk satır (en küçük MovieLens ID'si) kalır
+                unique_keys, first = np.unique(keys, return_index=True)
+                table = np.full(int(keys[-1]) + 1, -1, dtype=np.int32)
+                table[unique_keys] = first if order is None else order[first]
+            self._dense[source] = table
+        return self._dense[source]
+
+    def rows_for(self, ids, source='movielens'):
+        """source alanındaki ID'lerin eşleme satır numaralarını döndürür (bulunamayanlar -1)"""
+        if source not in ID_SPACES:
+            raise ValueError(f"Bilinmeyen ID alanı: {source}")
+        keys, order = self._sorted[source]
+        ids = np.asarray(ids, dtype=np.int64)
+        table = self.dense_table(source)
+        if table is not None:
+            inside = (ids >= 0) & (ids < len(table))
+            return np.where(inside, table[np.where(inside, ids, 0)], -1)
+        if not len(keys):
+            return np.full(len(ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+        found = keys[positions] == ids
+        rows = positions if order is None else order[positions]
+        return np.where(found, rows, -1)
+
+    def translate(self, ids, source, target):
+        """ID'leri source alanından target alanına çevirir (bulunamayanlar ve eksikler -1)"""
+        if target not in ID_SPACES:
+            raise ValueError(f"Bilinmeyen ID alanı: {target}")
+        rows = self.rows_for(ids, source)
+        values = self.columns[target]
+        if not len(values):
+            return rows
+        return np.where(rows >= 0, values[np.maximum(rows, 0)], MISSING_ID)
+
+
+def save_crosswalk(path, arrays, meta):
+    """Eşlemeyi geçici dizine yazıp atomik olarak yerine taşır"""
+    tmp_path = path.rstrip('/') + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    for name in CROSSWALK_ARRAYS:
+        np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(arrays[name]), allow_pickle=False)
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+
+
+def load_crosswalk(path):
+    """Eşlemeyi bellek eşlemeli açar"""
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != CROSSWALK_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen eşleme biçimi: {meta.get('format_version')}")
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in CROSSWALK_ARRAYS}
+    return IdCrosswalk(arrays, meta)
+
+
+def export_crosswalk(engine, path):
+    """links tablosundan eşlemeyi kurup yazar, meta döndürür"""
+    arrays, meta = build_crosswalk(*read_links(engine))
+    save_crosswalk(path, arrays, meta)
+    return meta
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="links tablosundan MovieLens/TMDB/IMDb ID eşlemesini yazar")
+    parser.add_argument('--output', default='crosswalk',
+                        help="Eşlemenin yazılacağı dizin")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    meta = export_crosswalk(create_db_engine(), args.output)
+    print(f"ID eşlemesi yazıldı: {args.output} ({meta['rows']} MovieLens, {meta['tmdb_ids']} TMDB, "
+          f"{meta['imdb_ids']} IMDb ID'si)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,78 @@
 import pandas as pd
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, Float, String, Text, Boolean, Date, ForeignKey, inspect
+from sqlalchemy import MetaData, Table, Column, Integer, Float, String, Text, Boolean, Date, ForeignKey, Index, inspect
 import zipfile
 import os
 import json
 import sys
-from dotenv import load_dotenv
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from pandas.api.types import union_categoricals
 from sqlalchemy import text
 from datetime import datetime
+from bulk_writer import get_writer, UpsertWriter, DEFAULT_BATCH_SIZE
+from delta_sync import DeltaWriter, MANIFEST_TABLE, manifest_table
+from side_tables import build_side_frames, LINK_TABLES, SOURCE_COLUMNS, SIDE_TABLE_KEYS, CAST_TOP_N
+from feature_store import FeatureCollector, file_sha256
+from table_indexes import build_indexes
+from snapshot_cache import SnapshotCache, snapshot_key, DEFAULT_MAX_CACHE_MB
+from credits_parser import CreditsParser, CreditsProjection, CREDITS_MODES, COMPACT_CREW_JOBS
+from id_crosswalk import export_crosswalk
+from ratings_store import build_ratings_store, movielens_crosswalk, RATINGS_COLUMNS, RATINGS_DTYPES, READ_CHUNK_ROWS
+import db
+from import_metrics import StageMetrics
 
-# .env dosyasını yükle
-load_dotenv()
+def create_db_engine():
+    """Veritabanı bağlantı motorunu oluşturur (paralel yüklemede her işçi kendi motorunu açar)
 
-# MySQL veritabanı bağlantısı
-DB_HOST = os.getenv('DB_HOST')
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_NAME = os.getenv('DB_NAME')
+    Bağlantı bilgileri .env'den okunur; DATABASE_URL verilirse (ör. yerel SQLite)
+    o kullanılır. LOAD DATA LOCAL INFILE yazıcısı için MySQL'de local_infile açılır.
+    """
+    return db.create_db_engine()
 
-engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}')
+# Veritabanı motoru modül yüklenirken değil, ilk kullanımda oluşturulur
+engine = None
 
-# Proje dizini ve veri dizini
+def get_engine():
+    """Veritabanı motorunu ilk çağrıda oluşturur ve döndürür"""
+    global engine
+    if engine is None:
+        engine = create_db_engine()
+    return engine
+
+# Proje dizini ve veri dizini (--data-dir ile değiştirilebilir)
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
-data_dir = os.path.abspath(os.path.join(PROJECT_DIR, '..', 'the-movie-datasets'))
-print(f"Veri dizini: {data_dir}")
+DEFAULT_DATA_DIR = os.path.abspath(os.path.join(PROJECT_DIR, '..', 'the-movie-datasets'))
+data_dir = None
 
-# Dizin içeriğini kontrol et
-if os.path.exists(data_dir):
-    print(f"Veri dizini içeriği: {os.listdir(data_dir)}")
-else:
-    print(f"Veri dizini bulunamadı: {data_dir}")
-    sys.exit(1)
+def get_data_dir():
+    """Veri dizinini ilk çağrıda belirler ve içeriğini yazdırır"""
+    global data_dir
+    if data_dir is None:
+        data_dir = DEFAULT_DATA_DIR
+        print(f"Veri dizini: {data_dir}")
+        if os.path.exists(data_dir):
+            print(f"Veri dizini içeriği: {os.listdir(data_dir)}")
+        else:
+            print(f"Veri dizini bulunamadı: {data_dir}")
+    return data_dir
 
 def drop_all_tables():
     """Tüm tabloları sil"""
-    with engine.connect() as conn:
-        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+    eng = get_engine()
+    with eng.connect() as conn:
+        if eng.dialect.name == 'mysql':
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
         conn.execute(text("DROP TABLE IF EXISTS movies_metadata"))
         conn.execute(text("DROP TABLE IF EXISTS links"))
         conn.execute(text("DROP TABLE IF EXISTS keywords"))
         conn.execute(text("DROP TABLE IF EXISTS credits"))
         conn.execute(text("DROP TABLE IF EXISTS usermovies"))
-        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {MANIFEST_TABLE}"))
+        for side_table in SIDE_TABLE_KEYS:
+            conn.execute(text(f"DROP TABLE IF EXISTS {side_table}"))
+        if eng.dialect.name == 'mysql':
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
         conn.commit()
     print("Tüm tablolar silindi")
 
@@ -83,8 +115,8 @@ def create_tables():
         'links',
         metadata,
         Column('movieId', Integer, primary_key=True),
-        Column('imdbId', String(20), nullable=True),
-        Column('tmdbId', String(20), nullable=True)
+        Column('imdbId', Integer, nullable=True),
+        Column('tmdbId', Integer, nullable=True)
     )
     
     # Keywords tablosunu oluştur
@@ -104,10 +136,125 @@ def create_tables():
         Column('crew', Text, nullable=True)
     )
     
+    # Normalleştirilmiş tür tabloları
+    Table(
+        'genres',
+        metadata,
+        Column('id', Integer, primary_key=True, autoincrement=False),
+        Column('name', String(100), nullable=False),
+        Index('ix_genres_name', 'name')
+    )
+    Table(
+        'movie_genres',
+        metadata,
+        Column('movie_id', Integer, primary_key=True, autoincrement=False),
+        Column('genre_id', Integer, primary_key=True, autoincrement=False),
+        Index('ix_movie_genres_genre_movie', 'genre_id', 'movie_id')
+    )
+    
+    # Normalleştirilmiş anahtar kelime tabloları
+    Table(
+        'keyword',
+        metadata,
+        Column('id', Integer, primary_key=True, autoincrement=False),
+        Column('name', String(255), nullable=False)
+    )
+    Table(
+        'movie_keywords',
+        metadata,
+        Column('movie_id', Integer, primary_key=True, autoincrement=False),
+        Column('keyword_id', Integer, primary_key=True, autoincrement=False),
+        Index('ix_movie_keywords_keyword_movie', 'keyword_id', 'movie_id')
+    )
+    
+    # Başroldeki oyuncular ve yönetmen/senarist ekibi
+    Table(
+        'movie_cast',
+        metadata,
+        Column('movie_id', Integer, primary_key=True, autoincrement=False),
+        Column('person_id', Integer, primary_key=True, autoincrement=False),
+        Column('name', String(255), nullable=True),
+        Column('cast_order', Integer, nullable=True),
+        Index('ix_movie_cast_person_movie', 'person_id', 'movie_id'),
+        Index('ix_movie_cast_movie_order', 'movie_id', 'cast_order')
+    )
+    Table(
+        'movie_crew',
+        metadata,
+        Column('movie_id', Integer, primary_key=True, autoincrement=False),
+        Column('person_id', Integer, primary_key=True, autoincrement=False),
+        Column('job', String(50), primary_key=True),
+        Column('name', String(255), nullable=True),
+        Index('ix_movie_crew_person_movie', 'person_id', 'movie_id'),
+        Index('ix_movie_crew_job_movie', 'job', 'movie_id')
+    )
+    
     # Tabloları oluştur
-    metadata.create_all(engine)
+    metadata.create_all(get_engine())
     print("Tablolar başarıyla oluşturuldu")
 
+# Metin sütunları Python nesneleri yerine Arrow belleğinde tutulur (değer başına ~50 bayt nesne yükü olmaz)
+TEXT_DTYPE = 'string[pyarrow]'
+
+# movies_metadata'da tabloya yazılan sütunlar; kaynaktaki diğer sütunlar hiç okunmaz
+MOVIES_METADATA_COLUMNS = [
+    'id', 'adult', 'belongs_to_collection', 'budget', 'genres', 'homepage', 'imdb_id', 'original_language',
+    'original_title', 'overview', 'popularity', 'poster_path', 'production_companies', 'production_countries',
+    'release_date', 'revenue', 'runtime', 'spoken_languages', 'status', 'tagline', 'title', 'video',
+    'vote_average', 'vote_count',
+]
+
+# read_csv'ye verilen sütun tipleri. movies_metadata'da kaymış satırlar sayısal sütunlara
+# metin yazdığından tüm sütunlar metin okunur, sayısal dönüşüm convert_data_types'ta yapılır.
+# keywords/credits değerleri birkaç KB'lık literal metinlerdir; nesne yükü önemsiz olduğundan
+# object kalırlar (Arrow'a çevirmek yalnızca geçici kopya ekler).
+READ_DTYPES = {
+    'movies_metadata': {col: TEXT_DTYPE for col in MOVIES_METADATA_COLUMNS},
+}
+
+# JSON metni olarak saklanan literal sütunları
+JSON_COLUMNS = {
+    'movies_metadata': ['genres', 'production_companies', 'production_countries', 'spoken_languages',
+                        'belongs_to_collection'],
+    'keywords': ['keywords'],
+    'credits': ['cast', 'crew'],
+}
+
+# Okunacak sütunlar (None: tümü)
+READ_COLUMNS = {
+    'movies_metadata': MOVIES_METADATA_COLUMNS,
+    'links': ['movieId', 'imdbId', 'tmdbId'],
+    'keywords': ['id', 'keywords'],
+    'credits': ['cast', 'crew', 'id'],
+}
+
+# MySQL FLOAT tek hassasiyetli olduğundan float32 veritabanına yazılan değeri değiştirmez
+FLOAT32_COLUMNS = ['budget', 'popularity', 'revenue', 'runtime', 'vote_average']
+
+# Az sayıda farklı değeri olan alanlar; tür/ülke/dil listeleri de binlerce filmde aynı metindir
+CATEGORY_COLUMNS = ['original_language', 'status', 'genres', 'production_countries', 'spoken_languages']
+
+def read_options(table_name):
+    """Tablonun CSV'si için usecols/dtype seçenekleri"""
+    columns = READ_COLUMNS.get(table_name)
+    return {
+        'usecols': (lambda col: col in columns) if columns else None,
+        'dtype': READ_DTYPES.get(table_name),
+    }
+
+def frame_bytes(df):
+    """DataFrame'in metin içerikleri dahil bellek kullanımı (bayt)"""
+    return int(df.memory_usage(deep=True).sum())
+
+def to_int32(series):
+    """Sayıya çevrilemeyen ya da tam sayı olmayan değerleri NA yapıp nullable Int32'ye dönüştürür"""
+    values = pd.to_numeric(series, errors='coerce')
+    return values.where(values == np.floor(values)).astype('Int32')
+
+def to_boolean(series):
+    """'True'/'False' metinlerini nullable boolean'a çevirir, diğer değerler NA olur"""
+    return series.map({'True': True, 'False': False, True: True, False: False}).astype('boolean')
+
 def clean_json_columns(df, json_columns):
     """JSON sütunlarını temizler ve string formatına dönüştürür"""
     for col in json_columns:
@@ -116,99 +263,430 @@ def clean_json_columns(df, json_columns):
     return df
 
 def convert_data_types(df, table_name):
-    """DataFrame veri tiplerini düzeltir"""
+    """DataFrame veri tiplerini düzeltir ve küçültür (eksik değerler NA olarak kalır)"""
     if table_name == 'movies_metadata':
-        # ID'yi integer olarak dönüştür
-        if 'id' in df.columns:
-            df['id'] = pd.to_numeric(df['id'], errors='coerce')
+        # ID ve oy sayısı nullable Int32
+        for col in ['id', 'vote_count']:
+            if col in df.columns:
+                df[col] = to_int32(df[col])
         
         # Boolean alanları düzenle
-        if 'adult' in df.columns:
-            df['adult'] = df['adult'].map({'True': True, 'False': False, True: True, False: False})
-            
-        if 'video' in df.columns:
-            df['video'] = df['video'].map({'True': True, 'False': False, True: True, False: False})
+        for col in ['adult', 'video']:
+            if col in df.columns:
+                df[col] = to_boolean(df[col])
         
         # Sayısal alanları dönüştür
-        for col in ['budget', 'popularity', 'revenue', 'runtime', 'vote_average', 'vote_count']:
+        for col in FLOAT32_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+        
+        # Az sayıda farklı değeri olan alanlar
+        for col in CATEGORY_COLUMNS:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = df[col].astype('category')
                 
         # Tarih alanını dönüştür
         if 'release_date' in df.columns:
             df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
     
     elif table_name == 'links':
-        # movieId integer olmalı
-        if 'movieId' in df.columns:
-            df['movieId'] = pd.to_numeric(df['movieId'], errors='coerce')
+        # Üç ID de integer olmalı: imdbId sıfır dolgulu metin ('0114709'), tmdbId float ('862.0') okunur
+        for col in ['movieId', 'imdbId', 'tmdbId']:
+            if col in df.columns:
+                df[col] = to_int32(df[col])
     
     elif table_name == 'keywords' or table_name == 'credits':
         # id integer olmalı
         if 'id' in df.columns:
-            df['id'] = pd.to_numeric(df['id'], errors='coerce')
+            df['id'] = to_int32(df['id'])
             
     return df
 
-def remove_duplicates(df, id_column):
-    """Dataframe'den tekrarlayan ID'leri temizle"""
-    # NaN değerleri içeren kayıtları filtrele
-    df = df.dropna(subset=[id_column])
-    
-    # ID'yi sayısal formata çevir
-    df[id_column] = pd.to_numeric(df[id_column], errors='coerce')
+# IdSet'in doğrudan adresli tablosuna alınan en büyük ID (1 bayt/ID, 16 MB)
+ID_TABLE_MAX = 1 << 24
+
+class IdSet:
+    """Film ID'leri için doğrudan adresli küme (ID -> bool tablosu)
+
+    Parça başına üyelik kontrolü tek bir vektörel dizi okumasıdır; Python
+    kümesinde satır başına arama ya da her parçada kümeyi diziye çevirip
+    Series.isin ile özetlemek büyük tablolarda 6-25 kat yavaştır. Tablo
+    gerektikçe iki katına büyür. ID_TABLE_MAX'ı aşan veya negatif (bozuk)
+    ID'ler ayrı bir Python kümesinde tutulur.
+    """
+
+    def __init__(self, ids=()):
+        self.table = np.zeros(0, dtype=bool)
+        self.overflow = set()
+        self.count = 0
+        self.update(ids)
+
+    @staticmethod
+    def _split(values):
+        """(int64 değerler, tabloya düşen maske, tablo dışı geçerli ID maskesi) döndürür"""
+        values = np.asarray(values)
+        if values.dtype.kind not in 'iu':
+            values = values.astype(np.float64)
+            valid = ~np.isnan(values) & (values == np.floor(values))
+            values = np.where(valid, values, 0).astype(np.int64)
+        else:
+            values = values.astype(np.int64, copy=False)
+            valid = np.ones(len(values), dtype=bool)
+        inside = valid & (values >= 0) & (values <= ID_TABLE_MAX)
+        return values, inside, valid & ~inside
+
+    def update(self, ids):
+        values, inside, outside = self._split(ids)
+        table_ids = values[inside]
+        if len(table_ids):
+            needed = int(table_ids.max()) + 1
+            if needed > len(self.table):
+                table = np.zeros(max(needed, 2 * len(self.table)), dtype=bool)
+                table[:len(self.table)] = self.table
+                self.table = table
+            self.table[table_ids] = True
+        if outside.any():
+            self.overflow.update(values[outside].tolist())
+        self.count = int(np.count_nonzero(self.table)) + len(self.overflow)
+
+    def contains(self, ids):
+        """ids'in her değeri için üyelik maskesi (eksik ve tam sayı olmayan değerler False)"""
+        values, inside, outside = self._split(ids)
+        inside &= values < len(self.table)
+        found = np.zeros(len(values), dtype=bool)
+        found[inside] = self.table[values[inside]]
+        if self.overflow and outside.any():
+            found[outside] = [value in self.overflow for value in values[outside].tolist()]
+        return found
+
+    def to_array(self):
+        """Sıralı int64 ID dizisi"""
+        ids = np.flatnonzero(self.table).astype(np.int64)
+        if self.overflow:
+            ids = np.sort(np.concatenate([ids, np.fromiter(self.overflow, dtype=np.int64)]))
+        return ids
+
+    def __contains__(self, value):
+        return bool(self.contains([value])[0])
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __len__(self):
+        return self.count
+
+def in_id_set(ids, id_set):
+    """ids Series değerlerinin IdSet'te olup olmadığını döndürür"""
+    values = pd.to_numeric(ids, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.Series(id_set.contains(values), index=ids.index, dtype=bool)
+
+def remove_duplicates(df, id_column, seen_ids=None):
+    """Dataframe'den tekrarlayan ID'leri temizle
+
+    seen_ids verilirse önceki parçalarda görülen ID'ler de elenir ve küme
+    bu parçanın ID'leriyle güncellenir (parça parça yüklemede kullanılır).
+    Elenecek satırlar tek maskede toplanır, böylece tablo yalnızca bir kez kopyalanır.
+    """
+    # ID'yi sayısal formata çevir, NaN değerleri içeren kayıtları filtrele
+    ids = pd.to_numeric(df[id_column], errors='coerce')
+    keep = ids.notna()
     
     # Tekrar eden ID'leri kontrol et ve rapor ver
-    duplicate_count = df.duplicated(subset=[id_column]).sum()
+    duplicated = ids.duplicated() & keep
+    duplicate_count = duplicated.sum()
     if duplicate_count > 0:
         print(f"{duplicate_count} adet tekrarlayan {id_column} değeri bulundu ve kaldırılıyor.")
-        df = df.drop_duplicates(subset=[id_column], keep='first')
+        keep &= ~duplicated
+    
+    # Önceki parçalarda yüklenmiş ID'leri ele
+    if seen_ids is not None:
+        already_seen = in_id_set(ids, seen_ids) & keep
+        if already_seen.any():
+            print(f"{already_seen.sum()} adet {id_column} değeri önceki parçalarda yüklendiği için atlanıyor.")
+            keep &= ~already_seen
+    
+    if not keep.all():
+        df = df[keep]
+        ids = ids[keep]
+    if ids.dtype != df[id_column].dtype:
+        df = df.assign(**{id_column: ids})
+    if seen_ids is not None:
+        seen_ids.update(df[id_column].to_numpy(dtype=np.int64))
     
     return df
 
-def import_movies_metadata(csv_file):
+def read_csv_chunks(csv_path, chunk_size=None, **read_kwargs):
+    """CSV dosyasını (zip arşivi içindeyse diske çıkarmadan) okur
+
+    chunk_size verilirse en fazla chunk_size satırlık DataFrame parçaları,
+    verilmezse tüm dosyayı tek parça olarak döndürür.
+    """
+    def _read(source):
+        if chunk_size:
+            with pd.read_csv(source, chunksize=chunk_size, **read_kwargs) as reader:
+                yield from reader
+        else:
+            yield pd.read_csv(source, **read_kwargs)
+
+    if csv_path.endswith('.zip'):
+        with zipfile.ZipFile(csv_path, 'r') as zip_ref:
+            csv_filename = os.path.basename(csv_path).replace('.zip', '')
+            with zip_ref.open(csv_filename) as csv_stream:
+                yield from _read(csv_stream)
+    else:
+        yield from _read(csv_path)
+
+# Tek parça yüklemede de dosya bu kadar satırlık bloklar halinde ayrıştırılıp temizlenir,
+# sonra küçültülmüş bloklar birleştirilir. Böylece ayrıştırıcının ara nesne dizileri ve
+# temizleme kopyaları tüm tablo için aynı anda bellekte tutulmaz.
+READ_BLOCK_ROWS = 5000
+
+def concat_chunks(pairs, ignore_index=False):
+    """(temiz parça, ham parça) çiftlerini tek çifte birleştirir
+
+    Bloklardaki category sütunlarının kategorileri farklı olursa pd.concat bunları
+    object'e çevirir; önce tüm bloklara ortak kategori listesi atanır.
+    """
+    pairs = list(pairs)
+    cleans = [chunk for chunk, _ in pairs]
+    for col in cleans[0].columns:
+        if isinstance(cleans[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([chunk[col] for chunk in cleans]).categories
+            for chunk in cleans:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    clean = pd.concat(cleans, ignore_index=ignore_index)
+    raw = pd.concat([raw_chunk for _, raw_chunk in pairs], ignore_index=ignore_index)
+    return clean, raw
+
+# Temizlenmiş parçalar için anlık görüntü önbelleği (main içinde açılır, --no-cache ile kapatılır)
+snapshot_cache = None
+
+# Aşama bazında süre/bellek ölçümü (main içinde --metrics ile açılır, kapalıyken maliyetsizdir)
+metrics = StageMetrics()
+
+# credits cast/crew sütunlarının işlenme biçimi (main içinde --credits-mode ile ayarlanır)
+credits_parser = CreditsParser()
+
+def cleaned_chunks(table_name, csv_path, produce, chunk_size=None, valid_ids=None, variant=None):
+    """Temizlenmiş (parça, ham parça) çiftlerini önbellekten veya produce() ile kaynaktan üretir
+
+    Kaynak arşiv ve boru hattı sürümü değişmediyse CSV ayrıştırma ve temizleme
+    atlanır; aksi halde üretilen parçalar bir sonraki çalıştırma için önbelleğe yazılır.
+    variant aynı kaynaktan farklı temizlenen çıktıları (ör. credits modu) ayırır.
+    """
+    if snapshot_cache is None:
+        yield from produce()
+        return
+    
+    key = snapshot_key(table_name, csv_path, valid_ids, variant)
+    cached = snapshot_cache.load(key)
+    if cached is not None:
+        print(f"{table_name} önbellekteki anlık görüntüden okunuyor ({key})")
+        cached = metrics.iterate('snapshot_load', table_name, cached)
+        if chunk_size:
+            for clean_part, raw_part in cached:
+                for start in range(0, len(clean_part), chunk_size):
+                    yield clean_part.iloc[start:start + chunk_size], raw_part.iloc[start:start + chunk_size]
+        else:
+            yield concat_chunks(cached, ignore_index=True)
+        return
+    
+    snapshot = snapshot_cache.writer(key)
+    try:
+        for chunk, raw_chunk in produce():
+            with metrics.stage('snapshot_write', table_name, len(chunk)):
+                snapshot.add(chunk, raw_chunk)
+            yield chunk, raw_chunk
+    except BaseException:
+        snapshot.abort()
+        raise
+    snapshot.commit()
+
+def get_valid_ids(movies_df):
+    """movies_df içindeki geçerli film ID'lerini IdSet olarak döndürür"""
+    if movies_df is None or 'id' not in movies_df.columns:
+        return None
+    valid_ids = IdSet(movies_df['id'].dropna().to_numpy(dtype=np.int64))
+    return valid_ids or None
+
+def clean_movies_metadata(df):
+    """movies_metadata parçasını temizler ve veri tiplerini düzeltir
+
+    Eksik değerler boş metne çevrilmez, veritabanına NULL olarak yazılır.
+    """
+    # JSON sütunları temizle; category olmayacaklar yeniden Arrow metnine çevrilir
+    df = clean_json_columns(df, JSON_COLUMNS['movies_metadata'])
+    for col in JSON_COLUMNS['movies_metadata']:
+        if col in df.columns and col not in CATEGORY_COLUMNS:
+            df[col] = df[col].astype(TEXT_DTYPE)
+    
+    # Veri tiplerini düzelt
+    return convert_data_types(df, 'movies_metadata')
+
+def clean_dependent_table(df, table_name, id_column, valid_ids, seen_ids=None, json_columns=()):
+    """movies_metadata'ya bağlı tablo parçasını filtreler, tekrarları ve JSON sütunlarını temizler"""
+    with metrics.stage('clean', table_name, len(df)) as stage:
+        # Veri tiplerini düzelt
+        df = convert_data_types(df, table_name)
+        
+        # Sadece movies_metadata'da bulunan filmleri al (links'te film ID'si tmdbId sütunudur)
+        if valid_ids:
+            movie_id_column = MOVIE_ID_COLUMNS.get(table_name, id_column)
+            df = df[in_id_set(df[movie_id_column], valid_ids)]
+        stage['rows_out'] = len(df)
+    
+    # Tekrar eden verileri temizle
+    with metrics.stage('dedupe', table_name, len(df)) as stage:
+        df = remove_duplicates(df, id_column, seen_ids)
+        stage['rows_out'] = len(df)
+    
+    # JSON sütunlarını temizle (süre clean aşamasına eklenir)
+    with metrics.stage('clean', table_name):
+        return clean_json_columns(df, list(json_columns))
+
+def align_raw(raw_chunk, chunk):
+    """Ham sütunları temiz parçanın satırlarına indirger (normalleştirilmiş tablolar konumla eşleştirir)"""
+    if len(raw_chunk) == len(chunk):
+        return raw_chunk
+    return raw_chunk.loc[chunk.index]
+
+def movies_metadata_chunks(csv_path, chunk_size=None, seen_ids=None):
+    """movies_metadata CSV'sini okuyup temizlenmiş (parça, ham parça) çiftleri üretir
+
+    chunk_size verilmezse dosya READ_BLOCK_ROWS satırlık bloklar halinde işlenir.
+    """
+    chunks = read_csv_chunks(csv_path, chunk_size or READ_BLOCK_ROWS, **read_options('movies_metadata'))
+    for chunk in metrics.iterate('read_csv', 'movies_metadata', chunks):
+        print(f"CSV okundu, satır sayısı: {len(chunk)}")
+        raw_chunk = chunk[SOURCE_COLUMNS['movies_metadata']].copy()
+        
+        # Temizle, tekrarları kaldır
+        with metrics.stage('clean', 'movies_metadata', len(chunk)) as stage:
+            chunk = clean_movies_metadata(chunk)
+            stage['rows_out'] = len(chunk)
+        with metrics.stage('dedupe', 'movies_metadata', len(chunk)) as stage:
+            chunk = remove_duplicates(chunk, 'id', seen_ids)
+            stage['rows_out'] = len(chunk)
+        yield chunk, align_raw(raw_chunk, chunk)
+
+def dependent_table_chunks(csv_path, table_name, id_column, chunk_size=None, valid_ids=None, seen_ids=None,
+                           json_columns=(), parser=None):
+    """Bağımlı tablo CSV'sini okuyup temizlenmiş (parça, ham parça) çiftleri üretir
+
+    parser verilirse JSON sütunları clean_json_columns yerine parser ile
+    (işçi süreçlerde, okuma ve yazmayla eşzamanlı) dönüştürülür.
+    """
+    def pairs():
+        chunks = read_csv_chunks(csv_path, chunk_size or READ_BLOCK_ROWS, **read_options(table_name))
+        for chunk in metrics.iterate('read_csv', table_name, chunks):
+            print(f"{table_name} okundu, satır sayısı: {len(chunk)}")
+            raw_chunk = chunk[SOURCE_COLUMNS.get(table_name, [])].copy()
+            
+            chunk = clean_dependent_table(chunk, table_name, id_column, valid_ids, seen_ids,
+                                          () if parser is not None else json_columns)
+            yield chunk, align_raw(raw_chunk, chunk)
+    
+    if parser is None:
+        return pairs()
+    return parser.map(pairs(), table_name, metrics)
+
+def write_frame(df, table_name, writer=None):
+    """DataFrame'i seçilen yazıcı ile toplu yükleme oturumunda veritabanına yazar"""
+    writer = writer or get_writer('to_sql')
+    with metrics.stage('write', table_name, len(df)) as stage, writer.session(get_engine()) as conn:
+        writer.write(df, table_name, conn)
+        stage['rows_out'] = len(writer.last_written_index)
+    # Gerçekten yazılan satırlar (artımlı modda yalnızca değişenler)
+    return writer.last_written_index
+
+def write_side_tables(table_name, raw_df, clean_df, written_index, seen_ids, batch_size=DEFAULT_BATCH_SIZE):
+    """Yazılan filmler için normalleştirilmiş tür/anahtar kelime/oyuncu tablolarını yeniler"""
+    if table_name not in LINK_TABLES or not len(written_index):
+        return
+    with metrics.stage('side_tables', table_name, len(written_index)) as stage:
+        stage['rows_out'] = _write_side_tables(table_name, raw_df, clean_df, written_index, seen_ids, batch_size)
+
+def _write_side_tables(table_name, raw_df, clean_df, written_index, seen_ids, batch_size):
+    """Bağlantı tablolarını yeniler, üretilip yazılan satır sayısını döndürür"""
+    # Ham parça temiz parçayla satır satır hizalıdır. Tüm satırlar yazıldıysa bloklar
+    # konumla alınır; büyük indekste .loc her çerçeve için bir hash tablosu kurar.
+    if not written_index.equals(clean_df.index):
+        clean_df, raw_df = clean_df.loc[written_index], raw_df.loc[written_index]
+    movie_ids = clean_df[TABLE_KEYS[table_name]].astype(int)
+    
+    writer = UpsertWriter(batch_size, SIDE_TABLE_KEYS)
+    rows_written = 0
+    with get_engine().begin() as conn:
+        # Bu filmlerin eski bağlantı satırlarını kaldır, yenilerini yaz
+        id_values = movie_ids.to_numpy()
+        for link_table in LINK_TABLES[table_name]:
+            for start in range(0, len(id_values), batch_size):
+                batch = ', '.join(map(str, id_values[start:start + batch_size].tolist()))
+                conn.execute(text(f"DELETE FROM {link_table} WHERE movie_id IN ({batch})"))
+        # Literal ayrıştırmanın ara tabloları büyük olduğundan filmler bloklar halinde işlenir
+        for start in range(0, len(movie_ids), READ_BLOCK_ROWS):
+            block = slice(start, start + READ_BLOCK_ROWS)
+            for side_table, frame in build_side_frames(table_name, movie_ids.iloc[block], raw_df.iloc[block], seen_ids):
+                writer.write(frame, side_table, conn)
+                rows_written += len(frame)
+    return rows_written
+
+def finish_table(table_name, writer=None):
+    """Tablonun tüm parçaları yazıldıktan sonra yazıcının son adımını çalıştırır
+
+    Aşamanın rows_out değeri yazıcının son adımda sildiği satır sayısıdır.
+    """
+    if writer is None:
+        return
+    # Satır yazmadığı için write aşamasının satır/sn değerini bozmaması adına ayrı ölçülür
+    with metrics.stage('finish', table_name) as stage, writer.session(get_engine()) as conn:
+        stage['rows_out'] = writer.finish(table_name, conn) or 0
+
+def import_movies_metadata(csv_file, chunk_size=None, writer=None, collector=None):
     try:
-        csv_path = os.path.join(data_dir, csv_file)
+        csv_path = os.path.join(get_data_dir(), csv_file)
         print(f"CSV dosyası kontrol ediliyor: {csv_path}")
         
         if not os.path.exists(csv_path):
             print(f"Hata: CSV dosyası bulunamadı: {csv_path}")
             return None
-            
-        with zipfile.ZipFile(csv_path, 'r') as zip_ref:
-            csv_filename = csv_file.replace('.zip', '')
-            zip_ref.extract(csv_filename, data_dir)
-            extracted_path = os.path.join(data_dir, csv_filename)
-            print(f"CSV çıkarıldı: {extracted_path}")
-            
-            df = pd.read_csv(extracted_path, low_memory=False)
-            print(f"CSV yüklendi, satır sayısı: {len(df)}")
-            
-            # Geçici dosyayı sil
-            os.remove(extracted_path)
         
-        # NaN değerleri temizle
-        df = df.fillna('')
+        # Parça parça yüklemede tüm parçalar boyunca görülen ID'ler
+        seen_ids = IdSet()
+        df = None
+        row_count = 0
         
-        # JSON sütunları temizle
-        json_columns = ['genres', 'production_companies', 'production_countries', 'spoken_languages', 'belongs_to_collection']
-        df = clean_json_columns(df, json_columns)
+        # Normalleştirilmiş tablolar için parçalar arası görülen tür ID'leri
+        side_seen_ids = {}
         
-        # Gereksiz sütunları kaldır
-        if 'Unnamed: 0' in df.columns:
-            df = df.drop('Unnamed: 0', axis=1)
+        def produce():
+            return movies_metadata_chunks(csv_path, chunk_size, seen_ids)
         
-        # Veri tiplerini düzelt
-        df = convert_data_types(df, 'movies_metadata')
-        
-        # Tekrar eden verileri temizle
-        df = remove_duplicates(df, 'id')
+        pairs = cleaned_chunks('movies_metadata', csv_path, produce, chunk_size)
+        if not chunk_size:
+            pairs = [concat_chunks(pairs)]
+        for chunk, raw_chunk in pairs:
+            seen_ids.update(chunk['id'].to_numpy(dtype=np.int64))
+            
+            # Verileri veritabanına aktar
+            print("Veritabanına aktarılıyor...")
+            written_index = write_frame(chunk, 'movies_metadata', writer)
+            write_side_tables('movies_metadata', raw_chunk, chunk, written_index, side_seen_ids,
+                              getattr(writer, 'batch_size', DEFAULT_BATCH_SIZE))
+            if collector is not None:
+                with metrics.stage('feature_collect', 'movies_metadata', len(chunk)):
+                    collector.add('movies_metadata', chunk, raw_chunk)
+            row_count += len(chunk)
+            
+            if not chunk_size:
+                df = chunk
         
-        # Verileri veritabanına aktar
-        print("Veritabanına aktarılıyor...")
-        df.to_sql('movies_metadata', engine, if_exists='append', index=False)
-        print("movies_metadata tablosu başarıyla oluşturuldu ve veriler aktarıldı.")
+        finish_table('movies_metadata', writer)
+        print(f"movies_metadata tablosu başarıyla oluşturuldu ve {row_count} satır aktarıldı.")
         
+        # Parça modunda bağımlı tablolar için yalnızca ID'ler döndürülür
+        if chunk_size:
+            df = pd.DataFrame({'id': seen_ids.to_array()})
         return df
     except Exception as e:
         print(f"movies_metadata yüklenirken hata oluştu: {str(e)}")
@@ -216,197 +694,542 @@ def import_movies_metadata(csv_file):
         traceback.print_exc()
         return None
 
-def import_links(csv_file, movies_df):
+def import_dependent_table(csv_file, table_name, id_column, movies_df, chunk_size=None, json_columns=(), writer=None,
+                           collector=None, parser=None):
+    """movies_metadata'ya bağlı bir tabloyu (links, keywords, credits) yükler"""
     try:
-        csv_path = os.path.join(data_dir, csv_file)
-        print(f"Links dosyası kontrol ediliyor: {csv_path}")
+        csv_path = os.path.join(get_data_dir(), csv_file)
+        print(f"{table_name} dosyası kontrol ediliyor: {csv_path}")
         
         if not os.path.exists(csv_path):
-            print(f"Hata: Links dosyası bulunamadı: {csv_path}")
+            print(f"Hata: {table_name} dosyası bulunamadı: {csv_path}")
             return False
-            
-        df = pd.read_csv(csv_path)
-        print(f"Links yüklendi, satır sayısı: {len(df)}")
         
-        # Veri tiplerini düzelt
-        df = convert_data_types(df, 'links')
-            
-        # Eğer movies_df'te id sütunu varsa, sadece eşleşen ID'leri al
-        if movies_df is not None and 'id' in movies_df.columns:
-            valid_ids = movies_df['id'].dropna().astype(int).tolist()
-            if valid_ids:
-                df = df[df['movieId'].isin(valid_ids)]
+        valid_ids = get_valid_ids(movies_df)
+        seen_ids = IdSet()
+        side_seen_ids = {}
+        row_count = 0
         
-        # Tekrar eden verileri temizle
-        df = remove_duplicates(df, 'movieId')
+        def produce():
+            return dependent_table_chunks(csv_path, table_name, id_column, chunk_size, valid_ids, seen_ids,
+                                          json_columns, parser)
         
-        # Verileri veritabanına aktar
-        print("Links veritabanına aktarılıyor...")
-        df.to_sql('links', engine, if_exists='append', index=False)
-        print("links tablosu başarıyla oluşturuldu ve veriler aktarıldı.")
+        variant = parser.cache_variant() if parser is not None else None
+        pairs = cleaned_chunks(table_name, csv_path, produce, chunk_size, valid_ids, variant)
+        if not chunk_size:
+            pairs = [concat_chunks(pairs)]
+        for chunk, raw_chunk in pairs:
+            # Verileri veritabanına aktar
+            print(f"{table_name} veritabanına aktarılıyor...")
+            written_index = write_frame(chunk, table_name, writer)
+            write_side_tables(table_name, raw_chunk, chunk, written_index, side_seen_ids,
+                              getattr(writer, 'batch_size', DEFAULT_BATCH_SIZE))
+            if collector is not None:
+                with metrics.stage('feature_collect', table_name, len(chunk)):
+                    collector.add(table_name, chunk, raw_chunk)
+            row_count += len(chunk)
+        
+        finish_table(table_name, writer)
+        if parser is not None:
+            parser.report()
+        print(f"{table_name} tablosu başarıyla oluşturuldu ve {row_count} satır aktarıldı.")
         return True
     except Exception as e:
-        print(f"links yüklenirken hata oluştu: {str(e)}")
+        print(f"{table_name} yüklenirken hata oluştu: {str(e)}")
         import traceback
         traceback.print_exc()
         return False
 
-def import_keywords(csv_file, movies_df):
-    try:
-        csv_path = os.path.join(data_dir, csv_file)
-        print(f"Keywords dosyası kontrol ediliyor: {csv_path}")
-        
-        if not os.path.exists(csv_path):
-            print(f"Hata: Keywords dosyası bulunamadı: {csv_path}")
+def import_links(csv_file, movies_df, chunk_size=None, writer=None, collector=None):
+    return import_dependent_table(csv_file, 'links', 'movieId', movies_df, chunk_size, writer=writer,
+                                  collector=collector)
+
+def import_keywords(csv_file, movies_df, chunk_size=None, writer=None, collector=None):
+    return import_dependent_table(csv_file, 'keywords', 'id', movies_df, chunk_size, JSON_COLUMNS['keywords'],
+                                  writer, collector)
+
+def import_credits(csv_file, movies_df, chunk_size=None, writer=None, collector=None):
+    return import_dependent_table(csv_file, 'credits', 'id', movies_df, chunk_size, JSON_COLUMNS['credits'],
+                                  writer, collector, credits_parser)
+
+def import_ratings(ratings_file, movies_df, output, chunk_size=READ_CHUNK_ROWS):
+    """MovieLens puan dosyasını links eşlemesiyle bellek eşlemeli CSR deposuna aktarır
+
+    Puanlar veritabanına yazılmaz; dosya parça parça okunur ve depo tüm tablo
+    bellekte tutulmadan kurulur (bkz. ratings_store.py).
+    """
+    ratings_path = os.path.join(get_data_dir(), ratings_file)
+    links_path = os.path.join(get_data_dir(), DEPENDENT_TABLES['links'][2])
+    for path in (ratings_path, links_path):
+        if not os.path.exists(path):
+            print(f"Hata: puan deposu için dosya bulunamadı: {path}")
             return False
-            
-        with zipfile.ZipFile(csv_path, 'r') as zip_ref:
-            csv_filename = csv_file.replace('.zip', '')
-            zip_ref.extract(csv_filename, data_dir)
-            extracted_path = os.path.join(data_dir, csv_filename)
-            print(f"Keywords CSV çıkarıldı: {extracted_path}")
-            
-            df = pd.read_csv(extracted_path)
-            print(f"Keywords yüklendi, satır sayısı: {len(df)}")
-            
-            # Geçici dosyayı sil
-            os.remove(extracted_path)
-        
-        # Veri tiplerini düzelt
-        df = convert_data_types(df, 'keywords')
-            
-        # Eğer movies_df'te id sütunu varsa, sadece eşleşen ID'leri al
-        if movies_df is not None and 'id' in movies_df.columns:
-            valid_ids = movies_df['id'].dropna().astype(int).tolist()
-            if valid_ids:
-                df = df[df['id'].isin(valid_ids)]
-        
-        # Tekrar eden verileri temizle
-        df = remove_duplicates(df, 'id')
-        
-        # JSON sütunlarını temizle
-        df = clean_json_columns(df, ['keywords'])
+    
+    try:
+        links = next(read_csv_chunks(links_path, usecols=['movieId', 'tmdbId']))
+        crosswalk = movielens_crosswalk(links, get_valid_ids(movies_df))
+        del links
+        print(f"{len(crosswalk[0])} MovieLens filmi movies_metadata ID'lerine eşlendi")
         
-        # Verileri veritabanına aktar
-        print("Keywords veritabanına aktarılıyor...")
-        df.to_sql('keywords', engine, if_exists='append', index=False)
-        print("keywords tablosu başarıyla oluşturuldu ve veriler aktarıldı.")
+        chunks = read_csv_chunks(ratings_path, chunk_size, usecols=RATINGS_COLUMNS, dtype=RATINGS_DTYPES)
+        with metrics.stage('ratings_store', 'ratings') as counts:
+            meta = build_ratings_store(metrics.iterate('read_csv', 'ratings', chunks), crosswalk, output)
+            counts['rows_out'] = meta['nnz']
+        print(f"Puan deposu yazıldı: {output} ({meta['n_users']} kullanıcı, {meta['n_items']} film, "
+              f"{meta['nnz']} puan, eşlenemeyen {meta['skipped_rows']} satır atlandı, {meta['build_seconds']:.1f} sn)")
         return True
     except Exception as e:
-        print(f"keywords yüklenirken hata oluştu: {str(e)}")
+        print(f"Puan deposu oluşturulurken hata oluştu: {str(e)}")
         import traceback
         traceback.print_exc()
         return False
 
-def import_credits(csv_file, movies_df):
-    try:
-        csv_path = os.path.join(data_dir, csv_file)
-        print(f"Credits dosyası kontrol ediliyor: {csv_path}")
-        
-        if not os.path.exists(csv_path):
-            print(f"Hata: Credits dosyası bulunamadı: {csv_path}")
-            return False
-            
-        with zipfile.ZipFile(csv_path, 'r') as zip_ref:
-            csv_filename = csv_file.replace('.zip', '')
-            zip_ref.extract(csv_filename, data_dir)
-            extracted_path = os.path.join(data_dir, csv_filename)
-            print(f"Credits CSV çıkarıldı: {extracted_path}")
-            
-            df = pd.read_csv(extracted_path)
-            print(f"Credits yüklendi, satır sayısı: {len(df)}")
-            
-            # Geçici dosyayı sil
-            os.remove(extracted_path)
+# Artımlı aktarımda tabloların birincil anahtarları
+TABLE_KEYS = {
+    'movies_metadata': 'id',
+    'links': 'movieId',
+    'keywords': 'id',
+    'credits': 'id',
+}
+
+# movies_metadata.id'ye karşılık gelen sütun birincil anahtardan farklıysa
+# (links'in anahtarı MovieLens movieId'dir, TMDB ID'si tmdbId'dir)
+MOVIE_ID_COLUMNS = {
+    'links': 'tmdbId',
+}
+
+# Artımlı aktarımda kullanıcı verisinde geçen filmler silinmez (UserMovies yalnızca okunur)
+PROTECTED_KEYS = {
+    'movies_metadata': ('UserMovies', 'MoviesMetaDataId'),
+}
+
+# Paralel yüklenebilen bağımlı tablolar: tablo adı -> (ekran adı, yükleme fonksiyonu, dosya)
+DEPENDENT_TABLES = {
+    'links': ('Links', import_links, 'links.csv'),
+    'keywords': ('Keywords', import_keywords, 'keywords.csv.zip'),
+    'credits': ('Credits', import_credits, 'credits.csv.zip'),
+}
+
+# İşçi sürecine başlangıçta bir kez aktarılan geçerli film ID'leri
+_worker_valid_ids = None
+
+def _init_import_worker(valid_ids, cache=None, source_dir=None, parser=None):
+    """İşçi süreci için kendi veritabanı motorunu açar, geçerli ID'leri, önbelleği, veri dizinini ve credits ayarlarını saklar"""
+    global engine, _worker_valid_ids, snapshot_cache, data_dir, credits_parser
+    # Ana süreçten kalan bağlantılar paylaşılmamalı, her işçi kendi motorunu kullanır
+    engine = create_db_engine()
+    _worker_valid_ids = valid_ids
+    snapshot_cache = cache
+    data_dir = source_dir
+    credits_parser = parser or CreditsParser()
+    # İşçiler hiçbir zaman kullanıcıdan girdi beklememeli
+    sys.stdin = open(os.devnull)
+
+def _run_import_job(table_name, chunk_size, writer, collector, job_metrics):
+    """İşçi sürecinde tek bir bağımlı tabloyu yükler"""
+    global metrics
+    _, import_func, csv_file = DEPENDENT_TABLES[table_name]
+    movies_df = pd.DataFrame({'id': _worker_valid_ids}) if len(_worker_valid_ids) else None
+    metrics = job_metrics
+    success = import_func(csv_file, movies_df, chunk_size, writer, collector)
+    metrics.dump_profile(table_name)
+    metrics.close()
+    return success, writer, collector, metrics
+
+def import_dependent_tables_parallel(movies_df, jobs, chunk_size, writer_for, collector=None, table_names=None):
+    """links, keywords ve credits tablolarını (veya table_names'dekileri) işçi süreç havuzunda paralel yükler"""
+    # ID'ler küme yerine sıkıştırılmış numpy dizisi olarak işçilere bir kez gönderilir
+    valid_ids = get_valid_ids(movies_df)
+    valid_ids = valid_ids.to_array() if valid_ids is not None else np.zeros(0, dtype=np.int64)
+    
+    success = True
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_import_worker,
+                             initargs=(valid_ids, snapshot_cache, get_data_dir(), credits_parser)) as executor:
+        futures = {}
+        for table_name, (label, _, _) in DEPENDENT_TABLES.items():
+            if table_names is not None and table_name not in table_names:
+                continue
+            print(f"{label} yükleniyor (paralel)...")
+            job_collector = FeatureCollector() if collector is not None else None
+            future = executor.submit(_run_import_job, table_name, chunk_size, writer_for(table_name), job_collector,
+                                     metrics.spawn())
+            futures[future] = table_name
         
-        # Veri tiplerini düzelt
-        df = convert_data_types(df, 'credits')
+        for future in as_completed(futures):
+            table_name = futures[future]
+            label = DEPENDENT_TABLES[table_name][0]
+            try:
+                table_success, worker_writer, worker_collector, worker_metrics = future.result()
+                writer_for(table_name).merge(worker_writer)
+                metrics.merge(worker_metrics)
+                if collector is not None:
+                    collector.merge(worker_collector)
+            except Exception as e:
+                print(f"{label} yüklenirken işçi süreçte hata oluştu: {str(e)}")
+                table_success = False
             
-        # Eğer movies_df'te id sütunu varsa, sadece eşleşen ID'leri al
-        if movies_df is not None and 'id' in movies_df.columns:
-            valid_ids = movies_df['id'].dropna().astype(int).tolist()
-            if valid_ids:
-                df = df[df['id'].isin(valid_ids)]
-        
-        # Tekrar eden verileri temizle
-        df = remove_duplicates(df, 'id')
-        
-        # JSON sütunlarını temizle
-        df = clean_json_columns(df, ['cast', 'crew'])
+            if table_success:
+                print(f"{label} yüklendi.")
+            else:
+                print(f"{label} yüklenemedi.")
+                success = False
+    return success
+
+def source_fingerprint(csv_files):
+    """Kaynak dosyaların SHA-256 özetlerinden tek bir parmak izi üretir"""
+    parts = []
+    for csv_file in csv_files:
+        csv_path = os.path.join(get_data_dir(), csv_file)
+        parts.append(f"{csv_file}:{file_sha256(csv_path) if os.path.exists(csv_path) else '-'}")
+    return ';'.join(parts)
+
+def build_writers(writer_specs, batch_size):
+    """--writer parametrelerinden tablo -> yazıcı eşlemesi oluşturur
+
+    'multirow' gibi bir değer tüm tabloların varsayılanını, 'credits=infile'
+    gibi bir değer yalnızca o tablonun yazıcısını belirler.
+    """
+    writers = {None: get_writer('to_sql', batch_size)}
+    for spec in writer_specs or []:
+        table_name, _, writer_name = spec.rpartition('=')
+        writers[table_name or None] = get_writer(writer_name, batch_size)
+    return writers
+
+# Tablo -> yalnızca bu tablodan türetilen normalleştirilmiş tablolar (tek tablo silinirken birlikte silinir)
+DERIVED_TABLES = {
+    'movies_metadata': ['genres', 'movie_genres'],
+    'links': [],
+    'keywords': ['keyword', 'movie_keywords'],
+    'credits': ['movie_cast', 'movie_crew'],
+}
+
+def drop_tables(table_names):
+    """Yalnızca verilen tabloları ve onlardan türetilen tabloları siler
+
+    drop_all_tables'dan farklı olarak kullanıcı tablolarına dokunulmaz. Silinen
+    tabloların artımlı aktarım manifest satırları da temizlenir.
+    """
+    eng = get_engine()
+    with eng.begin() as conn:
+        if eng.dialect.name == 'mysql':
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        for table_name in table_names:
+            for name in [table_name] + DERIVED_TABLES[table_name]:
+                conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                print(f"{name} tablosu silindi")
+        if inspect(conn).has_table(MANIFEST_TABLE):
+            conn.execute(manifest_table.delete().where(manifest_table.c.table_name.in_(list(table_names))))
+        if eng.dialect.name == 'mysql':
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+
+def load_existing_movie_ids():
+    """Yeniden yüklenmeyen movies_metadata tablosundaki film ID'lerini döndürür"""
+    eng = get_engine()
+    if not inspect(eng).has_table('movies_metadata'):
+        print("movies_metadata tablosu yok, bağımlı tablolar filtrelenmeden yüklenecek.")
+        return None
+    with eng.connect() as conn:
+        movies_df = pd.read_sql(text("SELECT id FROM movies_metadata"), conn)
+    print(f"Geçerli film ID'leri mevcut movies_metadata tablosundan alındı: {len(movies_df)} film")
+    return movies_df if len(movies_df) else None
+
+def verify_tables():
+    """Tabloların varlığını, satır sayılarını ve movies_metadata'da olmayan ID'leri kontrol eder"""
+    eng = get_engine()
+    existing = set(inspect(eng).get_table_names())
+    ok = True
+    with eng.connect() as conn:
+        for table_name, key_column in TABLE_KEYS.items():
+            if table_name not in existing:
+                print(f"HATA: {table_name} tablosu yok")
+                ok = False
+                continue
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+            message = f"{table_name}: {count} satır"
+            if count == 0:
+                message += " (BOŞ)"
+                ok = False
+            if table_name != 'movies_metadata' and 'movies_metadata' in existing:
+                movie_id_column = MOVIE_ID_COLUMNS.get(table_name, key_column)
+                orphans = conn.execute(text(
+                    f"SELECT COUNT(*) FROM {table_name} "
+                    f"WHERE {movie_id_column} NOT IN (SELECT id FROM movies_metadata)")).scalar()
+                if orphans:
+                    message += f", movies_metadata'da olmayan {orphans} {movie_id_column}"
+                    ok = False
+            print(message)
         
-        # Verileri veritabanına aktar
-        print("Credits veritabanına aktarılıyor...")
-        df.to_sql('credits', engine, if_exists='append', index=False)
-        print("credits tablosu başarıyla oluşturuldu ve veriler aktarıldı.")
+        for table_name, derived in DERIVED_TABLES.items():
+            for name in derived:
+                if name not in existing:
+                    print(f"HATA: {name} tablosu yok ({table_name} yeniden yüklenmeli)")
+                    ok = False
+                else:
+                    print(f"{name}: {conn.execute(text(f'SELECT COUNT(*) FROM {name}')).scalar()} satır")
+    
+    print("Doğrulama başarılı." if ok else "Doğrulama başarısız.")
+    return ok
+
+COMMANDS = ('full', 'load', 'drop', 'verify')
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır
+
+    Alt komut verilmezse eski davranış (full) kullanılır:
+        python import_data.py --chunk-size 20000
+        python import_data.py load credits keywords --jobs 2
+        python import_data.py drop credits
+        python import_data.py verify
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv.insert(0, 'full')
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--data-dir', default=None,
+                        help=f"Kaynak CSV/zip dosyalarının dizini (varsayılan: {DEFAULT_DATA_DIR})")
+    common.add_argument('--force', action='store_true',
+                        help="Hata olan tablolarda ve silme işleminde onay sormadan devam et")
+    
+    load_options = argparse.ArgumentParser(add_help=False)
+    load_options.add_argument('--chunk-size', type=int, default=None,
+                              help="CSV'leri bu kadar satırlık parçalar halinde oku ve yaz (bellek kullanımı parça boyutuyla sınırlı kalır)")
+    load_options.add_argument('--writer', action='append', default=[],
+                              help="Yazıcı: to_sql, multirow veya infile. Tablo bazında seçmek için credits=infile gibi verin (tekrarlanabilir)")
+    load_options.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                              help="Yazıcıların tek seferde gönderdiği satır sayısı")
+    load_options.add_argument('--incremental', action='store_true',
+                              help="Tabloları silmeden yalnızca değişen satırları ekle/güncelle/sil (kullanıcı tablolarına dokunulmaz)")
+    load_options.add_argument('--feature-store', default=None,
+                              help="Aktarım sonunda film özellik deposunu (bellek eşlemeli .npy dosyaları) bu dizine yaz")
+    load_options.add_argument('--crosswalk', default=None,
+                              help="Aktarım sonunda links tablosundan MovieLens/TMDB/IMDb ID eşlemesini (sıralı .npy dizileri) bu dizine yaz")
+    load_options.add_argument('--ratings-store', default=None,
+                              help="MovieLens puan dosyasını bu dizine bellek eşlemeli CSR deposu olarak aktar")
+    load_options.add_argument('--ratings-file', default='ratings.csv',
+                              help="Veri dizinindeki MovieLens puan dosyası (.csv veya .csv.zip)")
+    load_options.add_argument('--jobs', type=int, default=1,
+                              help="links, keywords ve credits tablolarını bu kadar işçi süreçte paralel yükle")
+    load_options.add_argument('--credits-mode', choices=CREDITS_MODES, default='compact',
+                              help="credits cast/crew: compact (ilk N oyuncu ve seçili görevler, JSON dizisi) "
+                                   "veya full (tüm liste, önceki biçim)")
+    load_options.add_argument('--cast-top-n', type=int, default=CAST_TOP_N,
+                              help="compact modda order'a göre saklanan oyuncu sayısı")
+    load_options.add_argument('--crew-jobs', nargs='+', default=list(COMPACT_CREW_JOBS),
+                              help="compact modda saklanan ekip görevleri")
+    load_options.add_argument('--credits-workers', type=int, default=os.cpu_count() or 1,
+                              help="credits cast/crew ayrıştırması için işçi süreç sayısı")
+    load_options.add_argument('--skip-indexes', action='store_true',
+                              help="Yükleme sonrası ikincil ve FULLTEXT indeksleri oluşturma")
+    load_options.add_argument('--no-cache', action='store_true',
+                              help="Temizlenmiş veri anlık görüntülerini kullanma, CSV'leri yeniden ayrıştır")
+    load_options.add_argument('--cache-dir', default=os.path.join(PROJECT_DIR, '.import_cache'),
+                              help="Anlık görüntü önbelleği dizini")
+    load_options.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_CACHE_MB,
+                              help="Önbellek dizininin en fazla boyutu (MB), aşılınca eski anlık görüntüler silinir")
+    load_options.add_argument('--metrics', action='store_true',
+                              help="Aşama bazında süre, satır sayısı, satır/sn ve bellek ölçümünü aç (sonda JSON satırları yazılır)")
+    load_options.add_argument('--metrics-file', default=None,
+                              help="Ölçüm JSON satırlarını standart çıktı yerine bu dosyaya ekle (--metrics'i açar)")
+    load_options.add_argument('--prometheus-textfile', default=None,
+                              help="Ölçümleri node_exporter textfile collector dosyası olarak da yaz (--metrics'i açar)")
+    load_options.add_argument('--profile', default=None, metavar='STAGE',
+                              help="Aşamayı cProfile ile sar: read_csv, clean, dedupe, write, side_tables, index... "
+                                   "veya yalnızca bir tablo için credits.side_tables gibi")
+    load_options.add_argument('--profile-output', default=None,
+                              help="cProfile istatistik dosyası (varsayılan: import_profile_<aşama>.prof)")
+    
+    parser = argparse.ArgumentParser(description="Film veri setlerini MySQL veritabanına aktarır")
+    commands = parser.add_subparsers(dest='command', metavar='KOMUT')
+    commands.add_parser('full', parents=[common, load_options],
+                        help="Tüm tabloları (kullanıcı tabloları dahil) silip yeniden yükle (varsayılan)")
+    load_parser = commands.add_parser('load', parents=[common, load_options],
+                                      help="Yalnızca verilen tabloları yeniden yükle")
+    load_parser.add_argument('tables', nargs='+', choices=list(TABLE_KEYS))
+    drop_parser = commands.add_parser('drop', parents=[common],
+                                      help="Verilen tabloları ve onlardan türetilen tabloları sil")
+    drop_parser.add_argument('tables', nargs='+', choices=list(TABLE_KEYS))
+    commands.add_parser('verify', parents=[common],
+                        help="Tablo varlığını, satır sayılarını ve yetim ID'leri kontrol et")
+    return parser.parse_args(argv)
+
+def confirm(message, force_mode):
+    """Kullanıcıdan E/H onayı alır (--force ile sorulmaz)"""
+    if force_mode:
         return True
-    except Exception as e:
-        print(f"credits yüklenirken hata oluştu: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
+    print(f"{message} (E/H)")
+    return input().strip().upper() == 'E'
 
-# Ana yükleme işlemi
-def main():
-    # Parametreleri kontrol et
-    force_mode = "--force" in sys.argv
+def run_import(args, table_names):
+    """Verilen tabloları yükler; tüm tablolar verildiyse (full) önce her şeyi siler"""
+    global snapshot_cache, metrics, credits_parser
+    force_mode = args.force
+    chunk_size = args.chunk_size
+    full_run = args.command == 'full'
+    
+    if args.incremental:
+        if args.writer:
+            print("Artımlı modda --writer yok sayılır, değişiklikler upsert ile yazılır.")
+        dependent_tables = {
+            table_name: [(link_table, 'movie_id') for link_table in link_tables]
+            for table_name, link_tables in LINK_TABLES.items()
+        }
+        writers = {None: DeltaWriter(args.batch_size, TABLE_KEYS, PROTECTED_KEYS, dependent_tables)}
+    else:
+        writers = build_writers(args.writer, args.batch_size)
+    
+    def writer_for(table_name):
+        return writers.get(table_name, writers[None])
+    
+    metrics = StageMetrics(args.metrics or bool(args.metrics_file or args.prometheus_textfile),
+                           args.profile, args.profile_output)
+    
+    # credits cast/crew: compact modda yalnızca uygulamanın kullandığı kısım saklanır
+    credits_parser = CreditsParser(args.credits_mode, CreditsProjection(args.cast_top_n, args.crew_jobs),
+                                   args.credits_workers)
+    
+    # Temizlenmiş parçalar kaynak arşiv değişmediyse önbellekten okunur
+    snapshot_cache = None if args.no_cache else SnapshotCache(args.cache_dir, args.cache_max_mb)
+    
+    # Özellik deposu için temizlenen parçalardan gerekli sütunlar toplanır
+    collector = None
+    if args.feature_store:
+        if {'movies_metadata', 'keywords'} <= set(table_names):
+            collector = FeatureCollector()
+        else:
+            print("Özellik deposu için movies_metadata ve keywords birlikte yüklenmeli, --feature-store yok sayıldı.")
     
     print("Verileri yükleme işlemi başlatılıyor...")
     
     success = True
     
     try:
-        # Tüm tabloları sil
-        drop_all_tables()
+        if args.incremental:
+            print("Artımlı mod: tablolar silinmeden yalnızca değişiklikler uygulanacak.")
+        elif full_run:
+            # Tüm tabloları sil
+            with metrics.stage('drop_tables'):
+                drop_all_tables()
+        else:
+            # Yalnızca yeniden yüklenecek tabloları sil
+            with metrics.stage('drop_tables'):
+                drop_tables(table_names)
         
-        # Tabloları oluştur
-        create_tables()
+        # Tabloları oluştur (var olan tablolara dokunulmaz)
+        with metrics.stage('create_tables'):
+            create_tables()
         
         # Verileri yükle
-        print("1. Movies Metadata yükleniyor...")
-        movies_df = import_movies_metadata('movies_metadata.csv.zip')
-        if movies_df is None:
-            if not force_mode:
-                print("Movies Metadata yüklenemedi, devam etmek istiyor musunuz? (E/H)")
-                choice = input().strip().upper()
-                if choice != 'E':
-                    return
-            else:
-                print("Movies Metadata yüklenemedi, force mode etkin - devam ediliyor.")
-                
-        print("2. Links yükleniyor...")
-        if not import_links('links.csv', movies_df):
-            if not force_mode:
-                print("Links yüklenemedi, devam etmek istiyor musunuz? (E/H)")
-                choice = input().strip().upper()
-                if choice != 'E':
-                    return
-            else:
-                print("Links yüklenemedi, force mode etkin - devam ediliyor.")
-                
-        print("3. Keywords yükleniyor...")
-        if not import_keywords('keywords.csv.zip', movies_df):
-            if not force_mode:
-                print("Keywords yüklenemedi, devam etmek istiyor musunuz? (E/H)")
-                choice = input().strip().upper()
-                if choice != 'E':
-                    return
+        step = 1
+        if 'movies_metadata' in table_names:
+            print(f"{step}. Movies Metadata yükleniyor...")
+            step += 1
+            movies_df = import_movies_metadata('movies_metadata.csv.zip', chunk_size, writer_for('movies_metadata'), collector)
+            if movies_df is None:
+                success = False
+                if not confirm("Movies Metadata yüklenemedi, devam etmek istiyor musunuz?", force_mode):
+                    return False
+                print("Movies Metadata yüklenemedi, devam ediliyor.")
+        else:
+            # Geçerli ID'ler yeniden yüklenmeyen movies_metadata tablosundan okunur
+            movies_df = load_existing_movie_ids()
+        
+        dependent = [table_name for table_name in DEPENDENT_TABLES if table_name in table_names]
+        if args.jobs > 1 and len(dependent) > 1:
+            labels = ', '.join(DEPENDENT_TABLES[table_name][0] for table_name in dependent)
+            print(f"{step}. {labels} {args.jobs} işçi süreçte paralel yükleniyor...")
+            step += 1
+            success = import_dependent_tables_parallel(movies_df, args.jobs, chunk_size, writer_for, collector,
+                                                       dependent) and success
+        else:
+            for position, table_name in enumerate(dependent):
+                label, import_func, csv_file = DEPENDENT_TABLES[table_name]
+                print(f"{step}. {label} yükleniyor...")
+                step += 1
+                if import_func(csv_file, movies_df, chunk_size, writer_for(table_name), collector):
+                    continue
+                success = False
+                if position == len(dependent) - 1:
+                    print(f"{label} yüklenemedi.")
+                elif not confirm(f"{label} yüklenemedi, devam etmek istiyor musunuz?", force_mode):
+                    return False
+                else:
+                    print(f"{label} yüklenemedi, devam ediliyor.")
+        
+        # MovieLens puanları veritabanı yerine bellek eşlemeli depoya yazılır
+        if args.ratings_store:
+            print(f"{step}. MovieLens puanları {args.ratings_store} deposuna aktarılıyor...")
+            step += 1
+            success = import_ratings(args.ratings_file, movies_df, args.ratings_store) and success
+        
+        # İkincil indeksler veriler yüklendikten sonra tek seferde oluşturulur
+        if not args.skip_indexes:
+            print(f"{step}. İkincil ve FULLTEXT indeksler oluşturuluyor...")
+            with metrics.stage('index'):
+                build_indexes(get_engine())
+            
+        # Özellik deposunu dışa aktar
+        if collector is not None:
+            with metrics.stage('feature_store'):
+                collector.export(args.feature_store, source_fingerprint(['movies_metadata.csv.zip', 'keywords.csv.zip']))
+            
+        # Toplu ID çevirisi için links tablosundan eşleme dizileri
+        if args.crosswalk:
+            if inspect(get_engine()).has_table('links'):
+                with metrics.stage('crosswalk', 'links') as counts:
+                    meta = export_crosswalk(get_engine(), args.crosswalk)
+                    counts['rows_out'] = meta['rows']
+                print(f"ID eşlemesi yazıldı: {args.crosswalk} ({meta['rows']} MovieLens, {meta['tmdb_ids']} TMDB, "
+                      f"{meta['imdb_ids']} IMDb ID'si)")
             else:
-                print("Keywords yüklenemedi, force mode etkin - devam ediliyor.")
-                
-        print("4. Credits yükleniyor...")
-        if not import_credits('credits.csv.zip', movies_df):
-            print("Credits yüklenemedi.")
-            success = False
+                print("links tablosu yok, --crosswalk yok sayıldı.")
+            
+        # Yazıcı bazında hız raporu
+        for writer in dict.fromkeys(writers.values()):
+            writer.report()
             
         if success:
             print("Tüm veriler başarıyla yüklendi!")
         else:
             print("Bazı veriler yüklenemedi, ancak işlem tamamlandı.")
+        return success
             
     except Exception as e:
         print(f"Ana yükleme işleminde hata oluştu: {str(e)}")
         import traceback
         traceback.print_exc()
+        return False
+    finally:
+        # Yarıda kalan çalıştırmalarda da o ana kadarki ölçümler yazılır
+        metrics.dump_profile()
+        metrics.emit_json(args.metrics_file)
+        if args.prometheus_textfile:
+            metrics.write_prometheus(args.prometheus_textfile)
+        metrics.close()
+
+# Ana yükleme işlemi
+def main(argv=None):
+    global data_dir
+    args = parse_args(argv)
+    if args.data_dir:
+        data_dir = os.path.abspath(args.data_dir)
+    
+    if args.command == 'verify':
+        sys.exit(0 if verify_tables() else 1)
+    
+    if args.command == 'drop':
+        if confirm(f"{', '.join(args.tables)} ve türetilen tablolar silinecek, emin misiniz?", args.force):
+            drop_tables(args.tables)
+        return
+    
+    if not os.path.exists(get_data_dir()):
+        print(f"Veri dizini bulunamadı: {get_data_dir()}")
+        sys.exit(1)
+    
+    # Tablolar her zaman bağımlılık sırasıyla yüklenir
+    table_names = list(TABLE_KEYS) if args.command == 'full' else [
+        table_name for table_name in TABLE_KEYS if table_name in args.tables]
+    run_import(args, table_names)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -2,12 +2,14 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 import zipfile, os, json
 from dotenv import load_dotenv
+from bulk_writer import bulk_load_session, get_writer
 load_dotenv()
 DB_HOST = os.getenv('DB_HOST')
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_NAME = os.getenv('DB_NAME')
-engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}')
+engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}',
+                       connect_args={'local_infile': True})
 print('Veritabanına bağlanılıyor...')
 try:
     # Foreign key kontrolleri devre dışı bırak
@@ -21,7 +23,7 @@ try:
 except Exception as e:
     print(f'Hata: {e}')
 # CSV'leri tabloya yükleyen fonksiyon
-def create_and_populate_table(csv_file, table_name, zip_file=False, dtype=None):
+def create_and_populate_table(csv_file, table_name, zip_file=False, dtype=None, writer=None):
     try:
         if zip_file:
             with zipfile.ZipFile(os.path.join('../the-movie-datasets', csv_file), 'r') as zip_ref:
@@ -35,31 +37,11 @@ def create_and_populate_table(csv_file, table_name, zip_file=False, dtype=None):
         # NaN değerleri boş string ile değiştir
         df = df.fillna('')
         
-        # DataFrame'i veritabanına yükle
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
-        print(f'{table_name} tablosu oluşturuldu ve veriler yüklendi')
-        
-        return True
-    except Exception as e:
-        print(f'{table_name} tablosu yüklenirken hata oluştu: {e}')
-        return False
-# SV'leri tabloya yükleyen fonksiyon
-def create_and_populate_table(csv_file, table_name, zip_file=False, dtype=None):
-    try:
-        if zip_file:
-            with zipfile.ZipFile(os.path.join('../the-movie-datasets', csv_file), 'r') as zip_ref:
-                csv_filename = csv_file.replace('.zip', '')
-                zip_ref.extract(csv_filename, '../the-movie-datasets')
-                df = pd.read_csv(os.path.join('../the-movie-datasets', csv_filename), dtype=dtype)
-                os.remove(os.path.join('../the-movie-datasets', csv_filename))
-        else:
-            df = pd.read_csv(os.path.join('../the-movie-datasets', csv_file), dtype=dtype)
-        
-        # NaN değerleri boş string ile değiştir
-        df = df.fillna('')
-        
-        # DataFrame'i veritabanına yükle
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
+        # Tabloyu boş olarak yeniden oluştur, verileri seçilen toplu yazıcı ile yükle
+        df.head(0).to_sql(table_name, engine, if_exists='replace', index=False)
+        writer = writer or get_writer('to_sql')
+        with bulk_load_session(engine) as conn:
+            writer.write(df, table_name, conn)
         print(f'{table_name} tablosu oluşturuldu ve veriler yüklendi')
         
         return True
@@ -0,0 +1,159 @@
+"""
+import_data.py'nin okuma ve temizleme belleği için önce/sonra raporu.
+
+Her tablo iki yoldan ayrı süreçlerde yüklenir (veritabanına yazılmaz):
+  legacy  - eski yol: tüm sütunlar varsayılan object/float64 tipleriyle tek
+            seferde okunur, movies_metadata'da fillna('') uygulanır
+  compact - import_data.py'nin yolu: usecols/dtype ile blok blok okuma,
+            Int32/float32/category/Arrow metin tipleri, eksikler NA kalır
+Tablo başına satır sayısı, temiz DataFrame'in bellek boyutu
+(memory_usage(deep=True)) ve okuma+temizleme sırasındaki en yüksek RSS artışı
+yazdırılır; --output ile JSON olarak kaydedilir.
+
+    python import_memory_report.py --data-dir ../data
+    python import_memory_report.py --data-dir ./bench_data/10x --tables movies_metadata credits
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+import import_data
+from import_data import (JSON_COLUMNS, TABLE_KEYS, TEXT_DTYPE, IdSet, concat_chunks, dependent_table_chunks,
+                         frame_bytes, movies_metadata_chunks, read_csv_chunks)
+from import_metrics import RssSampler, current_rss
+from side_tables import SOURCE_COLUMNS
+
+TABLE_FILES = {
+    'movies_metadata': 'movies_metadata.csv.zip',
+    'links': 'links.csv',
+    'keywords': 'keywords.csv.zip',
+    'credits': 'credits.csv.zip',
+}
+
+MODES = ('legacy', 'compact')
+
+
+def legacy_frame(table_name, csv_path):
+    """Eski yükleme yolunun ürettiği (temiz, ham) DataFrame çifti"""
+    df = next(read_csv_chunks(csv_path, low_memory=table_name != 'movies_metadata'))
+    raw = df[SOURCE_COLUMNS.get(table_name, [])].copy()
+    key = TABLE_KEYS[table_name]
+    if table_name == 'movies_metadata':
+        df = df.fillna('')
+    for col in JSON_COLUMNS.get(table_name, []):
+        df[col] = df[col].apply(lambda x: json.dumps(x) if pd.notna(x) else None)
+    if table_name == 'movies_metadata':
+        df = df.drop(columns=['Unnamed: 0'], errors='ignore')
+        for col in ['adult', 'video']:
+            df[col] = df[col].map({'True': True, 'False': False, True: True, False: False})
+        for col in ['budget', 'popularity', 'revenue', 'runtime', 'vote_average', 'vote_count']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
+    df[key] = pd.to_numeric(df[key], errors='coerce')
+    df = df.dropna(subset=[key]).drop_duplicates(subset=[key], keep='first')
+    return df, raw
+
+
+def compact_frame(table_name, csv_path):
+    """import_data.py'nin tek parça yüklemede ürettiği (temiz, ham) DataFrame çifti"""
+    if table_name == 'movies_metadata':
+        pairs = movies_metadata_chunks(csv_path, seen_ids=IdSet())
+    else:
+        pairs = dependent_table_chunks(csv_path, table_name, TABLE_KEYS[table_name], seen_ids=IdSet(),
+                                       json_columns=JSON_COLUMNS.get(table_name, ()))
+    return concat_chunks(pairs)
+
+
+def measure(mode, table_name, csv_path):
+    """Ayrı süreçte çalışır: yolu ölçer ve sonuç sözlüğünü döndürür"""
+    # Kütüphanelerin ilk kullanım maliyeti ölçüme katılmaz
+    pd.Series(['a'], dtype=TEXT_DTYPE).str.len()
+    pd.to_datetime(pd.Series(['2000-01-01']), errors='coerce')
+    gc.collect()
+
+    sampler = RssSampler(interval=0.002)
+    sampler.start()
+    start_rss = current_rss()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'legacy':
+            df, raw = legacy_frame(table_name, csv_path)
+        else:
+            df, raw = compact_frame(table_name, csv_path)
+    elapsed = time.perf_counter() - start
+    peak = max(sampler.peak, current_rss())
+    sampler.stop()
+    return {
+        'table': table_name,
+        'mode': mode,
+        'rows': len(df),
+        'columns': len(df.columns),
+        'frame_bytes': frame_bytes(df),
+        'raw_bytes': frame_bytes(raw),
+        'peak_rss_delta_bytes': peak - start_rss,
+        'seconds': round(elapsed, 3),
+    }
+
+
+def print_report(results):
+    mb = 1024 ** 2
+    print(f"{'tablo':<16} {'yol':<8} {'satır':>10} {'sütun':>6} {'çerçeve (MB)':>13} "
+          f"{'tepe RSS (MB)':>14} {'süre (sn)':>10}")
+    by_table = {}
+    for result in results:
+        by_table.setdefault(result['table'], {})[result['mode']] = result
+        print(f"{result['table']:<16} {result['mode']:<8} {result['rows']:>10,} {result['columns']:>6} "
+              f"{result['frame_bytes'] / mb:>13.1f} {result['peak_rss_delta_bytes'] / mb:>14.1f} "
+              f"{result['seconds']:>10.2f}")
+
+    for table_name, modes in by_table.items():
+        if set(modes) != set(MODES):
+            continue
+        legacy, compact = modes['legacy'], modes['compact']
+        frame_ratio = legacy['frame_bytes'] / max(compact['frame_bytes'], 1)
+        peak_ratio = legacy['peak_rss_delta_bytes'] / max(compact['peak_rss_delta_bytes'], 1)
+        print(f"{table_name}: çerçeve {frame_ratio:.1f}x, tepe bellek {peak_ratio:.1f}x küçüldü")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Aktarım belleği önce/sonra raporu")
+    parser.add_argument('--data-dir', default=import_data.DEFAULT_DATA_DIR,
+                        help="CSV/zip dosyalarının bulunduğu dizin")
+    parser.add_argument('--tables', nargs='+', choices=list(TABLE_FILES), default=list(TABLE_FILES),
+                        help="Ölçülecek tablolar")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--output', help="Sonuçların yazılacağı JSON dosyası")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    # Her ölçüm temiz bir süreçte yapılır, böylece tepe RSS birbirini etkilemez
+    context = multiprocessing.get_context('spawn')
+    for table_name in args.tables:
+        csv_path = os.path.join(args.data_dir, TABLE_FILES[table_name])
+        if not os.path.exists(csv_path):
+            print(f"{csv_path} bulunamadı, {table_name} atlanıyor")
+            continue
+        for mode in args.modes:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(measure, (mode, table_name, csv_path)))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'data_dir': args.data_dir,
+                       'results': results}, f, indent=2)
+        print(f"Sonuçlar yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+import_data.py aşamaları için süre, bellek ve hız ölçümü.
+
+Her aşama (read_csv, clean, dedupe, write, side_tables, index, ...) tablo
+adıyla birlikte metrics.stage() bağlam yöneticisiyle sarılır. Açıkken aşama
+başına toplam süre, giriş/çıkış satır sayısı, satır/sn, en yüksek RSS ve
+aşama boyunca RSS artışı toplanır. Çalıştırma sonunda kayıtlar JSON satırları
+olarak ve istenirse Prometheus textfile collector dosyası olarak yazılır.
+
+Kapalıyken stage() her seferinde aynı boş bağlam yöneticisini döndürür,
+iterate() ise verilen yineleyiciyi olduğu gibi geri verir. Böylece ölçüm
+kapalıyken ek maliyet yok denecek kadar azdır.
+
+profile_stage verilirse ('credits.side_tables' ya da tüm tablolar için
+'side_tables' gibi) o aşama cProfile ile sarılır ve istatistikler dosyaya
+yazılır.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+
+
+def current_rss():
+    """Sürecin anlık yerleşik bellek kullanımı (bayt)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # /proc yoksa süreç ömrü boyunca en yüksek değer kullanılır (macOS'ta bayt, Linux'ta KB)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """Arka planda RSS örnekleyip reset() çağrısından bu yana en yüksek değeri tutar"""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+
+    def reset(self):
+        self.peak = current_rss()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class _DisabledStage:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan bağlam yöneticisi"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_DISABLED_STAGE = _DisabledStage()
+
+
+class _Stage:
+    def __init__(self, metrics, name, table, rows_in):
+        self.metrics = metrics
+        self.name = name
+        self.table = table
+        self.rows_in = rows_in
+        self.counts = {}
+
+    def __enter__(self):
+        metrics = self.metrics
+        self.profiling = metrics._profile_matches(self.name, self.table)
+        self.start_rss = current_rss()
+        metrics._sampler().reset()
+        if self.profiling:
+            metrics._profiler().enable()
+        self.start = time.perf_counter()
+        return self.counts
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        metrics = self.metrics
+        if self.profiling:
+            metrics._profiler().disable()
+        peak = max(metrics._sampler().peak, current_rss())
+
+        record = metrics.record(self.table, self.name)
+        record['calls'] += 1
+        record['seconds'] += elapsed
+        record['rows_in'] += self.rows_in
+        record['rows_out'] += self.counts.get('rows_out', 0)
+        record['peak_rss_bytes'] = max(record['peak_rss_bytes'], peak)
+        record['memory_delta_bytes'] = max(record['memory_delta_bytes'], peak - self.start_rss)
+        if exc_type is not None:
+            record['errors'] += 1
+        return False
+
+
+class StageMetrics:
+    """Tablo ve aşama bazında ölçüm kayıtları"""
+
+    def __init__(self, enabled=False, profile_stage=None, profile_path=None):
+        self.enabled = enabled or bool(profile_stage)
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path or f"import_profile_{profile_stage}.prof"
+        self.records = {}
+        self.started_at = time.time()
+        self._rss_sampler = None
+        self._cprofile = None
+
+    def __getstate__(self):
+        # İşçi süreçlere örnekleyici iş parçacığı ve profiler gönderilmez
+        state = self.__dict__.copy()
+        state['_rss_sampler'] = None
+        state['_cprofile'] = None
+        return state
+
+    def _sampler(self):
+        if self._rss_sampler is None:
+            self._rss_sampler = RssSampler()
+            self._rss_sampler.start()
+        return self._rss_sampler
+
+    def _profiler(self):
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+        return self._cprofile
+
+    def _profile_matches(self, name, table):
+        return self.profile_stage is not None and self.profile_stage in (name, f"{table}.{name}")
+
+    def stage(self, name, table=None, rows_in=0):
+        """Aşamayı ölçen bağlam yöneticisi; dönen sözlüğe 'rows_out' yazılabilir"""
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return _Stage(self, name, table, rows_in)
+
+    def iterate(self, name, table, iterable):
+        """Yineleyicinin her elemanını üretme süresini aşama olarak ölçer (ör. CSV parça okuma)"""
+        if not self.enabled:
+            return iterable
+        return self._iterate(name, table, iter(iterable))
+
+    def _iterate(self, name, table, iterator):
+        while True:
+            with self.stage(name, table) as counts:
+                item = next(iterator, None)
+                # (temiz parça, ham parça) çiftlerinde temiz parçanın satırları sayılır
+                frame = item[0] if isinstance(item, tuple) else item
+                counts['rows_out'] = len(frame) if frame is not None else 0
+            if item is None:
+                return
+            yield item
+
+    def record(self, table, name):
+        key = (table or 'all', name)
+        if key not in self.records:
+            self.records[key] = {'calls': 0, 'seconds': 0.0, 'rows_in': 0, 'rows_out': 0,
+                                 'peak_rss_bytes': 0, 'memory_delta_bytes': 0, 'errors': 0}
+        return self.records[key]
+
+    def spawn(self):
+        """İşçi süreçte kullanılacak, aynı ayarlara sahip boş bir ölçüm nesnesi"""
+        return StageMetrics(self.enabled, self.profile_stage, self.profile_path)
+
+    def merge(self, other):
+        """Başka bir süreçte toplanan kayıtları ekler"""
+        for (table, name), other_record in other.records.items():
+            record = self.record(table, name)
+            for field in ('calls', 'seconds', 'rows_in', 'rows_out', 'errors'):
+                record[field] += other_record[field]
+            for field in ('peak_rss_bytes', 'memory_delta_bytes'):
+                record[field] = max(record[field], other_record[field])
+
+    def rows(self):
+        """Kayıtları JSON'a uygun sözlükler olarak döndürür"""
+        rows = []
+        for (table, name), record in self.records.items():
+            rows_processed = record['rows_in'] or record['rows_out']
+            rows.append({
+                'table': table,
+                'stage': name,
+                'calls': record['calls'],
+                'seconds': round(record['seconds'], 4),
+                'rows_in': record['rows_in'],
+                'rows_out': record['rows_out'],
+                'rows_per_sec': (round(rows_processed / record['seconds'])
+                                 if rows_processed and record['seconds'] > 0 else None),
+                'peak_rss_mb': round(record['peak_rss_bytes'] / 1024 ** 2, 1),
+                'memory_delta_mb': round(record['memory_delta_bytes'] / 1024 ** 2, 1),
+                'errors': record['errors'],
+            })
+        return rows
+
+    def emit_json(self, path=None):
+        """Aşama başına bir JSON satırı yazar (path verilmezse standart çıktıya)"""
+        if not self.enabled:
+            return
+        lines = [json.dumps({'event': 'import_stage', **row}, ensure_ascii=False) for row in self.rows()]
+        lines.append(json.dumps({'event': 'import_run', 'started_at': self.started_at,
+                                 'seconds': round(time.time() - self.started_at, 3)}))
+        if path:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        else:
+            print('\n'.join(lines))
+
+    def write_prometheus(self, path):
+        """Prometheus node_exporter textfile collector biçiminde yazar (atomik)"""
+        if not self.enabled:
+            return
+        gauges = [
+            ('import_stage_duration_seconds', 'seconds', 'Aşamada geçen toplam süre'),
+            ('import_stage_rows_in', 'rows_in', 'Aşamaya giren satır sayısı'),
+            ('import_stage_rows_out', 'rows_out', 'Aşamadan çıkan satır sayısı'),
+            ('import_stage_rows_per_second', 'rows_per_sec', 'Aşamanın satır/sn hızı'),
+            ('import_stage_peak_rss_bytes', 'peak_rss_bytes', 'Aşama sırasında en yüksek RSS'),
+            ('import_stage_memory_delta_bytes', 'memory_delta_bytes', 'Aşama sırasında en büyük RSS artışı'),
+            ('import_stage_errors', 'errors', 'Aşamada oluşan hata sayısı'),
+        ]
+        rows = self.rows()
+        lines = []
+        for metric, field, help_text in gauges:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for row in rows:
+                record = self.records[(row['table'], row['stage'])]
+                value = record[field] if field in record else row[field]
+                if value is not None:
+                    lines.append(f'{metric}{{table="{row["table"]}",stage="{row["stage"]}"}} {value}')
+        lines.append("# HELP import_run_last_success_timestamp_seconds Son çalıştırmanın bitiş zamanı")
+        lines.append("# TYPE import_run_last_success_timestamp_seconds gauge")
+        lines.append(f"import_run_last_success_timestamp_seconds {time.time():.0f}")
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def dump_profile(self, suffix=None):
+        """cProfile istatistiklerini dosyaya yazar ve en pahalı fonksiyonları yazdırır"""
+        if self._cprofile is None:
+            return None
+        path = f"{self.profile_path}.{suffix}" if suffix else self.profile_path
+        self._cprofile.dump_stats(path)
+        output = io.StringIO()
+        pstats.Stats(self._cprofile, stream=output).sort_stats('cumulative').print_stats(20)
+        print(f"{self.profile_stage} profili yazıldı: {path}")
+        print(output.getvalue())
+        return path
+
+    def close(self):
+        if self._rss_sampler is not None:
+            self._rss_sampler.stop()
+            self._rss_sampler = None
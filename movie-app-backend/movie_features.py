@@ -0,0 +1,131 @@
+"""
+Film içerik vektörleri.
+
+Tüm katalog için seyrek (CSR) matrisler üretir:
+  text    - başlık + özet TF-IDF
+  genre   - tür vektörü (IDF ağırlıklı)
+  keyword - anahtar kelime vektörü (IDF ağırlıklı)
+
+Her blok satır bazında L2 normalize edilir ve sqrt(ağırlık) ile çarpılarak
+yan yana eklenir; böylece iki film vektörünün iç çarpımı blokların kosinüs
+benzerliklerinin ağırlıklı toplamına eşit olur.
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Başlık/özet kelimeleri: en az 3 karakter (recommendationController.js ile aynı kural)
+TOKEN_PATTERN = r'\b\w{3,}\b'
+
+STOP_WORDS = frozenset("""
+the and for are but not you all any can had her was one our out has him his how its may new now
+old see two way who did get let man she too use that with have this will your from they been
+were when what which their there them then than into more some such only other also after
+about over just most where these those while being each both during before under between
+""".split())
+
+# Blokların benzerlik skoruna katkısı (toplam 1)
+FEATURE_WEIGHTS = {
+    'text': 0.4,
+    'genre': 0.35,
+    'keyword': 0.25,
+}
+
+
+def normalize_rows(matrix):
+    """CSR matrisin satırlarını L2 normuna böler (boş satırlar sıfır kalır)"""
+    matrix = sp.csr_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms).dot(matrix), dtype=np.float32)
+
+
+def _idf(matrix):
+    """Yumuşatılmış IDF: ln((1 + n) / (1 + df)) + 1"""
+    n_docs = matrix.shape[0]
+    doc_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    return (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+
+
+def tfidf_matrix(texts, min_df=2, max_df=0.5):
+    """Metinlerden satırları L2 normalize TF-IDF matrisi ve kelime dağarcığı üretir"""
+    texts = pd.Series(texts).fillna('').astype(str).reset_index(drop=True)
+    tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens[~tokens.isin(STOP_WORDS)]
+
+    codes, vocabulary = pd.factorize(tokens.values)
+    counts = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (tokens.index.values, codes)),
+        shape=(len(texts), len(vocabulary))
+    )
+    counts.sum_duplicates()
+
+    # Çok nadir ve çok sık geçen kelimeleri çıkar
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    keep = (doc_freq >= min_df) & (doc_freq <= max_df * max(len(texts), 1))
+    counts = counts[:, keep]
+    vocabulary = vocabulary[keep]
+
+    # Alt doğrusal TF ile IDF çarpımı
+    counts.data = 1 + np.log(counts.data)
+    weighted = counts.dot(sp.diags(_idf(counts)))
+    return normalize_rows(weighted), np.asarray(vocabulary)
+
+
+def id_matrix(movie_ids, pairs, feature_column):
+    """(movie_id, özellik id) çiftlerinden IDF ağırlıklı, normalize matris üretir"""
+    row_index = pd.Index(movie_ids)
+    rows = row_index.get_indexer(pairs['movie_id'])
+    pairs = pairs[rows >= 0]
+    rows = rows[rows >= 0]
+
+    codes, features = pd.factorize(pairs[feature_column].values)
+    matrix = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (rows, codes)),
+        shape=(len(row_index), len(features))
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    weighted = matrix.dot(sp.diags(_idf(matrix)))
+    return normalize_rows(weighted), np.asarray(features)
+
+
+def build_feature_matrices(movies, genre_pairs, keyword_pairs, min_df=2):
+    """Katalog için text/genre/keyword bloklarını ve sözlüklerini üretir
+
+    movies: id, title, overview sütunlu DataFrame (satır sırası vektör sırasıdır)
+    genre_pairs: movie_id, genre_id
+    keyword_pairs: movie_id, keyword_id
+    """
+    movie_ids = movies['id'].astype(np.int64).values
+    texts = movies['title'].fillna('').astype(str) + ' ' + movies['overview'].fillna('').astype(str)
+
+    text, vocabulary = tfidf_matrix(texts, min_df=min_df)
+    genre, genre_ids = id_matrix(movie_ids, genre_pairs, 'genre_id')
+    keyword, keyword_ids = id_matrix(movie_ids, keyword_pairs, 'keyword_id')
+
+    return {
+        'ids': movie_ids,
+        'text': text,
+        'genre': genre,
+        'keyword': keyword,
+        'vocabulary': vocabulary,
+        'genre_ids': genre_ids,
+        'keyword_ids': keyword_ids,
+    }
+
+
+def combine_features(features, weights=FEATURE_WEIGHTS):
+    """Blokları sqrt(ağırlık) ile ölçekleyip tek bir CSR matriste birleştirir"""
+    blocks = [features[name] * np.float32(np.sqrt(weight)) for name, weight in weights.items()]
+    return sp.hstack(blocks, format='csr', dtype=np.float32)
+
+
+def load_catalog(engine):
+    """movies_metadata ve normalleştirilmiş tür/anahtar kelime tablolarını okur"""
+    movies = pd.read_sql(
+        "SELECT id, title, overview FROM movies_metadata WHERE id IS NOT NULL ORDER BY id", engine
+    )
+    genre_pairs = pd.read_sql("SELECT movie_id, genre_id FROM movie_genres", engine)
+    keyword_pairs = pd.read_sql("SELECT movie_id, keyword_id FROM movie_keywords", engine)
+    return movies, genre_pairs, keyword_pairs
@@ -0,0 +1,202 @@
+"""
+Tüm kullanıcılar için önerileri önceden hesaplayıp user_recommendations
+tablosuna yazan gece çalışan toplu iş.
+
+UserMovies'ten izlenen filmler okunur ve her kullanıcının izleme listesi
+recommendationController.js'teki calculateWatchedMoviesHash ile aynı şekilde
+özetlenir (ID'ler sayısal sıralanır, "," ile birleştirilir, MD5). Yalnızca
+özeti son çalıştırmadan bu yana değişen kullanıcılar yeniden hesaplanır;
+aynı izleme listesine sahip kullanıcılar için öneriler bir kez hesaplanır.
+Puanlama recommendation_service.py'deki Recommender ile süreç havuzunda
+yapılır, özellik deposu her süreçte bellek eşlemeli açılır.
+
+Backend her iki portta da önbellek isabetini tek indeksli sorguyla sunar:
+
+    SELECT movie_id, score FROM user_recommendations
+    WHERE user_id = ? AND watched_hash = ? ORDER BY `rank`
+
+Kullanım:
+    python precompute_recommendations.py --feature-store ./feature_store --jobs 4
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, Integer, String, Float, select
+
+from bulk_writer import bulk_load_session, get_writer, WRITERS
+from db import create_db_engine
+from feature_store import database_fingerprint, load_feature_store
+from recommendation_service import Recommender, normalize_scores
+
+RECOMMENDATIONS_TABLE = 'user_recommendations'
+DEFAULT_TOP_N = 50
+
+# Süreç havuzundaki her işçinin kendi Recommender nesnesi
+_recommender = None
+
+
+def recommendations_table(metadata=None):
+    """user_recommendations tablo tanımı"""
+    return Table(
+        RECOMMENDATIONS_TABLE,
+        metadata or MetaData(),
+        Column('user_id', Integer, primary_key=True, autoincrement=False),
+        Column('rank', Integer, primary_key=True, autoincrement=False),
+        Column('watched_hash', String(32), nullable=False),
+        Column('movie_id', Integer, nullable=False),
+        Column('score', Float, nullable=False)
+    )
+
+
+def watched_hash(movie_ids):
+    """calculateWatchedMoviesHash ile aynı özet: sayısal sıralı ID'ler, virgülle birleşik, MD5"""
+    id_string = ','.join(str(movie_id) for movie_id in sorted(int(movie_id) for movie_id in movie_ids))
+    return hashlib.md5(id_string.encode('utf-8')).hexdigest()
+
+
+def load_watched_hashes(engine):
+    """Kullanıcı başına izlenen film listesi ve özetini döndürür (index: user_id)
+
+    getRecommendations ile aynı filtre uygulanır (movies_metadata ile INNER JOIN,
+    başlığı boş olmayan filmler); aksi halde kataloğunda olmayan bir filmi
+    izlemiş kullanıcıların özeti backend'dekiyle hiç eşleşmez.
+    """
+    watched = pd.read_sql(
+        "SELECT um.UserId AS user_id, um.MoviesMetaDataId AS movie_id "
+        "FROM UserMovies um "
+        "INNER JOIN movies_metadata mm ON um.MoviesMetaDataId = mm.id "
+        "WHERE um.status = 'watched' AND mm.id IS NOT NULL AND mm.title IS NOT NULL",
+        engine
+    )
+    users = watched.groupby('user_id')['movie_id'].agg(list).to_frame('movie_ids')
+    users['watched_hash'] = users['movie_ids'].map(watched_hash)
+    return users
+
+
+def load_previous_hashes(engine, table):
+    """Son çalıştırmada kullanılan kullanıcı özetlerini döndürür"""
+    query = select(table.c.user_id, table.c.watched_hash).where(table.c.rank == 1)
+    with engine.connect() as conn:
+        previous = pd.read_sql(query, conn)
+    return previous.set_index('user_id')['watched_hash']
+
+
+def _init_worker(feature_store_path):
+    """İşçi sürecinde özellik deposunu açar"""
+    global _recommender
+    _recommender = Recommender(load_feature_store(feature_store_path))
+
+
+def _compute_batch(batch, top_n):
+    """(özet, izlenen ID'ler) listesi için (özet, sıra, film ID, skor) satırlarını döndürür"""
+    rows = []
+    for hash_value, movie_ids in batch:
+        result = _recommender.top_n(movie_ids, top_n)
+        if result is None:
+            continue
+        movie_rows, scores, _ = result
+        display_scores = normalize_scores(np.sqrt(np.maximum(scores, 0)))
+        recommended_ids = _recommender.store.ids[movie_rows]
+        for rank, (movie_id, score) in enumerate(zip(recommended_ids, display_scores), start=1):
+            rows.append((hash_value, rank, int(movie_id), float(score)))
+    return rows
+
+
+def compute_recommendations(feature_store_path, watched_sets, top_n=DEFAULT_TOP_N, jobs=1, batch_size=200):
+    """Farklı izleme listeleri için önerileri süreç havuzunda hesaplar"""
+    items = list(watched_sets.items())
+    batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+    results = []
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(feature_store_path,)) as executor:
+            for rows in executor.map(_compute_batch, batches, [top_n] * len(batches)):
+                results.extend(rows)
+    else:
+        _init_worker(feature_store_path)
+        for batch in batches:
+            results.extend(_compute_batch(batch, top_n))
+    return pd.DataFrame(results, columns=['watched_hash', 'rank', 'movie_id', 'score'])
+
+
+def precompute_recommendations(engine, feature_store_path, top_n=DEFAULT_TOP_N, jobs=1,
+                               full=False, writer_name='multirow', batch_size=5000,
+                               verify_store=False, allow_stale=False):
+    """Özeti değişen kullanıcıların önerilerini yeniden hesaplayıp yazar"""
+    start_time = time.perf_counter()
+
+    # Depo bir kez ana süreçte veritabanıyla karşılaştırılır; işçiler kontrolsüz açar
+    load_feature_store(feature_store_path, verify_store, database_fingerprint(engine), allow_stale)
+
+    metadata = MetaData()
+    table = recommendations_table(metadata)
+    metadata.create_all(engine)
+
+    users = load_watched_hashes(engine)
+    previous = load_previous_hashes(engine, table)
+
+    changed = users if full else users[users['watched_hash'] != previous.reindex(users.index)]
+    removed = previous.index.difference(users.index)
+    print(f"{len(users)} kullanıcı: {len(changed)} değişmiş, "
+          f"{len(users) - len(changed)} değişmemiş, {len(removed)} kaldırılmış")
+
+    # Aynı izleme listesine sahip kullanıcılar için tek hesaplama
+    watched_sets = changed.drop_duplicates('watched_hash').set_index('watched_hash')['movie_ids'].to_dict()
+    print(f"{len(watched_sets)} farklı izleme listesi hesaplanıyor ({jobs} süreç)...")
+    computed = compute_recommendations(feature_store_path, watched_sets, top_n, jobs)
+    print(f"Öneriler hesaplandı ({time.perf_counter() - start_time:.1f} sn)")
+
+    rows = (changed[['watched_hash']].reset_index()
+            .merge(computed, on='watched_hash')
+            [['user_id', 'watched_hash', 'rank', 'movie_id', 'score']])
+
+    stale_users = changed.index.union(removed).tolist()
+    writer = get_writer(writer_name, batch_size)
+    with bulk_load_session(engine) as conn:
+        for start in range(0, len(stale_users), batch_size):
+            conn.execute(table.delete().where(table.c.user_id.in_(stale_users[start:start + batch_size])))
+        writer.write(rows, table.name, conn)
+
+    elapsed = time.perf_counter() - start_time
+    writer.report()
+    print(f"{RECOMMENDATIONS_TABLE} güncellendi: {len(rows)} satır, toplam süre {elapsed:.1f} sn")
+    return elapsed
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Tüm kullanıcılar için önerileri önceden hesaplar")
+    parser.add_argument('--feature-store', required=True,
+                        help="import_data.py --feature-store ile üretilen özellik deposu dizini")
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N,
+                        help="Kullanıcı başına saklanacak öneri sayısı")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Paralel puanlama süreci sayısı")
+    parser.add_argument('--full', action='store_true',
+                        help="Özeti değişmemiş kullanıcılar dahil herkesi yeniden hesapla")
+    parser.add_argument('--writer', choices=sorted(WRITERS), default='multirow',
+                        help="Toplu yazıcı")
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help="Yazıcının tek seferde gönderdiği satır sayısı")
+    parser.add_argument('--verify-store', action='store_true',
+                        help="Özellik deposu dosyalarının SHA-256 özetlerini açılışta doğrula")
+    parser.add_argument('--allow-stale', action='store_true',
+                        help="Depo veritabanındaki film kataloğuyla uyuşmuyorsa durma, yalnızca uyar")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    engine = create_db_engine()
+    precompute_recommendations(engine, args.feature_store, args.top_n, args.jobs,
+                               args.full, args.writer, args.batch_size,
+                               args.verify_store, args.allow_stale)
+
+
+if __name__ == "__main__":
+    main()
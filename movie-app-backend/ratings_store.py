@@ -0,0 +1,260 @@
+"""
+MovieLens puan dosyası (ratings.csv, userId,movieId,rating,timestamp) için
+bellek eşlemeli, dizi tabanlı CSR deposu.
+
+Puanlar veritabanına yazılmaz (26M+ satır to_sql ile saatler sürer). Dosya
+iki geçişte, tüm tablo hiçbir zaman bellekte tutulmadan işlenir:
+  1. CSV parça parça okunur. MovieLens movieId'leri links.csv üzerinden
+     movies_metadata ID'lerine (TMDB) çevrilir, eşlenemeyen satırlar atlanır.
+     Her parça int32 kullanıcı, int32 film indeksi ve uint8 puan dizileri
+     olarak geçici dosyalara eklenir; kullanıcı başına satır sayısı tutulur.
+  2. Satır sayılarından CSR offset'leri (indptr) hesaplanır. Geçici
+     dosyalar bloklar halinde okunup her puan kullanıcısının satırındaki
+     yerine (np.lib.format.open_memmap ile açılan çıktı dosyasına) yazılır.
+     Ardından satırlar bloklar halinde film indeksine göre sıralanır.
+Bellek kullanımı parça boyutu ve kullanıcı/film sayısıyla sınırlıdır.
+
+Puanlar yarım yıldız adımlıdır (0.5 - 5.0) ve rating * RATING_SCALE olarak
+uint8 saklanır, yani kayıpsızdır. Zaman damgaları saklanmaz.
+
+    store = load_ratings_store('./ratings_store')
+    store.user_ratings(42)            # (film ID'leri, puanlar)
+    store.matrix()                    # scipy CSR, kopyasız (uint8, yarım yıldız)
+
+Depo import_data.py --ratings-store ile kurulur.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+STORE_FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+STORE_ARRAYS = ('user_ids', 'item_ids', 'indptr', 'indices', 'ratings')
+SPILL_FILES = {'users': np.int32, 'items': np.int32, 'ratings': np.uint8}
+
+RATING_SCALE = 2
+READ_CHUNK_ROWS = 1000000
+SCATTER_BLOCK_ROWS = 4000000
+RATINGS_COLUMNS = ['userId', 'movieId', 'rating']
+RATINGS_DTYPES = {'userId': 'int32', 'movieId': 'int32', 'rating': 'float32'}
+
+
+def movielens_crosswalk(links, valid_ids=None):
+    """links tablosundan sıralı (MovieLens ID'leri, TMDB ID'leri) int32 dizi çiftini döndürür
+
+    tmdbId'si boş ya da tam sayı olmayan satırlar ve valid_ids verilirse
+    movies_metadata'da olmayan filmler atlanır. Aynı TMDB filmine birden fazla
+    MovieLens ID'si eşleniyorsa en küçük MovieLens ID'si kullanılır; böylece bir
+    kullanıcının bir filme tek puanı olur.
+    """
+    movielens_ids = links['movieId'].to_numpy(dtype=np.float64)
+    tmdb_ids = links['tmdbId'].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(movielens_ids) & ~np.isnan(tmdb_ids) & (tmdb_ids == np.floor(tmdb_ids))
+    movielens_ids = movielens_ids[keep].astype(np.int32)
+    tmdb_ids = tmdb_ids[keep].astype(np.int32)
+    if valid_ids is not None:
+        keep = np.isin(tmdb_ids, np.fromiter(valid_ids, dtype=np.int32))
+        movielens_ids, tmdb_ids = movielens_ids[keep], tmdb_ids[keep]
+    _, first = np.unique(movielens_ids, return_index=True)
+    first = first[np.unique(tmdb_ids[first], return_index=True)[1]]
+    order = np.argsort(movielens_ids[first], kind='stable')
+    return movielens_ids[first][order], tmdb_ids[first][order]
+
+
+def _map_chunk(chunk, movielens_ids, item_rows):
+    """Puan parçasını (kullanıcı ID'leri, film indeksleri, uint8 puanlar, atlanan satır) dizilerine çevirir"""
+    users = chunk['userId'].to_numpy(dtype=np.int32)
+    movies = chunk['movieId'].to_numpy(dtype=np.int32)
+    ratings = np.rint(chunk['rating'].to_numpy(dtype=np.float32) * RATING_SCALE)
+    positions = np.minimum(np.searchsorted(movielens_ids, movies), max(len(movielens_ids) - 1, 0))
+    keep = (users >= 0) & (ratings >= 0) & (ratings <= np.iinfo(np.uint8).max)
+    if len(movielens_ids):
+        keep &= movielens_ids[positions] == movies
+    else:
+        keep[:] = False
+    return (users[keep], item_rows[positions[keep]].astype(np.int32), ratings[keep].astype(np.uint8),
+            len(chunk) - int(keep.sum()))
+
+
+def _spill(chunks, crosswalk, tmp_path):
+    """1. geçiş: eşlenen puanları geçici dosyalara ekler, kullanıcı başına sayımları döndürür"""
+    movielens_ids, tmdb_ids = crosswalk
+    item_ids, item_rows = np.unique(tmdb_ids, return_inverse=True)
+    user_counts = np.zeros(0, dtype=np.int64)
+    rows_in = skipped = 0
+    handles = {name: open(os.path.join(tmp_path, f'spill_{name}.bin'), 'wb') for name in SPILL_FILES}
+    try:
+        for chunk in chunks:
+            users, items, ratings, chunk_skipped = _map_chunk(chunk, movielens_ids, item_rows)
+            rows_in += len(chunk)
+            skipped += chunk_skipped
+            if len(users):
+                counts = np.bincount(users)
+                if len(counts) > len(user_counts):
+                    user_counts = np.concatenate([user_counts, np.zeros(len(counts) - len(user_counts), np.int64)])
+                user_counts[:len(counts)] += counts
+            users.tofile(handles['users'])
+            items.tofile(handles['items'])
+            ratings.tofile(handles['ratings'])
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return item_ids.astype(np.int32), user_counts, rows_in, skipped
+
+
+def _scatter(tmp_path, user_counts, block_rows):
+    """2. geçiş: geçici dosyalardaki puanları CSR satırlarına yerleştirir
+
+    Kullanıcı ID'leri yoğun satır numaralarına çevrilir; her blokta satır
+    başına bir imleç ilerletilir, böylece kaynak sırası satır içinde korunur.
+    """
+    user_ids = np.flatnonzero(user_counts).astype(np.int32)
+    nnz = int(user_counts.sum())
+    index_dtype = np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+    indptr = np.zeros(len(user_ids) + 1, dtype=index_dtype)
+    np.cumsum(user_counts[user_ids], out=indptr[1:])
+    row_of = np.full(len(user_counts), -1, dtype=np.int32)
+    row_of[user_ids] = np.arange(len(user_ids), dtype=np.int32)
+
+    indices = np.lib.format.open_memmap(os.path.join(tmp_path, 'indices.npy'), mode='w+', dtype=np.int32,
+                                        shape=(nnz,))
+    ratings = np.lib.format.open_memmap(os.path.join(tmp_path, 'ratings.npy'), mode='w+', dtype=np.uint8,
+                                        shape=(nnz,))
+    handles = {name: open(os.path.join(tmp_path, f'spill_{name}.bin'), 'rb') for name in SPILL_FILES}
+    cursors = indptr[:-1].astype(np.int64)
+    try:
+        for _ in range(0, nnz, block_rows):
+            # Geçici dosyalar sırayla okunur (eşlenmez), blok bittiğinde bellekten çıkar
+            block = {name: np.fromfile(handles[name], dtype=dtype, count=block_rows)
+                     for name, dtype in SPILL_FILES.items()}
+            rows = row_of[block['users']]
+            order = np.argsort(rows, kind='stable')
+            rows = rows[order]
+            # Bloktaki her puanın kendi satırındaki sırası
+            group_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            rank = np.arange(len(rows)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(rows)]))
+            positions = cursors[rows] + rank
+            indices[positions] = block['items'][order]
+            ratings[positions] = block['ratings'][order]
+            cursors += np.bincount(rows, minlength=len(user_ids))
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return user_ids, indptr, indices, ratings
+
+
+def _sort_rows(indptr, indices, ratings, n_items, block_rows):
+    """Her satırdaki puanları film indeksine göre sıralar (bloklar halinde, yerinde)"""
+    n_users = len(indptr) - 1
+    first = 0
+    while first < n_users:
+        # Toplam puanı block_rows'u aşmayan ardışık satırlar (en az bir satır)
+        last = max(first + 1, int(np.searchsorted(indptr, indptr[first] + block_rows, side='right')) - 1)
+        last = min(last, n_users)
+        start, end = int(indptr[first]), int(indptr[last])
+        local = np.repeat(np.arange(last - first, dtype=np.int64), np.diff(indptr[first:last + 1]))
+        block_indices = np.asarray(indices[start:end])
+        order = np.argsort(local * n_items + block_indices, kind='stable')
+        indices[start:end] = block_indices[order]
+        ratings[start:end] = np.asarray(ratings[start:end])[order]
+        first = last
+
+
+def build_ratings_store(chunks, crosswalk, path, block_rows=SCATTER_BLOCK_ROWS):
+    """Puan parçalarından depoyu geçici dizinde kurup atomik olarak yerine taşır, meta döndürür
+
+    chunks: userId, movieId, rating sütunlu DataFrame parçaları
+    crosswalk: movielens_crosswalk'un döndürdüğü (MovieLens ID'leri, TMDB ID'leri)
+    """
+    start = time.perf_counter()
+    tmp_path = path.rstrip('/') + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    item_ids, user_counts, rows_in, skipped = _spill(chunks, crosswalk, tmp_path)
+    user_ids, indptr, indices, ratings = _scatter(tmp_path, user_counts, block_rows)
+    del user_counts
+    for name in SPILL_FILES:
+        os.remove(os.path.join(tmp_path, f'spill_{name}.bin'))
+    _sort_rows(indptr, indices, ratings, len(item_ids), block_rows)
+    indices.flush()
+    ratings.flush()
+    nnz = len(indices)
+    del indices, ratings
+
+    np.save(os.path.join(tmp_path, 'user_ids.npy'), user_ids, allow_pickle=False)
+    np.save(os.path.join(tmp_path, 'item_ids.npy'), item_ids, allow_pickle=False)
+    np.save(os.path.join(tmp_path, 'indptr.npy'), indptr, allow_pickle=False)
+    meta = {
+        'format_version': STORE_FORMAT_VERSION,
+        'n_users': len(user_ids),
+        'n_items': len(item_ids),
+        'nnz': nnz,
+        'rating_scale': RATING_SCALE,
+        'rows_in': rows_in,
+        'skipped_rows': skipped,
+        'build_seconds': round(time.perf_counter() - start, 3),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+    return meta
+
+
+class RatingsStore:
+    """Bellek eşlemeli kullanıcı x film puan deposu"""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.arrays = arrays
+        self.user_ids = arrays['user_ids']
+        self.item_ids = arrays['item_ids']
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.ratings = arrays['ratings']
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @property
+    def shape(self):
+        return len(self.user_ids), len(self.item_ids)
+
+    def rows_for(self, user_ids):
+        """MovieLens kullanıcı ID'lerinin satır numaralarını döndürür (bulunamayanlar -1)"""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        if not len(self.user_ids):
+            return np.full(len(user_ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.user_ids, user_ids), len(self.user_ids) - 1)
+        return np.where(self.user_ids[rows] == user_ids, rows, -1)
+
+    def user_ratings(self, user_id):
+        """Kullanıcının puanladığı filmleri (film ID'leri, float32 puanlar) olarak döndürür"""
+        row = int(self.rows_for([user_id])[0])
+        if row < 0:
+            raise KeyError(f"Kullanıcı depoda yok: {user_id}")
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        return (self.item_ids[self.indices[start:end]],
+                self.ratings[start:end].astype(np.float32) / self.meta['rating_scale'])
+
+    def matrix(self):
+        """Diziler kopyalanmadan scipy CSR matrisi (puanlar uint8, rating * rating_scale)"""
+        return sp.csr_matrix((self.ratings, self.indices, self.indptr), shape=self.shape, copy=False)
+
+
+def load_ratings_store(path):
+    """Depoyu bellek eşlemeli açar"""
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != STORE_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen depo biçimi: {meta.get('format_version')}")
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in STORE_ARRAYS}
+    return RatingsStore(arrays, meta)
@@ -0,0 +1,341 @@
+"""
+Python film öneri servisi.
+
+Node backend'in yanında çalışır. Kullanıcının izlediği film ID'lerini alır ve
+özellik deposundaki (feature_store.py) önceden hesaplanmış vektörlerle tüm
+kataloğu tek seferde puanlar: kullanıcı profili bir kez oluşturulur, izlenen
+filmler boolean maske ile elenir ve en iyi N film argpartition ile seçilir.
+recommendationController.js'teki gibi 3000 adaylık LIMIT ya da NOT IN listesi
+yoktur.
+
+İstek (HTTP):
+    POST /recommendations
+    {"watchedIds": [862, 8844], "limit": 25}
+
+Yanıt getRecommendations ile aynı biçimdedir:
+    {"success": true, "recommendations": [...], "computationTime": 12}
+
+Kullanım:
+    python recommendation_service.py --feature-store ./feature_store --port 3003
+    python recommendation_service.py --feature-store ./feature_store --socket /tmp/recommender.sock
+"""
+import argparse
+import asyncio
+import json
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from db import create_db_engine
+from feature_store import database_fingerprint, load_feature_store
+
+# Benzerlik bileşenlerinin ağırlıkları (recommendationController.js'e yakın)
+SCORE_WEIGHTS = {
+    'text': 0.25,
+    'genre': 0.5,
+    'keyword': 0.15,
+    'vote': 0.1,
+}
+
+# Aday filtresi (recommendationController.js ile aynı)
+MIN_VOTE_AVERAGE = 5.0
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+MAX_BODY_BYTES = 1024 * 1024
+
+POSTER_BASE_URL = 'https://image.tmdb.org/t/p/w500'
+
+
+class Recommender:
+    """Tüm katalog üzerinde vektörel öneri puanlaması"""
+
+    def __init__(self, store, metadata=None):
+        self.store = store
+        self.metadata = metadata
+        numeric = np.asarray(store.numeric)
+        self.vote_average = numeric[:, store.numeric_columns.index('vote_average')]
+
+        # Önerilebilecek filmler bir kez hesaplanır
+        has_genre = np.diff(store.genre.indptr) > 0
+        self.eligible = (np.nan_to_num(self.vote_average) >= MIN_VOTE_AVERAGE) & has_genre
+
+    def _block_similarity(self, matrix, rows):
+        """İzlenen filmlerin ortalama vektörü ile tüm katalog arasındaki kosinüs benzerliği"""
+        if matrix.shape[1] == 0:
+            return np.zeros(matrix.shape[0], dtype=np.float32)
+        profile = np.asarray(matrix[rows].mean(axis=0)).ravel().astype(np.float32)
+        norm = np.linalg.norm(profile)
+        if norm == 0:
+            return np.zeros(matrix.shape[0], dtype=np.float32)
+        return matrix.dot(profile / norm)
+
+    def _vote_similarity(self, rows):
+        """Kullanıcının oy ortalamasına yakınlık (z-skoru üzerinden)"""
+        votes = self.vote_average[rows]
+        votes = votes[np.nan_to_num(votes) > 0]
+        if len(votes) == 0:
+            return np.zeros(len(self.vote_average), dtype=np.float32)
+        std = votes.std() or 1.0
+        z_scores = (np.nan_to_num(self.vote_average) - votes.mean()) / std
+        return np.exp(-(z_scores ** 2) / 6).astype(np.float32)
+
+    def score(self, watched_ids):
+        """Tüm katalog için bileşen skorlarını ve adaylık maskesini döndürür"""
+        rows = self.store.rows_for(watched_ids)
+        rows = rows[rows >= 0]
+        if len(rows) == 0:
+            return None
+
+        components = {
+            'text': self._block_similarity(self.store.text, rows),
+            'genre': self._block_similarity(self.store.genre, rows),
+            'keyword': self._block_similarity(self.store.keyword, rows),
+            'vote': self._vote_similarity(rows),
+        }
+        total = sum(components[name] * weight for name, weight in SCORE_WEIGHTS.items())
+
+        # İzlenen filmler maske ile elenir
+        candidates = self.eligible.copy()
+        candidates[rows] = False
+        return total, components, candidates
+
+    def top_n(self, watched_ids, limit=DEFAULT_LIMIT):
+        """En yüksek skorlu limit adet filmin satır numaralarını ve skorlarını döndürür"""
+        scored = self.score(watched_ids)
+        if scored is None:
+            return None
+        total, components, candidates = scored
+
+        candidate_rows = np.flatnonzero(candidates)
+        if len(candidate_rows) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32), components
+        candidate_scores = total[candidate_rows]
+
+        limit = min(limit, len(candidate_rows))
+        best = np.argpartition(-candidate_scores, limit - 1)[:limit]
+        best = best[np.argsort(-candidate_scores[best])]
+        return candidate_rows[best], candidate_scores[best], components
+
+    def recommend(self, watched_ids, limit=DEFAULT_LIMIT):
+        """getRecommendations ile aynı biçimde öneri listesi döndürür"""
+        result = self.top_n(watched_ids, limit)
+        if result is None:
+            return None
+        rows, scores, components = result
+        display_scores = normalize_scores(np.sqrt(np.maximum(scores, 0)))
+
+        recommendations = []
+        for rank, row in enumerate(rows):
+            movie_id = int(self.store.ids[row])
+            info = self._movie_info(movie_id)
+            poster_path = info.get('poster_path') or None
+            recommendations.append({
+                'id': movie_id,
+                'title': info.get('title') or 'Başlıksız Film',
+                'poster_path': poster_path,
+                'poster_url': f'{POSTER_BASE_URL}{poster_path}' if poster_path else None,
+                'release_date': info.get('release_date'),
+                'vote_average': round(float(np.nan_to_num(self.vote_average[row])), 2),
+                'genres': info.get('genres', []),
+                'overview': info.get('overview') or '',
+                'similarity_score': float(display_scores[rank]),
+                'similarity_components': {
+                    'tfidf': float(components['text'][row]),
+                    'genre': float(components['genre'][row]),
+                    'vote': float(components['vote'][row]),
+                },
+            })
+        return recommendations
+
+    def _movie_info(self, movie_id):
+        if self.metadata is None or movie_id not in self.metadata:
+            return {}
+        return self.metadata[movie_id]
+
+
+def normalize_scores(scores):
+    """Skorları recommendationController.js'teki gibi [0.4, 0.95] aralığına yayar"""
+    if len(scores) == 0:
+        return scores
+    ranking_factor = 1 - np.arange(len(scores)) / len(scores)
+    score_range = scores.max() - scores.min()
+    if score_range > 0:
+        normalized = (scores - scores.min()) / score_range * 0.6 + ranking_factor * 0.4
+    else:
+        normalized = ranking_factor
+    return 0.4 + normalized * 0.55
+
+
+def load_movie_metadata(engine):
+    """Yanıtlarda gösterilecek film bilgilerini film ID'sine göre sözlük olarak okur"""
+    movies = pd.read_sql(
+        "SELECT id, title, poster_path, release_date, overview FROM movies_metadata", engine
+    )
+    genres = pd.read_sql(
+        "SELECT mg.movie_id, g.name FROM movie_genres mg INNER JOIN genres g ON g.id = mg.genre_id", engine
+    )
+    genre_lists = genres.groupby('movie_id')['name'].agg(sorted)
+
+    movies['release_date'] = movies['release_date'].astype(str).where(movies['release_date'].notna(), None)
+    movies['genres'] = movies['id'].map(genre_lists)
+    movies['genres'] = movies['genres'].apply(lambda value: value if isinstance(value, list) else [])
+    movies = movies.astype(object).where(movies.notna(), None)
+    return {int(row.pop('id')): row for row in movies.to_dict('records')}
+
+
+def parse_limit(value):
+    """İstekteki limit değerini 1..MAX_LIMIT aralığına sıkıştırır; tam sayı değilse ValueError"""
+    if value is None:
+        return DEFAULT_LIMIT
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"limit tam sayı olmalıdır: {value!r}")
+    return min(max(value, 1), MAX_LIMIT)
+
+
+def handle_request(recommender, method, path, body):
+    """İsteği işler, (durum kodu, yanıt sözlüğü) döndürür"""
+    if method == 'GET' and path == '/health':
+        return 200, {'success': True, 'movies': len(recommender.store)}
+
+    if method != 'POST' or path != '/recommendations':
+        return 404, {'success': False, 'message': 'Bulunamadı'}
+
+    try:
+        payload = json.loads(body or b'{}')
+        watched_ids = [int(movie_id) for movie_id in payload.get('watchedIds', [])]
+        limit = parse_limit(payload.get('limit'))
+    except (ValueError, TypeError, AttributeError):
+        return 400, {'success': False, 'message': 'Geçersiz istek gövdesi'}
+
+    if not watched_ids:
+        return 404, {'success': False, 'message': 'Öneri yapılabilmesi için izlenen film bulunmalıdır.'}
+
+    start = time.perf_counter()
+    recommendations = recommender.recommend(watched_ids, limit)
+    computation_time = int(round((time.perf_counter() - start) * 1000))
+    if recommendations is None:
+        return 404, {'success': False, 'message': 'İzlenen filmler katalogda bulunamadı.'}
+
+    return 200, {
+        'success': True,
+        'recommendations': recommendations,
+        'computationTime': computation_time,
+    }
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+               500: 'Internal Server Error'}
+
+
+async def handle_connection(recommender, reader, writer):
+    """Basit HTTP/1.1 bağlantısı (keep-alive destekli)"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            except ValueError:
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get('content-length') or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # Gövdenin nerede bittiği bilinmediği için bağlantı kapatılır
+                length = None
+                status, response = 400, {'success': False, 'message': 'Geçersiz Content-Length'}
+
+            if length is not None and length > MAX_BODY_BYTES:
+                status, response = 413, {'success': False, 'message': 'İstek çok büyük'}
+            elif length is not None:
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    status, response = handle_request(recommender, method, path.split('?', 1)[0], body)
+                except Exception:
+                    # Tek bir isteğin hatası bağlantıyı ve servisi düşürmez
+                    traceback.print_exc()
+                    status, response = 500, {'success': False, 'message': 'Sunucu hatası'}
+
+            payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
+            keep_alive = (headers.get('connection', '').lower() != 'close'
+                          and status != 413 and length is not None)
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    except ValueError:
+        # readline() akış sınırını aşan başlık satırlarında ValueError verir
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(recommender, host='127.0.0.1', port=3003, socket_path=None):
+    """Servisi TCP portunda veya yerel Unix soketinde başlatır"""
+    def on_connect(reader, writer):
+        return handle_connection(recommender, reader, writer)
+
+    if socket_path:
+        server = await asyncio.start_unix_server(on_connect, path=socket_path)
+        print(f"Öneri servisi {socket_path} soketinde çalışıyor")
+    else:
+        server = await asyncio.start_server(on_connect, host, port)
+        print(f"Öneri servisi http://{host}:{port} adresinde çalışıyor")
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="Tüm katalog üzerinde puanlama yapan film öneri servisi")
+    parser.add_argument('--feature-store', required=True,
+                        help="import_data.py --feature-store ile üretilen özellik deposu dizini")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3003)
+    parser.add_argument('--socket', default=None,
+                        help="TCP yerine bu Unix soketinde dinle")
+    parser.add_argument('--no-metadata', action='store_true',
+                        help="Film bilgilerini veritabanından okuma (yanıtlarda yalnızca ID ve skorlar olur, "
+                             "depo katalog kontrolü yapılmaz)")
+    parser.add_argument('--verify-store', action='store_true',
+                        help="Özellik deposu dosyalarının SHA-256 özetlerini açılışta doğrula")
+    parser.add_argument('--allow-stale', action='store_true',
+                        help="Depo veritabanındaki film kataloğuyla uyuşmuyorsa durma, yalnızca uyar")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    engine = None if args.no_metadata else create_db_engine()
+    # Depo, veritabanı yeniden yüklendikten sonra güncellenmemişse başka filmleri önerir
+    fingerprint = database_fingerprint(engine) if engine is not None else None
+    store = load_feature_store(args.feature_store, args.verify_store, fingerprint, args.allow_stale)
+    metadata = None if engine is None else load_movie_metadata(engine)
+    recommender = Recommender(store, metadata)
+    print(f"{len(store)} film yüklendi ({time.perf_counter() - start:.2f} sn)")
+    asyncio.run(serve(recommender, args.host, args.port, args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Normalleştirilmiş tür, anahtar kelime ve oyuncu/ekip tabloları.
+
+Kaynak CSV'lerdeki genres, keywords, cast ve crew sütunları JSON değil,
+Python literal metinleridir (ör. "[{'id': 16, 'name': 'Animation'}]").
+Satır satır ast.literal_eval yerine, ihtiyaç duyulan alanlar tüm sütun
+üzerinde tek bir düzenli ifade ile (Series.str.extractall) çıkarılır.
+"""
+import numpy as np
+import pandas as pd
+
+# Python literal metni: tek veya çift tırnaklı, kaçış karakterli olabilir
+_STR = r"""(?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")"""
+
+ID_NAME_PATTERN = r"'id': (?P<id>\d+), 'name': (?P<name>" + _STR + r")"
+CAST_PATTERN = (r"'id': (?P<person_id>\d+), 'name': (?P<name>" + _STR + r"), "
+                r"'order': (?P<cast_order>\d+)")
+CREW_PATTERN = (r"'id': (?P<person_id>\d+), 'job': (?P<job>" + _STR + r"), "
+                r"'name': (?P<name>" + _STR + r")")
+
+# Uygulamanın kullandığı roller
+CAST_TOP_N = 10
+CREW_JOBS = ('Director', 'Screenplay', 'Writer')
+
+# Kaynak tablo -> her film için yeniden oluşturulan bağlantı tabloları
+LINK_TABLES = {
+    'movies_metadata': ['movie_genres'],
+    'keywords': ['movie_keywords'],
+    'credits': ['movie_cast', 'movie_crew'],
+}
+
+# Kaynak tablo -> yazılırken gerekli ham literal sütunlar
+SOURCE_COLUMNS = {
+    'movies_metadata': ['genres'],
+    'keywords': ['keywords'],
+    'credits': ['cast', 'crew'],
+}
+
+# Upsert için tablo -> birincil anahtar sütunları
+SIDE_TABLE_KEYS = {
+    'genres': ['id'],
+    'movie_genres': ['movie_id', 'genre_id'],
+    'keyword': ['id'],
+    'movie_keywords': ['movie_id', 'keyword_id'],
+    'movie_cast': ['movie_id', 'person_id'],
+    'movie_crew': ['movie_id', 'person_id', 'job'],
+}
+
+
+def _unquote(series):
+    """Python literal metnini düz metne çevirir"""
+    return series.str.slice(1, -1).str.replace(r"\\(.)", r"\1", regex=True)
+
+
+def _extract(movie_ids, literals, pattern):
+    """Literal sütununda desenin tüm eşleşmelerini film ID'siyle birlikte döndürür"""
+    literals = literals.dropna()
+    literals = literals[literals.str.len() > 2]
+    if literals.empty:
+        return pd.DataFrame(columns=['movie_id'])
+
+    matches = literals.str.extractall(pattern)
+    row_index = matches.index.get_level_values(0)
+    matches = matches.reset_index(drop=True)
+    matches.insert(0, 'movie_id', movie_ids.loc[row_index].astype(np.int64).values)
+    return matches
+
+
+def _new_dimension_rows(matches, seen_ids):
+    """Önceki parçalarda yazılmamış (id, name) satırlarını döndürür"""
+    dimension = matches[['id', 'name']].drop_duplicates('id')
+    dimension = dimension[~dimension['id'].isin(seen_ids)]
+    seen_ids.update(dimension['id'].tolist())
+    return dimension
+
+
+def _id_name_tables(movie_ids, literals, dimension_table, link_table, link_column, seen_ids):
+    matches = _extract(movie_ids, literals, ID_NAME_PATTERN)
+    if matches.empty:
+        return []
+    matches['id'] = matches['id'].astype(np.int64)
+    matches['name'] = _unquote(matches['name'])
+
+    links = (matches[['movie_id', 'id']]
+             .rename(columns={'id': link_column})
+             .drop_duplicates())
+    return [
+        (dimension_table, _new_dimension_rows(matches, seen_ids)),
+        (link_table, links),
+    ]
+
+
+def build_side_frames(table_name, movie_ids, raw_df, seen_ids):
+    """Kaynak tablo parçasından normalleştirilmiş tablo satırlarını üretir
+
+    movie_ids: film ID'leri (raw_df ile aynı indeksli Series)
+    seen_ids: boyut tabloları (genres, keyword) için parçalar arası görülen ID'ler
+    Dönüş: [(tablo adı, DataFrame), ...]
+    """
+    if table_name == 'movies_metadata':
+        return _id_name_tables(movie_ids, raw_df['genres'], 'genres', 'movie_genres', 'genre_id',
+                               seen_ids.setdefault('genres', set()))
+
+    if table_name == 'keywords':
+        return _id_name_tables(movie_ids, raw_df['keywords'], 'keyword', 'movie_keywords', 'keyword_id',
+                               seen_ids.setdefault('keyword', set()))
+
+    if table_name == 'credits':
+        frames = []
+        cast = _extract(movie_ids, raw_df['cast'], CAST_PATTERN)
+        if not cast.empty:
+            cast['person_id'] = cast['person_id'].astype(np.int64)
+            cast['cast_order'] = cast['cast_order'].astype(np.int32)
+            cast['name'] = _unquote(cast['name'])
+            cast = (cast[cast['cast_order'] < CAST_TOP_N]
+                    .sort_values(['movie_id', 'cast_order'])
+                    .drop_duplicates(['movie_id', 'person_id']))
+            frames.append(('movie_cast', cast[['movie_id', 'person_id', 'name', 'cast_order']]))
+
+        crew = _extract(movie_ids, raw_df['crew'], CREW_PATTERN)
+        if not crew.empty:
+            crew['job'] = _unquote(crew['job'])
+            crew = crew[crew['job'].isin(CREW_JOBS)]
+            crew['person_id'] = crew['person_id'].astype(np.int64)
+            crew['name'] = _unquote(crew['name'])
+            crew = crew.drop_duplicates(['movie_id', 'person_id', 'job'])
+            frames.append(('movie_crew', crew[['movie_id', 'person_id', 'job', 'name']]))
+        return frames
+
+    return []
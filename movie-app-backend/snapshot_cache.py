@@ -0,0 +1,155 @@
+"""
+Temizlenmiş tablo parçaları için anlık görüntü (snapshot) önbelleği.
+
+import_data.py her çalıştırmada arşivleri açıp CSV'leri ayrıştırır ve JSON
+temizleme, tip dönüştürme ve tekrar kaldırma adımlarını yeniden yapar. Kaynak
+arşiv değişmediyse bu CPU işi gereksizdir. Temizlenen her parça (ve normalleştirilmiş
+tablolar için gereken ham literal sütunları) Feather (Arrow IPC) biçiminde
+diske yazılır. Sonraki çalıştırmalarda anahtar eşleşirse parçalar doğrudan
+okunur.
+
+Anahtar: tablo adı + PIPELINE_VERSION + kaynak arşivin SHA-256 özeti
+(+ bağımlı tablolarda geçerli film ID'lerinin özeti, + credits gibi birden
+fazla temizleme modu olan tablolarda mod/projeksiyon). Temizleme mantığı
+değiştiğinde PIPELINE_VERSION artırılmalıdır.
+
+Önbellek dizini boyut sınırlıdır; sınır aşılınca en uzun süredir
+kullanılmayan anlık görüntüler silinir.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_store import file_sha256
+
+# Temizleme adımları değiştiğinde artırılır, eski anlık görüntüler geçersiz olur
+PIPELINE_VERSION = 3
+
+SNAPSHOT_MANIFEST = 'snapshot.json'
+RAW_PREFIX = '__raw__'
+DEFAULT_MAX_CACHE_MB = 2048
+
+
+def snapshot_key(table_name, source_path, valid_ids=None, variant=None):
+    """Tablo, boru hattı sürümü, kaynak arşiv, geçerli ID'ler ve temizleme çeşidinden anahtar üretir"""
+    digest = hashlib.sha256()
+    digest.update(f"{table_name}|v{PIPELINE_VERSION}|{file_sha256(source_path)}".encode('utf-8'))
+    if variant is not None:
+        digest.update(f"|{variant}".encode('utf-8'))
+    if valid_ids is not None:
+        digest.update(np.sort(np.fromiter(valid_ids, dtype=np.int64)).tobytes())
+    return f"{table_name}-{digest.hexdigest()[:24]}"
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+class SnapshotCache:
+    """Boyut sınırlı anlık görüntü dizini"""
+
+    def __init__(self, cache_dir, max_mb=DEFAULT_MAX_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        """Anlık görüntü varsa (temiz parça, ham parça) üreteci, yoksa None döndürür"""
+        path = self._path(key)
+        manifest_path = os.path.join(path, SNAPSHOT_MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        # Son kullanım zamanı tahliye sırası için güncellenir
+        os.utime(path)
+        return self._read_parts(path, manifest)
+
+    @staticmethod
+    def _read_parts(path, manifest):
+        for part in range(manifest['parts']):
+            frame = pd.read_feather(os.path.join(path, f'part-{part:05d}.feather'))
+            raw_columns = [col for col in frame.columns if col.startswith(RAW_PREFIX)]
+            raw = frame[raw_columns].rename(columns=lambda col: col[len(RAW_PREFIX):])
+            yield frame.drop(columns=raw_columns), raw
+
+    def writer(self, key):
+        """Yeni anlık görüntü için yazıcı döndürür"""
+        return SnapshotWriter(self, key)
+
+    def evict(self, keep=None):
+        """Toplam boyut sınırı aşılıyorsa en eski anlık görüntüleri siler"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        snapshots = []
+        for name in os.listdir(self.cache_dir):
+            path = self._path(name)
+            if os.path.isdir(path) and not name.endswith('.tmp'):
+                snapshots.append((os.path.getmtime(path), _directory_size(path), name))
+        total = sum(size for _, size, _ in snapshots)
+        for _, size, name in sorted(snapshots):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self._path(name), ignore_errors=True)
+            total -= size
+            print(f"Önbellek sınırı aşıldı, eski anlık görüntü silindi: {name}")
+
+
+class SnapshotWriter:
+    """Temizlenen parçaları geçici dizine yazar, commit ile atomik olarak yayınlar"""
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        self.tmp_path = cache._path(key) + '.tmp'
+        self.parts = 0
+        self.rows = 0
+        self.failed = False
+        if os.path.exists(self.tmp_path):
+            shutil.rmtree(self.tmp_path)
+        os.makedirs(self.tmp_path)
+
+    def add(self, clean_df, raw_df):
+        """Temiz parçayı ve aynı satırlara ait ham sütunları ekler"""
+        if self.failed:
+            return
+        frame = clean_df.reset_index(drop=True)
+        raw = raw_df.loc[clean_df.index].reset_index(drop=True)
+        for col in raw.columns:
+            frame[RAW_PREFIX + col] = raw[col]
+        try:
+            frame.to_feather(os.path.join(self.tmp_path, f'part-{self.parts:05d}.feather'))
+        except Exception as e:
+            # Arrow'a çevrilemeyen karışık tipli sütunlar: önbellek bu tablo için atlanır
+            print(f"Anlık görüntü yazılamadı, {self.key} önbelleğe alınmayacak: {str(e)}")
+            self.failed = True
+            return
+        self.parts += 1
+        self.rows += len(frame)
+
+    def commit(self):
+        """Anlık görüntüyü yayınlar ve gerekirse eski anlık görüntüleri siler"""
+        if self.failed:
+            self.abort()
+            return
+        with open(os.path.join(self.tmp_path, SNAPSHOT_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'pipeline_version': PIPELINE_VERSION, 'parts': self.parts,
+                       'rows': self.rows, 'created_at': time.time()}, f)
+        path = self.cache._path(self.key)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(self.tmp_path, path)
+        self.cache.evict(keep=self.key)
+
+    def abort(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
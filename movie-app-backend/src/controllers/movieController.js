@@ -2,6 +2,49 @@ const { MoviesMetaData, Links, Credits, Keywords } = require("../models");
 const { Op } = require("sequelize");
 const sequelize = require("../config/database");
 
+// movies_metadata.id TMDB ID'sidir; links ile tmdbId üzerinden birleştirilir.
+// Aynı tmdbId'ye birden fazla MovieLens satırı eşlenebildiği için film satırları
+// çoğalmasın diye en küçük movieId'li satır seçilir (ix_links_tmdb kullanılır).
+const LINKS_JOIN = `
+      LEFT JOIN links l ON l.tmdbId = mm.id
+        AND l.movieId = (SELECT MIN(l2.movieId) FROM links l2 WHERE l2.tmdbId = mm.id)`;
+
+// Başlık araması MySQL'de ft_movies_title (title, original_title) FULLTEXT indeksini kullanır
+// (BOOLEAN MODE, her kelime zorunlu, kelime başı eşleşmesi). '%terim%' LIKE
+// hiçbir indeksle karşılanamaz. İndekse girmeyen kısa kelimeler (ör. "IV")
+// atlanır; diğer veritabanlarında ve yalnızca kısa kelimeden oluşan
+// aramalarda başlıkta LIKE kullanılır.
+const FULLTEXT_MIN_WORD_LENGTH = 3;
+
+const fullTextQuery = (search) => {
+  if (sequelize.getDialect() !== "mysql") {
+    return null;
+  }
+  const words = (search.toLowerCase().match(/[\p{L}\p{N}]+/gu) || []).filter(
+    (word) => word.length >= FULLTEXT_MIN_WORD_LENGTH
+  );
+  if (words.length === 0) {
+    return null;
+  }
+  return words.map((word) => `+${word}*`).join(" ");
+};
+
+// Arama koşulunu ve parametresini döndürür (alias: movies_metadata takma adı)
+const searchCondition = (search, alias = "mm") => {
+  const fullText = fullTextQuery(search);
+  if (fullText) {
+    return {
+      sql: `MATCH(${alias}.title, ${alias}.original_title) AGAINST (? IN BOOLEAN MODE)`,
+      replacement: fullText,
+    };
+  }
+  // Güvenli arama terimi hazırla - SQL enjeksiyon önleme
+  return {
+    sql: `${alias}.title LIKE ?`,
+    replacement: `%${search.replace(/[%_']/g, (char) => `\\${char}`)}%`,
+  };
+};
+
 // Film listesini getiren controller
 exports.getMovies = async (req, res) => {
   try {
@@ -55,7 +98,7 @@ exports.getMovies = async (req, res) => {
              mm.overview, mm.genres, mm.belongs_to_collection, mm.popularity, 
              mm.vote_count, mm.runtime, l.tmdbId
       FROM movies_metadata mm
-      LEFT JOIN links l ON mm.id = l.movieId
+      ${LINKS_JOIN}
       ORDER BY mm.${safeSortBy} ${safeSortOrder}
       LIMIT ? OFFSET ?
     `;
@@ -164,24 +207,42 @@ exports.searchMovies = async (req, res) => {
     // Arama filtresini oluştur
     let whereClause = {};
 
-    // Başlıkta arama - case insensitive
+    // Başlıkta arama - MySQL'de FULLTEXT indeksi, diğerlerinde LIKE
     if (query && query.trim() !== "") {
-      whereClause.title = {
-        [Op.like]: `%${query}%`,
-      };
+      const fullText = fullTextQuery(query);
+      if (fullText) {
+        whereClause[Op.and] = [
+          sequelize.literal(
+            `MATCH(title, original_title) AGAINST (${sequelize.escape(
+              fullText
+            )} IN BOOLEAN MODE)`
+          ),
+        ];
+      } else {
+        whereClause.title = {
+          [Op.like]: `%${query}%`,
+        };
+      }
     }
 
-    // Yıla göre filtreleme
-    if (year && year.trim() !== "") {
+    // Yıla göre filtreleme - tarih aralığı ile release_date indeksi kullanılır
+    const yearNumber = parseInt(year);
+    if (!isNaN(yearNumber)) {
       whereClause.release_date = {
-        [Op.like]: `${year}%`,
+        [Op.gte]: `${yearNumber}-01-01`,
+        [Op.lt]: `${yearNumber + 1}-01-01`,
       };
     }
 
-    // Türe göre filtreleme
+    // Türe göre filtreleme - movie_genres üzerinden indeksli birleştirme
     if (genre && genre.trim() !== "") {
-      whereClause.genres = {
-        [Op.like]: `%${genre}%`,
+      whereClause.id = {
+        [Op.in]: sequelize.literal(`(
+          SELECT mg.movie_id
+          FROM movie_genres mg
+          INNER JOIN genres g ON g.id = mg.genre_id
+          WHERE g.name = ${sequelize.escape(genre.trim())}
+        )`),
       };
     }
 
@@ -244,8 +305,8 @@ exports.simpleSearch = async (req, res) => {
       limit,
     });
 
-    // Güvenli arama terimi hazırla - SQL enjeksiyon önleme
-    const safeSearch = `%${search.replace(/[%_']/g, (char) => `\\${char}`)}%`;
+    // FULLTEXT (MySQL) veya LIKE arama koşulu
+    const condition = searchCondition(search);
 
     // TMDB ID'lerini de içeren arama sorgusu - tablo ve alan adları modellere göre düzenlendi
     const query = `
@@ -253,15 +314,15 @@ exports.simpleSearch = async (req, res) => {
              mm.overview, mm.genres, mm.belongs_to_collection, mm.popularity,
              mm.vote_count, mm.runtime, l.tmdbId
       FROM movies_metadata mm
-      LEFT JOIN links l ON mm.id = l.movieId
-      WHERE mm.title LIKE ?
+      ${LINKS_JOIN}
+      WHERE ${condition.sql}
       ORDER BY mm.popularity DESC
       LIMIT ? OFFSET ?
     `;
 
     // Veritabanından filmleri ve TMDB ID'lerini çek - parametreleri ayrı gönder
     const movies = await sequelize.query(query, {
-      replacements: [safeSearch, limit, offset],
+      replacements: [condition.replacement, limit, offset],
       type: sequelize.QueryTypes.SELECT,
     });
 
@@ -269,11 +330,11 @@ exports.simpleSearch = async (req, res) => {
     const countResult = await sequelize.query(
       `
       SELECT COUNT(*) as count 
-      FROM movies_metadata 
-      WHERE title LIKE ?
+      FROM movies_metadata mm
+      WHERE ${condition.sql}
     `,
       {
-        replacements: [safeSearch],
+        replacements: [condition.replacement],
         type: sequelize.QueryTypes.SELECT,
       }
     );
@@ -14,6 +14,15 @@ const recommendationsCache = {
 // Önbellekte tutma süresi (ms) - 24 saat (12 saatten artırıldı)
 const CACHE_TTL = 24 * 60 * 60 * 1000;
 
+// Film türlerini import_data.py'nin oluşturduğu movie_genres/genres tablolarından
+// indeksli birleştirme ile getiren alt sorgu - JSON metni her istekte ayrıştırılmaz
+const GENRE_NAMES_SUBQUERY = `
+  SELECT GROUP_CONCAT(g.name ORDER BY g.name SEPARATOR '|')
+  FROM movie_genres mg
+  INNER JOIN genres g ON g.id = mg.genre_id
+  WHERE mg.movie_id = mm.id
+`;
+
 /**
  * İzlenen filmlerin hash değerini hesaplar
  * @param {Array} watchedMovieIds - İzlenen film ID'leri
@@ -25,6 +34,56 @@ function calculateWatchedMoviesHash(watchedMovieIds) {
   return crypto.createHash("md5").update(idString).digest("hex");
 }
 
+/**
+ * user_recommendations tablosundan önceden hesaplanmış önerileri getirir
+ * Özet değişmişse veya tablo henüz yoksa boş dizi döner; tabloda limit'ten
+ * az satır varsa (limit > top_n) limit'ten kısa dizi döner
+ * @param {Number} userId - Kullanıcı ID'si
+ * @param {String} watchedHash - İzlenen filmlerin hash değeri
+ * @param {Number} limit - Öneri sayısı
+ * @returns {Array} Öneri listesi
+ */
+async function getPrecomputedRecommendations(userId, watchedHash, limit) {
+  try {
+    const rows = await sequelize.query(
+      `
+      SELECT
+        mm.id, mm.title, mm.poster_path, mm.release_date, mm.vote_average,
+        (${GENRE_NAMES_SUBQUERY}) AS genre_names, mm.overview, ur.score
+      FROM
+        user_recommendations ur
+      INNER JOIN
+        movies_metadata mm ON mm.id = ur.movie_id
+      WHERE
+        ur.user_id = ? AND ur.watched_hash = ?
+      ORDER BY ur.\`rank\`
+      LIMIT ?
+    `,
+      {
+        replacements: [userId, watchedHash, limit],
+        type: sequelize.QueryTypes.SELECT,
+      }
+    );
+
+    return rows.map((movie) => ({
+      id: movie.id,
+      title: movie.title || "Başlıksız Film",
+      poster_path: movie.poster_path || null,
+      poster_url: movie.poster_path
+        ? `https://image.tmdb.org/t/p/w500${movie.poster_path}`
+        : null,
+      release_date: movie.release_date,
+      vote_average: movie.vote_average,
+      genres: (movie.genre_names || "").split("|").filter(Boolean),
+      overview: movie.overview || "",
+      similarity_score: movie.score,
+    }));
+  } catch (error) {
+    console.error("Önceden hesaplanmış öneriler okunamadı:", error.message);
+    return [];
+  }
+}
+
 /**
  * Kullanıcının izlediği filmlere benzer 25 film önerisi sunan API
  * Bu öneri sistemi film türleri ve özetlerine dayalı benzerlik hesaplamaktadır
@@ -56,7 +115,7 @@ exports.getRecommendations = async (req, res) => {
       SELECT 
         um.MoviesMetaDataId as id, 
         mm.title, 
-        mm.genres,
+        (${GENRE_NAMES_SUBQUERY}) AS genre_names,
         mm.overview, 
         mm.vote_average
       FROM 
@@ -113,6 +172,28 @@ exports.getRecommendations = async (req, res) => {
       });
     }
 
+    // Gece çalışan precompute_recommendations.py'nin yazdığı kalıcı önbelleği kontrol et.
+    // Tabloda kullanıcı başına top_n öneri vardır; daha büyük limit istenirse
+    // veya eksik satır dönerse canlı hesaplamaya geçilir.
+    if (!forceRefresh) {
+      const precomputed = await getPrecomputedRecommendations(
+        userId,
+        watchedHash,
+        limit
+      );
+      if (precomputed.length >= limit) {
+        console.log(
+          `Kullanıcı ${userId} için önceden hesaplanmış öneriler kullanılıyor`
+        );
+        return res.json({
+          success: true,
+          recommendations: precomputed,
+          fromCache: true,
+          computationTime: Date.now() - startTime,
+        });
+      }
+    }
+
     // Performans sınırlarını kaldırarak tüm izlenmemiş filmleri getir
     console.log("Tüm izlenmemiş filmler alınıyor...");
 
@@ -121,7 +202,7 @@ exports.getRecommendations = async (req, res) => {
     const query = `
       SELECT 
         mm.id, mm.title, mm.poster_path, mm.release_date, mm.vote_average, 
-        mm.genres, mm.overview, mm.popularity
+        (${GENRE_NAMES_SUBQUERY}) AS genre_names, mm.overview, mm.popularity
       FROM 
         movies_metadata mm
       WHERE 
@@ -129,7 +210,7 @@ exports.getRecommendations = async (req, res) => {
         AND mm.id IS NOT NULL
         AND mm.title IS NOT NULL
         AND mm.overview IS NOT NULL AND mm.overview != ''
-        AND mm.genres IS NOT NULL AND mm.genres != ''
+        AND EXISTS (SELECT 1 FROM movie_genres mg WHERE mg.movie_id = mm.id)
         AND mm.vote_average >= 5.0
       ORDER BY mm.popularity DESC, mm.vote_average DESC  
       LIMIT 3000
@@ -315,9 +396,17 @@ function calculateSimilarityFromRaw(userMovies, unwatchedMovies) {
     return [];
   };
 
+  // Normalleştirilmiş tablolardan gelen türleri kullan, yoksa eski JSON sütununu ayrıştır
+  const getMovieGenres = (movie) => {
+    if (typeof movie.genre_names === "string") {
+      return movie.genre_names.split("|").filter(Boolean);
+    }
+    return parseGenres(movie.genres);
+  };
+
   // Kullanıcının tüm filmlerinden türleri çıkar ve frekanslarını hesapla
   userMovies.forEach((movie) => {
-    const genres = parseGenres(movie.genres);
+    const genres = getMovieGenres(movie);
     const genreSet = new Set(genres);
     userGenreSets.push(genreSet);
 
@@ -579,7 +668,7 @@ function calculateSimilarityFromRaw(userMovies, unwatchedMovies) {
     const voteSimilarity = calculateVoteSimilarity(movie.vote_average);
 
     // 3. Tür benzerliği
-    const movieGenres = parseGenres(movie.genres);
+    const movieGenres = getMovieGenres(movie);
     const genreSimilarity = calculateGenreSimilarity(movieGenres);
 
     // Ağırlıklı benzerlik skoru - daha fazla tür ağırlığı
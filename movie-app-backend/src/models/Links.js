@@ -9,11 +9,11 @@ const Links = sequelize.define(
       primaryKey: true,
     },
     imdbId: {
-      type: DataTypes.STRING,
+      type: DataTypes.INTEGER,
       allowNull: true,
     },
     tmdbId: {
-      type: DataTypes.STRING,
+      type: DataTypes.INTEGER,
       allowNull: true,
     },
   },
@@ -108,13 +108,14 @@ const MoviesMetaData = sequelize.define(
   }
 );
 
+// links.tmdbId, movies_metadata.id (TMDB ID) ile eşleşir
 MoviesMetaData.hasOne(Links, {
-  foreignKey: "movieId",
+  foreignKey: "tmdbId",
   constraints: false,
 });
 
 Links.belongsTo(MoviesMetaData, {
-  foreignKey: "movieId",
+  foreignKey: "tmdbId",
   constraints: false,
 });
 
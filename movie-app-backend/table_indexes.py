@@ -0,0 +1,117 @@
+"""
+Toplu yüklemeden sonra oluşturulan ikincil ve FULLTEXT indeksler.
+
+İndeksleri yükleme sırasında güncel tutmak yerine veriler yüklendikten sonra
+tek seferde oluşturmak çok daha hızlıdır. build_indexes() her tanımı canlı
+şemayla karşılaştırır: aynı tanım varsa atlanır, aynı adla farklı tanım
+varsa indeks yeniden oluşturulur. FULLTEXT indeksler yalnızca MySQL'de
+oluşturulur.
+
+Node controller'larının kullandığı sorgular:
+  - öneri aday sorgusu: vote_average >= 5.0 ORDER BY popularity DESC
+  - film listesi: ORDER BY popularity / vote_average / release_date
+  - yıl filtresi: release_date aralığı
+  - başlık araması: MATCH(title, original_title)
+  - links üzerinden MovieLens / TMDB / IMDb ID çevirisi (üç yönde)
+"""
+import time
+from collections import namedtuple
+
+from sqlalchemy import MetaData, Table, Index, inspect
+
+IndexSpec = namedtuple('IndexSpec', ['name', 'table', 'columns', 'fulltext'])
+
+SECONDARY_INDEXES = [
+    IndexSpec('ft_movies_title', 'movies_metadata', ('title', 'original_title'), True),
+    IndexSpec('ix_movies_vote_popularity', 'movies_metadata', ('vote_average', 'popularity'), False),
+    IndexSpec('ix_movies_popularity', 'movies_metadata', ('popularity',), False),
+    IndexSpec('ix_movies_release_popularity', 'movies_metadata', ('release_date', 'popularity'), False),
+    # movieId birincil anahtardır; TMDB ve IMDb yönleri diğer ID'yi de kapsar
+    IndexSpec('ix_links_tmdb', 'links', ('tmdbId', 'imdbId'), False),
+    IndexSpec('ix_links_imdb', 'links', ('imdbId', 'tmdbId'), False),
+]
+
+
+# Artık kullanılmayan, varsa silinen indeksler (tablo, ad)
+RETIRED_INDEXES = [
+    # overview'u da kapsıyordu; başlık araması yalnızca başlık sütunlarını arar
+    ('movies_metadata', 'ft_movies_title_overview'),
+]
+
+
+def drop_retired_indexes(engine, inspector, retired=RETIRED_INDEXES):
+    """RETIRED_INDEXES'teki indeksler canlı şemada varsa siler"""
+    existing_tables = set(inspector.get_table_names())
+    for table_name, index_name in retired:
+        if table_name not in existing_tables:
+            continue
+        if any(info['name'] == index_name for info in inspector.get_indexes(table_name)):
+            quote = engine.dialect.identifier_preparer.quote
+            with engine.begin() as conn:
+                if engine.dialect.name == 'mysql':
+                    conn.exec_driver_sql(f"DROP INDEX {quote(index_name)} ON {quote(table_name)}")
+                else:
+                    conn.exec_driver_sql(f"DROP INDEX {quote(index_name)}")
+            print(f"{index_name}: artık kullanılmıyor, silindi")
+
+
+def _is_fulltext(index_info):
+    """Inspector'dan gelen indeks bilgisinin FULLTEXT olup olmadığını döndürür"""
+    return (index_info.get('type') == 'FULLTEXT'
+            or index_info.get('dialect_options', {}).get('mysql_prefix') == 'FULLTEXT')
+
+
+def index_status(spec, live_indexes):
+    """Tanımın canlı şemadaki durumu: 'missing', 'ok' veya 'changed'"""
+    for info in live_indexes:
+        same_definition = (tuple(info['column_names']) == spec.columns
+                           and _is_fulltext(info) == spec.fulltext)
+        if info['name'] == spec.name:
+            return 'ok' if same_definition else 'changed'
+        if same_definition:
+            # Aynı tanım başka bir adla zaten var
+            return 'ok'
+    return 'missing'
+
+
+def build_indexes(engine, specs=SECONDARY_INDEXES):
+    """Eksik veya değişmiş indeksleri oluşturur, indeks başına süreyi döndürür"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    metadata = MetaData()
+    timings = {}
+    drop_retired_indexes(engine, inspector)
+
+    for spec in specs:
+        if spec.table not in existing_tables:
+            print(f"{spec.name}: {spec.table} tablosu yok, atlandı")
+            continue
+        if spec.fulltext and engine.dialect.name != 'mysql':
+            print(f"{spec.name}: FULLTEXT yalnızca MySQL'de desteklenir, atlandı")
+            continue
+
+        status = index_status(spec, inspector.get_indexes(spec.table))
+        if status == 'ok':
+            print(f"{spec.name}: zaten güncel")
+            continue
+
+        if spec.table in metadata.tables:
+            table = metadata.tables[spec.table]
+        else:
+            table = Table(spec.table, metadata, autoload_with=engine)
+        index = Index(spec.name, *[table.c[column] for column in spec.columns],
+                      **({'mysql_prefix': 'FULLTEXT'} if spec.fulltext else {}))
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            if status == 'changed':
+                print(f"{spec.name}: tanım farklı, yeniden oluşturuluyor")
+                index.drop(conn)
+            index.create(conn)
+        timings[spec.name] = time.perf_counter() - start
+        print(f"{spec.name} ({spec.table}: {', '.join(spec.columns)}) oluşturuldu: {timings[spec.name]:.2f} sn")
+
+    if timings:
+        print(f"İndeksler toplam {sum(timings.values()):.2f} sn'de oluşturuldu")
+    return timings
+
@@ -0,0 +1,116 @@
+"""
+tmdb_poster_updater.py'yi gerçek API'ye gitmeden denemek için sahte TMDb sunucusu.
+
+/3/movie/{id} ve /3/search/movie isteklerine ID'den veya sorgudan türetilen
+sabit bir poster yolu döndürür; 50'ye bölünebilen ID'ler bulunamaz (404),
+böylece başlık araması yedeği de denenir.
+Saniyedeki istek sayısı --rate-limit değerini aşarsa, gerçek API gibi
+Retry-After başlıklı 429 yanıtı verir. --latency ile ağ gecikmesi taklit edilir.
+
+Kullanım:
+    python fake_tmdb_server.py --port 8765 --latency 0.05 --rate-limit 40
+    python tmdb_poster_updater.py --api-base http://127.0.0.1:8765/3 --threads 16
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeTmdbHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if not server.allow_request():
+            self._send_json(429, {'status_message': 'Request count over limit'},
+                            {'Retry-After': str(server.retry_after)})
+            return
+        time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path == '/3/search/movie':
+            query = params.get('query', [''])[0]
+            year = params.get('year', [''])[0]
+            digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+            self._send_json(200, {'results': [{
+                'id': int(digest[:6], 16),
+                'title': query,
+                'release_date': f'{year}-01-01' if year else '',
+                'poster_path': f'/{digest[:12]}.jpg',
+            }]})
+        elif url.path.startswith('/3/movie/') and url.path[len('/3/movie/'):].isdigit():
+            movie_id = int(url.path[len('/3/movie/'):])
+            if movie_id % 50 == 0:
+                self._send_json(404, {'status_message': 'The resource you requested could not be found.'})
+                return
+            self._send_json(200, {'id': movie_id, 'poster_path': f'/m{movie_id}.jpg'})
+        else:
+            self._send_json(404, {'status_message': 'Not found'})
+
+
+class FakeTmdbServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, rate_limit=40, retry_after=1):
+        super().__init__(address, FakeTmdbHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.throttled_count = 0
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """Bir saniyelik pencerede rate_limit'ten fazla istek gelirse False döndürür"""
+        with self.lock:
+            self.request_count += 1
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if self.rate_limit and self.window_count > self.rate_limit:
+                self.throttled_count += 1
+                return False
+            return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte TMDb API sunucusu")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Her yanıttan önceki gecikme (sn)")
+    parser.add_argument('--rate-limit', type=int, default=40,
+                        help="Saniyedeki en fazla istek (0: sınırsız)")
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    server = FakeTmdbServer(('127.0.0.1', args.port), args.latency, args.rate_limit, args.retry_after)
+    print(f"Sahte TMDb sunucusu http://127.0.0.1:{args.port}/3 adresinde çalışıyor")
+    try:
+        server.serve_forever()
+    finally:
+        print(f"{server.request_count} istek, {server.throttled_count} kez 429")
+
+
+if __name__ == "__main__":
+    main()
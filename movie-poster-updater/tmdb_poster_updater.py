@@ -1,48 +1,218 @@
-import requests
-import pymysql
+import argparse
+import json
 import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pymysql
+import pymysql.cursors
+import requests
+from requests.adapters import HTTPAdapter
 
 # Log ayarlamaları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # TMDB API Anahtarı
-TMDB_API_KEY = '1cfa70500bbb87dd6f9cb169ade564c6'
+TMDB_API_KEY = os.getenv('TMDB_API_KEY', '1cfa70500bbb87dd6f9cb169ade564c6')
+
+# TMDB API adresi (testlerde sahte sunucu adresi verilebilir)
+TMDB_API_BASE = os.getenv('TMDB_API_BASE', 'https://api.themoviedb.org/3')
+
+# TMDB adil kullanım sınırı (saniyede istek)
+DEFAULT_RATE_LIMIT = 40
+
+# Yanıt önbelleği ve kaldığı yer bilgisi
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tmdb_cache.sqlite')
+DEFAULT_CACHE_TTL_DAYS = 30
 
 # Veritabanı bağlantı bilgileri
 DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'movie_app',
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'user': os.getenv('DB_USER', 'root'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'database': os.getenv('DB_NAME', 'movie_app'),
     'charset': 'utf8mb4'
 }
 
-def get_all_movies():
-    connection = pymysql.connect(**DB_CONFIG)
-    try:
-        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
-            sql = "SELECT id, title, original_title, release_date, poster_path FROM movies_metadata"
-            cursor.execute(sql)
-            return cursor.fetchall()
-    finally:
-        connection.close()
 
-def get_tmdb_poster_path(title, year=None):
+class TokenBucket:
+    """İş parçacıkları arasında paylaşılan token bucket oran sınırlayıcı
+
+    Saniyede rate kadar token üretilir, en fazla capacity kadar birikir.
+    429 yanıtındaki Retry-After süresi boyunca tüm istekler bekletilir.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bir token alınana kadar bekler"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait_time)
+
+    def pause(self, seconds):
+        """Tüm istekleri verilen süre boyunca durdurur (429 Retry-After)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class ResponseCache:
+    """TMDb yanıtları için SQLite disk önbelleği (istek anahtarına göre, TTL'li)
+
+    Bulunamayan (404) yanıtlar da saklanır; böylece yeniden çalıştırmalarda ve
+    yarıda kalan çalıştırmalardan devam ederken hiçbir istek tekrarlanmaz. Aynı
+    dosyada son işlenen film ID'si (checkpoint) de tutulur.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl_days=DEFAULT_CACHE_TTL_DAYS):
+        self.ttl = ttl_days * 24 * 60 * 60
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(request_key TEXT PRIMARY KEY, status INTEGER, body TEXT, fetched_at REAL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, movie_id INTEGER)"
+        )
+        self.connection.commit()
+        self.hits = 0
+
+    @staticmethod
+    def request_key(path, params):
+        """API anahtarı hariç, parametreleri sıralı istek anahtarı"""
+        return path + '?' + '&'.join(f'{name}={params[name]}' for name in sorted(params) if name != 'api_key')
+
+    def get(self, key):
+        """Süresi dolmamış kayıt varsa (durum kodu, gövde) döndürür"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT status, body FROM responses WHERE request_key = ? AND fetched_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self.hits += 1
+        return row[0], json.loads(row[1]) if row[1] else None
+
+    def put(self, key, status, body):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (request_key, status, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, status, json.dumps(body) if body is not None else None, time.time())
+            )
+            self.connection.commit()
+
+    def load_checkpoint(self, name='movies_metadata'):
+        with self.lock:
+            row = self.connection.execute("SELECT movie_id FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, movie_id, name='movies_metadata'):
+        with self.lock:
+            if movie_id is None:
+                self.connection.execute("DELETE FROM checkpoints WHERE name = ?", (name,))
+            else:
+                self.connection.execute("INSERT OR REPLACE INTO checkpoints (name, movie_id) VALUES (?, ?)",
+                                        (name, movie_id))
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class TmdbClient:
+    """Keep-alive oturumlu, oran sınırlamalı TMDB istemcisi"""
+
+    def __init__(self, api_key=TMDB_API_KEY, api_base=TMDB_API_BASE, rate_limit=DEFAULT_RATE_LIMIT,
+                 pool_size=10, max_retries=5, timeout=10, cache=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.api_base = api_base.rstrip('/')
+        self.limiter = TokenBucket(rate_limit)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.request_count = 0
+        self.throttled_count = 0
+        self.stats_lock = threading.Lock()
+
+        # Tüm iş parçacıkları aynı bağlantı havuzunu kullanır
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, path, params=None):
+        """GET isteği yapar; 429 yanıtında Retry-After kadar bekleyip tekrar dener
+
+        Önbellekte geçerli yanıt varsa istek yapılmaz. Bulunamayan kayıtlar
+        için (404) None döndürür.
+        """
+        key = ResponseCache.request_key(path, params or {})
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached[1]
+
+        params = dict(params or {}, api_key=self.api_key)
+        for _ in range(self.max_retries):
+            self.limiter.acquire()
+            response = self.session.get(f'{self.api_base}{path}', params=params, timeout=self.timeout)
+            with self.stats_lock:
+                self.request_count += 1
+            if response.status_code == 429:
+                retry_after = float(response.headers.get('Retry-After') or 1)
+                with self.stats_lock:
+                    self.throttled_count += 1
+                logging.warning(f"TMDb oran sınırı aşıldı, {retry_after:.0f} sn bekleniyor")
+                self.limiter.pause(retry_after)
+                continue
+            if response.status_code == 404:
+                body = None
+            else:
+                response.raise_for_status()
+                body = response.json()
+            if self.cache is not None:
+                self.cache.put(key, response.status_code, body)
+            return body
+        raise RuntimeError(f"TMDb isteği {self.max_retries} denemede başarısız: {path}")
+
+    def close(self):
+        self.session.close()
+
+
+def get_tmdb_poster_path(client, title, year=None):
     params = {
-        'api_key': TMDB_API_KEY,
         'query': title,
         'include_adult': 'false'
     }
     if year:
         params['year'] = year
     try:
-        response = requests.get('https://api.themoviedb.org/3/search/movie', params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data['results']:
+        data = client.get('/search/movie', params)
+        if data and data['results']:
             # Yıla tam uyanı bul
             for result in data['results']:
-                if year and result.get('release_date', '').startswith(str(year)):
+                if year and (result.get('release_date') or '').startswith(str(year)):
                     return result.get('poster_path')
             # Yoksa ilk posteri döndür
             return data['results'][0].get('poster_path')
@@ -50,39 +220,217 @@ def get_tmdb_poster_path(title, year=None):
         logging.error(f"TMDb arama hatası: {e}")
     return None
 
-def update_poster_in_db(movie_id, poster_path):
-    connection = pymysql.connect(**DB_CONFIG)
+
+def get_tmdb_movie(client, tmdb_id):
+    """TMDb ID ile film kaydını getirir (404 ise None)"""
+    return client.get(f'/movie/{tmdb_id}')
+
+
+def find_poster(client, movie):
+    """Film için TMDb poster yolunu bulur, (film, poster) döndürür
+
+    movies_metadata.id TMDb ID'si olduğundan film başına tek bir doğrudan
+    istek yapılır. Başlık araması yalnızca ID yoksa veya TMDb kaydı
+    bulunamazsa (404) kullanılır; kayıt bulunup posteri boşsa arama yapılmaz,
+    aksi halde başka bir filmin posteri eşlenebilir.
+    """
+    if movie['id']:
+        try:
+            data = get_tmdb_movie(client, int(movie['id']))
+        except Exception as e:
+            logging.error(f"TMDb film getirme hatası ({movie['id']}): {e}")
+            return movie, None
+        if data is not None:
+            return movie, data.get('poster_path')
+
+    search_titles = []
+    if movie['title']:
+        search_titles.append(movie['title'])
+    if movie['original_title'] and movie['original_title'] != movie['title']:
+        search_titles.append(movie['original_title'])
+    year = None
+    if movie['release_date'] and len(str(movie['release_date'])) >= 4:
+        year = str(movie['release_date'])[:4]
+    tmdb_poster = None
+    for title in search_titles:
+        tmdb_poster = get_tmdb_poster_path(client, title, year)
+        if tmdb_poster:
+            break
+    return movie, tmdb_poster
+
+
+def stream_movies(connection, limit=None, offset=0, after_id=None):
+    """Filmleri sunucu tarafı imleçle (SSDictCursor) tüm tabloyu belleğe almadan okur
+
+    movies_metadata.id bu veri setinde TMDb ID'sidir ve doğrudan ID ile
+    sorgulamada kullanılır (links ile birleştirme tekrarlanan tmdbId'lerde
+    filmleri çoğaltır).
+    """
+    sql = (
+        "SELECT mm.id, mm.title, mm.original_title, mm.release_date, mm.poster_path "
+        "FROM movies_metadata mm"
+    )
+    params = []
+    if after_id is not None:
+        sql += " WHERE mm.id > %s"
+        params.append(after_id)
+    sql += " ORDER BY mm.id"
+    if limit is not None:
+        sql += " LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+    elif offset:
+        sql += " LIMIT 18446744073709551615 OFFSET %s"
+        params.append(offset)
+    with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+        cursor.execute(sql, params)
+        for movie in cursor:
+            yield movie
+
+
+class PosterWriter:
+    """Poster güncellemelerini tek bağlantı üzerinden executemany ile toplu yazar"""
+
+    def __init__(self, connection, batch_size=200):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+
+    def add(self, movie_id, poster_path):
+        self.pending.append((poster_path, movie_id))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Bekleyen güncellemeleri yazar; hata olursa geri alıp istisnayı yeniden fırlatır
+
+        Başarısız toplu yazma pending'de kalır, böylece checkpoint bu filmleri
+        geçmez ve yeniden çalıştırmada tekrar işlenirler.
+        """
+        if not self.pending:
+            return
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.executemany("UPDATE movies_metadata SET poster_path = %s WHERE id = %s", self.pending)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logging.error(f"Poster güncelleme hatası: {e}")
+            raise
+        self.written += len(self.pending)
+        logging.info(f"{len(self.pending)} poster güncellendi (toplam {self.written})")
+        self.pending = []
+
+
+def update_posters(movies, client, writer, workers=8, cache=None, checkpoint_every=500):
+    """Filmleri sınırlı bir iş parçacığı havuzunda işler, istatistikleri döndürür
+
+    cache verilirse, kesintisiz işlenmiş en büyük film ID'si checkpoint_every
+    filmde bir kaydedilir. Bir film güncellemesi kuyruğa alındıktan sonra
+    tamamlandı sayılır ve checkpoint ilerlemeden önce bekleyen güncellemeler
+    yazılır; checkpoint hiçbir zaman veritabanına yazılmamış bir filmi geçmez.
+    """
+    stats = {'processed': 0, 'updated': 0, 'unchanged': 0}
+    max_in_flight = workers * 4
+    # Gönderim sırasındaki ID'ler; baştan itibaren tamamlananlar checkpoint olur
+    submitted = deque()
+    completed = set()
+    last_done = [None]
+
+    def save_checkpoint():
+        # Yazma hatası istisna fırlatır ve checkpoint ilerlemez
+        writer.flush()
+        while submitted and submitted[0] in completed:
+            completed.discard(submitted[0])
+            last_done[0] = submitted.popleft()
+        if cache is not None and last_done[0] is not None:
+            cache.save_checkpoint(last_done[0])
+
+    def collect(done):
+        for future in done:
+            movie, tmdb_poster = future.result()
+            if tmdb_poster and tmdb_poster != movie['poster_path']:
+                writer.add(movie['id'], tmdb_poster)
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+                logging.debug(f"Poster zaten güncel veya bulunamadı: {movie['title']}")
+            completed.add(movie['id'])
+            stats['processed'] += 1
+            if stats['processed'] % checkpoint_every == 0:
+                save_checkpoint()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for movie in movies:
+            # Okuma akışı işçilerin çok önüne geçmesin
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            submitted.append(movie['id'])
+            in_flight.add(executor.submit(find_poster, client, movie))
+        collect(wait(in_flight).done)
+    save_checkpoint()
+    return stats
+
+
+def parse_args(argv=None):
+    """Komut satırı parametrelerini ayrıştırır"""
+    parser = argparse.ArgumentParser(description="movies_metadata posterlerini TMDb'den günceller")
+    parser.add_argument('--api-key', default=TMDB_API_KEY)
+    parser.add_argument('--api-base', default=TMDB_API_BASE,
+                        help="TMDb API adresi (ör. sahte sunucu için http://127.0.0.1:8765/3)")
+    parser.add_argument('--threads', type=int, default=8,
+                        help="Paralel iş parçacığı sayısı")
+    parser.add_argument('--rate-limit', type=float, default=DEFAULT_RATE_LIMIT,
+                        help="Saniyedeki en fazla TMDb isteği")
+    parser.add_argument('--batch-size', type=int, default=200,
+                        help="Tek executemany ile yazılan güncelleme sayısı")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="İşlenecek maksimum film sayısı")
+    parser.add_argument('--offset', type=int, default=0,
+                        help="Başlangıç film indeksi")
+    parser.add_argument('--cache-file', default=CACHE_FILE,
+                        help="TMDb yanıt önbelleği ve checkpoint için SQLite dosyası")
+    parser.add_argument('--cache-ttl-days', type=float, default=DEFAULT_CACHE_TTL_DAYS,
+                        help="Önbellekteki yanıtların geçerlilik süresi (gün)")
+    parser.add_argument('--restart', action='store_true',
+                        help="Checkpoint'i yok sayıp baştan başla")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    cache = ResponseCache(args.cache_file, args.cache_ttl_days)
+    client = TmdbClient(args.api_key, args.api_base, args.rate_limit, pool_size=args.threads, cache=cache)
+
+    after_id = None if args.restart else cache.load_checkpoint()
+    if after_id is not None:
+        logging.info(f"Checkpoint bulundu, {after_id} ID'sinden sonraki filmlerden devam ediliyor")
+
+    # Okuma (akış) ve yazma için iki ayrı bağlantı: akış sürerken aynı bağlantıda sorgu çalıştırılamaz
+    read_connection = pymysql.connect(**DB_CONFIG)
+    write_connection = pymysql.connect(**DB_CONFIG)
     try:
-        with connection.cursor() as cursor:
-            sql = "UPDATE movies_metadata SET poster_path = %s WHERE id = %s"
-            cursor.execute(sql, (poster_path, movie_id))
-        connection.commit()
-        logging.info(f"Poster güncellendi: {movie_id} -> {poster_path}")
-    except Exception as e:
-        logging.error(f"Poster güncelleme hatası: {e}")
+        writer = PosterWriter(write_connection, args.batch_size)
+        movies = stream_movies(read_connection, args.limit, args.offset, after_id)
+        stats = update_posters(movies, client, writer, args.threads, cache)
+        # Tüm filmler işlendiyse bir sonraki çalıştırma baştan başlar
+        if args.limit is None:
+            cache.save_checkpoint(None)
     finally:
-        connection.close()
+        client.close()
+        cache.close()
+        read_connection.close()
+        write_connection.close()
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"{stats['processed']} film işlendi: {stats['updated']} güncellendi, "
+                 f"{stats['unchanged']} değişmedi; {client.request_count} TMDb isteği "
+                 f"({client.throttled_count} kez 429, {cache.hits} önbellek isabeti), {elapsed:.1f} sn "
+                 f"({stats['processed'] / elapsed if elapsed else 0:.1f} film/sn)")
 
-def main():
-    movies = get_all_movies()
-    for movie in movies:
-        search_titles = []
-        if movie['title']:
-            search_titles.append(movie['title'])
-        if movie['original_title'] and movie['original_title'] != movie['title']:
-            search_titles.append(movie['original_title'])
-        year = None
-        if movie['release_date'] and len(str(movie['release_date'])) >= 4:
-            year = str(movie['release_date'])[:4]
-        tmdb_poster = None
-        for title in search_titles:
-            tmdb_poster = get_tmdb_poster_path(title, year)
-            if tmdb_poster:
-                break
-        if tmdb_poster and tmdb_poster != movie['poster_path']:
-            update_poster_in_db(movie['id'], tmdb_poster)
-        else:
-            logging.info(f"Poster zaten güncel veya bulunamadı: {movie['title']}")
 
 if __name__ == "__main__":
     main()